@@ -1,13 +1,16 @@
 """Core analysis functions for session autopsy.
 
 All functions are pure — they take pre-fetched data (dicts from DB queries)
-and return structured dataclasses. No database access here.
+and return structured dataclasses. No database access here. Message dicts
+must carry integer token columns; get_session_messages never returns NULLs.
 """
 
 from __future__ import annotations
 
+import heapq
+from array import array
 from dataclasses import dataclass
-from statistics import mean
+from functools import lru_cache
 
 from aide.cost import OPENAI_PROVIDERS, _pricing_for_model, estimate_cost
 
@@ -16,13 +19,13 @@ from aide.cost import OPENAI_PROVIDERS, _pricing_for_model, estimate_cost
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCount:
     tool_name: str
     count: int
 
 
-@dataclass
+@dataclass(slots=True)
 class FileAccessCount:
     file_path: str
     read_count: int
@@ -31,7 +34,7 @@ class FileAccessCount:
     total: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionSummary:
     provider: str
     session_id: str
@@ -53,7 +56,7 @@ class SessionSummary:
     total_cache_creation_tokens: int
 
 
-@dataclass
+@dataclass(slots=True)
 class CostCategory:
     category: str  # file_reads, code_generation, execution, orchestration, system_overhead
     input_tokens: int
@@ -64,7 +67,7 @@ class CostCategory:
     percentage: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ExpensiveTurn:
     turn_number: int
     role: str
@@ -76,7 +79,7 @@ class ExpensiveTurn:
     estimated_cost_usd: float
 
 
-@dataclass
+@dataclass(slots=True)
 class CacheEfficiency:
     total_input_tokens: int
     cache_read_tokens: int
@@ -86,7 +89,7 @@ class CacheEfficiency:
     cache_savings_usd: float
 
 
-@dataclass
+@dataclass(slots=True)
 class CostAnalysis:
     total_cost_usd: float
     categories: list[CostCategory]
@@ -94,14 +97,14 @@ class CostAnalysis:
     cache_efficiency: CacheEfficiency
 
 
-@dataclass
+@dataclass(slots=True)
 class ContextPoint:
     turn_number: int
     cumulative_input_tokens: int
     role: str
 
 
-@dataclass
+@dataclass(slots=True)
 class CompactionEvent:
     turn_number: int
     tokens_before: int
@@ -109,17 +112,35 @@ class CompactionEvent:
     estimated_tokens_lost: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ContextAnalysis:
-    context_curve: list[ContextPoint]
+    context_tokens: array[int]  # context size per assistant turn, turn = index + 1
     peak_context_tokens: int
     estimated_compaction_count: int
     compaction_events: list[CompactionEvent]
     context_utilization_pct: float  # peak / 200K
     avg_input_tokens_per_turn: int
 
+    @property
+    def context_curve(self) -> list[ContextPoint]:
+        """ContextPoint view of context_tokens, built on demand."""
+        return [
+            ContextPoint(turn_number=i + 1, cumulative_input_tokens=tokens, role="assistant")
+            for i, tokens in enumerate(self.context_tokens)
+        ]
 
-@dataclass
+
+@dataclass(slots=True)
+class FilePartition:
+    """files_touched split into the views the summary and suggestions need."""
+
+    files_modified: list[str]
+    files_read: list[str]
+    file_access_counts: list[FileAccessCount]
+    repeated_reads: list[FileAccessCount]
+
+
+@dataclass(slots=True)
 class ClaudeMdSuggestion:
     category: str
     priority: str  # "high", "medium", "low"
@@ -127,7 +148,7 @@ class ClaudeMdSuggestion:
     evidence: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SuggestionsReport:
     instruction_target: str
     suggestions: list[ClaudeMdSuggestion]
@@ -155,7 +176,21 @@ TOOL_CATEGORIES: dict[str, str] = {
     "WebSearch": "orchestration",
 }
 
+_SYSTEM_OVERHEAD = "system_overhead"
+_ORCHESTRATION = "orchestration"
+
+# Report order of cost categories; _CATEGORY_INDEX maps each to its slot in
+# analyze_cost's flat accumulator (4 token fields per category)
+_COST_CATEGORIES = (
+    "file_reads", "code_generation", "execution",
+    "orchestration", "system_overhead",
+)
+_CATEGORY_INDEX = {name: i * 4 for i, name in enumerate(_COST_CATEGORIES)}
+
 CONTEXT_WINDOW = 200_000
+# A turn is a compaction when context drops below half of a >100K previous turn
+COMPACTION_MIN_TOKENS = 100_000
+COMPACTION_DROP_RATIO = 0.5
 
 
 # ---------------------------------------------------------------------------
@@ -163,31 +198,66 @@ CONTEXT_WINDOW = 200_000
 # ---------------------------------------------------------------------------
 
 
+def partition_files(files_touched: list[dict]) -> FilePartition:
+    """Walk files_touched once, building every per-file view the report uses.
+
+    files_touched keeps its DB ordering (total desc) in file_access_counts and
+    repeated_reads; files_modified and files_read are sorted by path.
+    """
+    modified: set[str] = set()
+    read: set[str] = set()
+    file_access_counts: list[FileAccessCount] = []
+    repeated_reads: list[FileAccessCount] = []
+
+    for f in files_touched:
+        path = f["file_path"]
+        read_count = f["read_count"]
+        edit_count = f["edit_count"]
+        write_count = f["write_count"]
+        if edit_count > 0 or write_count > 0:
+            modified.add(path)
+        if read_count > 0:
+            read.add(path)
+        access = FileAccessCount(
+            file_path=path,
+            read_count=read_count,
+            edit_count=edit_count,
+            write_count=write_count,
+            total=f["total"],
+        )
+        file_access_counts.append(access)
+        if read_count >= 3:
+            repeated_reads.append(access)
+
+    return FilePartition(
+        files_modified=sorted(modified),
+        files_read=sorted(read),
+        file_access_counts=file_access_counts,
+        repeated_reads=repeated_reads,
+    )
+
+
 def analyze_summary(
     session: dict,
     tool_usage: list[dict],
     files_touched: list[dict],
+    partition: FilePartition | None = None,
 ) -> SessionSummary:
     """Section 1: factual session overview.
 
     Extracts from session dict, builds tool_breakdown from tool_usage,
-    splits files_touched into files_modified and files_read.
+    splits files_touched into files_modified and files_read. Pass the
+    partition_files() result to share the file walk with analyze_suggestions.
     """
     tool_breakdown = [
         ToolCount(tool_name=t["tool_name"], count=t["count"])
         for t in tool_usage
     ]
 
-    files_modified = sorted(
-        {
-            f["file_path"]
-            for f in files_touched
-            if f["edit_count"] > 0 or f["write_count"] > 0
-        }
-    )
-    files_read = sorted(
-        {f["file_path"] for f in files_touched if f["read_count"] > 0}
-    )
+    if partition is None:
+        partition = partition_files(files_touched)
+    files_modified = partition.files_modified
+    files_read = partition.files_read
 
     return SessionSummary(
         provider=session.get("provider") or "claude",
@@ -212,104 +282,127 @@ def analyze_summary(
 
 
 def _categorize_message(msg: dict) -> str:
-    """Determine cost category for a single message."""
+    """Determine cost category for a single message.
+
+    Ingest stores the leading tool in first_tool, so the common case is one
+    dict lookup with no parsing. tool_names is only split when the leading
+    tool has no category of its own.
+    """
     if msg["role"] != "assistant":
-        return "system_overhead"
+        return _SYSTEM_OVERHEAD
 
-    tool_names_str = msg.get("tool_names")
+    tool_names_str = msg["tool_names"]
     if not tool_names_str:
-        return "system_overhead"
+        return _SYSTEM_OVERHEAD
+
+    category = TOOL_CATEGORIES.get(msg.get("first_tool") or tool_names_str)
+    if category is not None:
+        return category
+    if "," not in tool_names_str:
+        return _ORCHESTRATION
+    return _categorize_tool_names(tool_names_str)
+
 
-    tools = [t.strip() for t in tool_names_str.split(",")]
-    for tool in tools:
+@lru_cache(maxsize=512)
+def _categorize_tool_names(tool_names_str: str) -> str:
+    """Category of the first known tool in a multi-tool tool_names value.
+
+    A session repeats a handful of tool_names strings, so each distinct value
+    is split and looked up once.
+    """
+    for tool in tool_names_str.split(","):
         category = TOOL_CATEGORIES.get(tool)
         if category:
             return category
 
-    return "orchestration"
+    return _ORCHESTRATION
+
+
+def _sum_tokens_by_tools(messages: list[dict]) -> list[dict]:
+    """Group message tokens by (role, tool_names), mirroring the SQL rollup."""
+    groups: dict[tuple[str, str | None], dict] = {}
+    for msg in messages:
+        key = (msg["role"], msg.get("tool_names"))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "role": key[0],
+                "tool_names": key[1],
+                "first_tool": msg.get("first_tool"),
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cache_read_tokens": 0,
+                "cache_creation_tokens": 0,
+            }
+        group["input_tokens"] += msg["input_tokens"]
+        group["output_tokens"] += msg["output_tokens"]
+        group["cache_read_tokens"] += msg["cache_read_tokens"]
+        group["cache_creation_tokens"] += msg["cache_creation_tokens"]
+    return list(groups.values())
 
 
 def analyze_cost(
     session: dict,
     messages: list[dict],
-    tool_calls: list[dict],
+    tool_token_totals: list[dict] | None = None,
 ) -> CostAnalysis:
     """Section 2: cost breakdown by category.
 
-    Categorizes each message based on its tool_names field, aggregates tokens
-    per category, computes cost per category, finds top 5 expensive turns,
-    and calculates cache efficiency.
+    Categorizes token totals by tool_names, computes cost per category, finds
+    top 5 expensive turns, and calculates cache efficiency. tool_token_totals
+    is the pre-grouped rollup from get_session_token_totals_by_tools; when
+    omitted it is derived from messages.
     """
     provider = session.get("provider") or "claude"
     session_model = _first_model(messages)
 
-    # Accumulate tokens per category
-    cat_tokens: dict[str, dict[str, int]] = {}
-    all_categories = (
-        "file_reads", "code_generation", "execution",
-        "orchestration", "system_overhead",
-    )
-    for cat_name in all_categories:
-        cat_tokens[cat_name] = {
-            "input_tokens": 0,
-            "output_tokens": 0,
-            "cache_read_tokens": 0,
-            "cache_creation_tokens": 0,
-        }
-
-    # Per-turn cost tracking for expensive turns
-    turn_costs: list[ExpensiveTurn] = []
-
-    for i, msg in enumerate(messages):
-        category = _categorize_message(msg)
-        cat_tokens[category]["input_tokens"] += msg.get("input_tokens", 0) or 0
-        cat_tokens[category]["output_tokens"] += msg.get("output_tokens", 0) or 0
-        cat_tokens[category]["cache_read_tokens"] += msg.get("cache_read_tokens", 0) or 0
-        cat_tokens[category]["cache_creation_tokens"] += msg.get("cache_creation_tokens", 0) or 0
-
-        turn_cost = estimate_cost(
-            msg.get("input_tokens", 0) or 0,
-            msg.get("output_tokens", 0) or 0,
-            msg.get("cache_read_tokens", 0) or 0,
-            msg.get("cache_creation_tokens", 0) or 0,
-            model=msg.get("model") or session_model,
-            provider=provider,
-        )
-        turn_costs.append(
-            ExpensiveTurn(
-                turn_number=i + 1,
-                role=msg["role"],
-                tool_names=msg.get("tool_names"),
-                input_tokens=msg.get("input_tokens", 0) or 0,
-                output_tokens=msg.get("output_tokens", 0) or 0,
-                cache_read_tokens=msg.get("cache_read_tokens", 0) or 0,
-                cache_creation_tokens=msg.get("cache_creation_tokens", 0) or 0,
-                estimated_cost_usd=turn_cost,
+    # Accumulate tokens per category in one flat list: input, output,
+    # cache_read, cache_creation for each category in _COST_CATEGORIES order
+    acc = [0] * (len(_COST_CATEGORIES) * 4)
+    if tool_token_totals is None:
+        tool_token_totals = _sum_tokens_by_tools(messages)
+    for group in tool_token_totals:
+        base = _CATEGORY_INDEX[_categorize_message(group)]
+        acc[base] += group["input_tokens"]
+        acc[base + 1] += group["output_tokens"]
+        acc[base + 2] += group["cache_read_tokens"]
+        acc[base + 3] += group["cache_creation_tokens"]
+
+    # Per-turn costs in a flat double buffer; ExpensiveTurn objects are only
+    # built for the top 5
+    turn_costs = array(
+        "d",
+        (
+            estimate_cost(
+                msg["input_tokens"],
+                msg["output_tokens"],
+                msg["cache_read_tokens"],
+                msg["cache_creation_tokens"],
+                model=msg.get("model") or session_model,
+                provider=provider,
             )
-        )
+            for msg in messages
+        ),
+    )
 
     # Compute total cost from session (authoritative)
     total_cost = session["estimated_cost_usd"]
 
     # Build CostCategory list, then compute percentages from category sum
     categories: list[CostCategory] = []
-    for cat_name, tokens in cat_tokens.items():
-        cat_cost = estimate_cost(
-            tokens["input_tokens"],
-            tokens["output_tokens"],
-            tokens["cache_read_tokens"],
-            tokens["cache_creation_tokens"],
-            model=session_model,
-            provider=provider,
-        )
+    for cat_name in _COST_CATEGORIES:
+        base = _CATEGORY_INDEX[cat_name]
+        inp, out, cr, cc = acc[base:base + 4]
         categories.append(
             CostCategory(
                 category=cat_name,
-                input_tokens=tokens["input_tokens"],
-                output_tokens=tokens["output_tokens"],
-                cache_read_tokens=tokens["cache_read_tokens"],
-                cache_creation_tokens=tokens["cache_creation_tokens"],
-                estimated_cost_usd=cat_cost,
+                input_tokens=inp,
+                output_tokens=out,
+                cache_read_tokens=cr,
+                cache_creation_tokens=cc,
+                estimated_cost_usd=estimate_cost(
+                    inp, out, cr, cc, model=session_model, provider=provider
+                ),
                 percentage=0.0,  # will be set below
             )
         )
@@ -327,8 +420,21 @@ def analyze_cost(
     # Sort categories by cost descending
     categories.sort(key=lambda c: c.estimated_cost_usd, reverse=True)
 
-    # Top 5 most expensive turns
-    most_expensive = sorted(turn_costs, key=lambda t: t.estimated_cost_usd, reverse=True)[:5]
+    # Top 5 most expensive turns (nlargest keeps sorted()'s tie order)
+    top_indices = heapq.nlargest(5, range(len(turn_costs)), key=turn_costs.__getitem__)
+    most_expensive = [
+        ExpensiveTurn(
+            turn_number=i + 1,
+            role=messages[i]["role"],
+            tool_names=messages[i].get("tool_names"),
+            input_tokens=messages[i]["input_tokens"],
+            output_tokens=messages[i]["output_tokens"],
+            cache_read_tokens=messages[i]["cache_read_tokens"],
+            cache_creation_tokens=messages[i]["cache_creation_tokens"],
+            estimated_cost_usd=turn_costs[i],
+        )
+        for i in top_indices
+    ]
 
     # Cache efficiency
     total_input = session["total_input_tokens"]
@@ -370,14 +476,21 @@ def analyze_context(messages: list[dict]) -> ContextAnalysis:
     detects compaction events (>50% drop from previous when previous >100K),
     computes peak, utilization %, and average.
     """
-    # Filter to assistant messages with meaningful input_tokens
-    assistant_msgs = [
-        m for m in messages if m["role"] == "assistant"
-    ]
+    # Context size per assistant turn — total context = input + cache_read +
+    # cache_creation. Kept as a flat int64 buffer; ContextPoint objects are
+    # only built when a consumer asks for context_curve.
+    context_tokens = array(
+        "q",
+        (
+            msg["input_tokens"] + msg["cache_read_tokens"] + msg["cache_creation_tokens"]
+            for msg in messages
+            if msg["role"] == "assistant"
+        ),
+    )
 
-    if not assistant_msgs:
+    if not context_tokens:
         return ContextAnalysis(
-            context_curve=[],
+            context_tokens=context_tokens,
             peak_context_tokens=0,
             estimated_compaction_count=0,
             compaction_events=[],
@@ -385,45 +498,34 @@ def analyze_context(messages: list[dict]) -> ContextAnalysis:
             avg_input_tokens_per_turn=0,
         )
 
-    # Build context curve — total context = input + cache_read + cache_creation
-    context_curve: list[ContextPoint] = []
-    for i, msg in enumerate(assistant_msgs):
-        tokens = (
-            (msg.get("input_tokens", 0) or 0)
-            + (msg.get("cache_read_tokens", 0) or 0)
-            + (msg.get("cache_creation_tokens", 0) or 0)
-        )
-        context_curve.append(
-            ContextPoint(
-                turn_number=i + 1,
-                cumulative_input_tokens=tokens,
-                role=msg["role"],
-            )
-        )
-
-    # Detect compaction events
+    # One walk over the buffer: detect compaction events between adjacent
+    # turns while accumulating the peak and the running total.
     compaction_events: list[CompactionEvent] = []
-    for i in range(1, len(context_curve)):
-        prev_tokens = context_curve[i - 1].cumulative_input_tokens
-        curr_tokens = context_curve[i].cumulative_input_tokens
-        if prev_tokens > 100_000 and curr_tokens < prev_tokens * 0.5:
+    prev_tokens = peak = total = context_tokens[0]
+    for turn_number in range(2, len(context_tokens) + 1):
+        curr_tokens = context_tokens[turn_number - 1]
+        total += curr_tokens
+        if curr_tokens > peak:
+            peak = curr_tokens
+        if (
+            prev_tokens > COMPACTION_MIN_TOKENS
+            and curr_tokens < prev_tokens * COMPACTION_DROP_RATIO
+        ):
             compaction_events.append(
                 CompactionEvent(
-                    turn_number=context_curve[i].turn_number,
+                    turn_number=turn_number,
                     tokens_before=prev_tokens,
                     tokens_after=curr_tokens,
                     estimated_tokens_lost=prev_tokens - curr_tokens,
                 )
             )
+        prev_tokens = curr_tokens
 
-    # Stats
-    input_values = [p.cumulative_input_tokens for p in context_curve]
-    peak = max(input_values)
     utilization = peak / CONTEXT_WINDOW
-    avg = int(mean(input_values))
+    avg = total // len(context_tokens)
 
     return ContextAnalysis(
-        context_curve=context_curve,
+        context_tokens=context_tokens,
         peak_context_tokens=peak,
         estimated_compaction_count=len(compaction_events),
         compaction_events=compaction_events,
@@ -455,10 +557,13 @@ def analyze_suggestions(
     compaction_count: int,
     tool_call_count: int,
     provider: str = "claude",
+    partition: FilePartition | None = None,
+    repeated_reads: list[dict] | None = None,
 ) -> SuggestionsReport:
     """Section 4: project instruction suggestions.
 
-    Delegates to the suggestions rules engine.
+    Delegates to the suggestions rules engine. repeated_reads is passed
+    through from get_session_repeated_reads when the caller has it.
     """
     from aide.autopsy.suggestions import generate_suggestions
 
@@ -469,26 +574,16 @@ def analyze_suggestions(
         compaction_count,
         tool_call_count,
         instruction_target=instruction_target,
+        repeated_reads=repeated_reads,
     )
 
-    # Build FileAccessCount list for top accessed and repeated reads
-    file_access_counts = [
-        FileAccessCount(
-            file_path=f["file_path"],
-            read_count=f["read_count"],
-            edit_count=f["edit_count"],
-            write_count=f["write_count"],
-            total=f["total"],
-        )
-        for f in files_touched
-    ]
-
-    top_accessed = file_access_counts[:5]
-    repeated_reads = [f for f in file_access_counts if f.read_count >= 3]
+    # FileAccessCount views for top accessed and repeated reads
+    if partition is None:
+        partition = partition_files(files_touched)
 
     return SuggestionsReport(
         instruction_target=instruction_target,
         suggestions=suggestions,
-        top_accessed_files=top_accessed,
-        repeated_read_files=repeated_reads,
+        top_accessed_files=partition.file_access_counts[:5],
+        repeated_read_files=partition.repeated_reads,
     )
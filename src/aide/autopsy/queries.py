@@ -2,24 +2,57 @@
 
 from __future__ import annotations
 
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 from aide.db import get_connection
 
 
+@contextmanager
+def session_queries(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """Open one read connection to share across the autopsy query functions.
+
+    Pass the yielded connection as ``con=`` so a full autopsy pays connection
+    setup and schema loading once instead of once per query.
+    """
+    con = get_connection(db_path)
+    try:
+        yield con
+    finally:
+        con.close()
+
+
+@contextmanager
+def _borrow_connection(
+    db_path: Path,
+    con: sqlite3.Connection | None,
+) -> Iterator[sqlite3.Connection]:
+    """Yield the caller's connection, or open and close a private one."""
+    if con is not None:
+        yield con
+        return
+    own = get_connection(db_path)
+    try:
+        yield own
+    finally:
+        own.close()
+
+
 def get_session(
     db_path: Path,
     session_id: str,
     provider: str | None = None,
+    con: sqlite3.Connection | None = None,
 ) -> dict | None:
     """Fetch a single session by session_id.
 
     Returns dict of session columns or None if not found.
     """
-    con = get_connection(db_path)
-    try:
+    with _borrow_connection(db_path, con) as conn:
         if provider is None:
-            row = con.execute(
+            row = conn.execute(
                 """SELECT * FROM sessions
                 WHERE session_id = ?
                 ORDER BY CASE WHEN provider = 'claude' THEN 0 ELSE 1 END
@@ -27,78 +60,108 @@ def get_session(
                 (session_id,),
             ).fetchone()
         else:
-            row = con.execute(
+            row = conn.execute(
                 "SELECT * FROM sessions WHERE provider = ? AND session_id = ?",
                 (provider, session_id),
             ).fetchone()
         if row is None:
             return None
         return dict(row)
-    finally:
-        con.close()
 
 
-def get_session_messages(
+def iter_session_messages(
     db_path: Path,
     session_id: str,
     provider: str = "claude",
-) -> list[dict]:
-    """Fetch all messages for a session, ordered by timestamp."""
-    con = get_connection(db_path)
-    try:
-        rows = con.execute(
-            """SELECT * FROM messages
+    con: sqlite3.Connection | None = None,
+) -> Iterator[dict]:
+    """Yield messages for a session one at a time, ordered by timestamp.
+
+    Rows are converted straight off the cursor, so no intermediate list of
+    sqlite3.Row objects is held. Token columns are coalesced to 0 so
+    analyzers can index them directly.
+    """
+    with _borrow_connection(db_path, con) as conn:
+        cursor = conn.execute(
+            """SELECT
+                id, provider, session_id, message_uuid, parent_uuid, role, type,
+                timestamp,
+                COALESCE(input_tokens, 0) AS input_tokens,
+                COALESCE(output_tokens, 0) AS output_tokens,
+                COALESCE(cache_read_tokens, 0) AS cache_read_tokens,
+                COALESCE(cache_creation_tokens, 0) AS cache_creation_tokens,
+                content_length, has_tool_use, tool_names, first_tool, model,
+                stop_reason, prompt_length
+            FROM messages
             WHERE provider = ? AND session_id = ?
             ORDER BY timestamp""",
             (provider, session_id),
-        ).fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        con.close()
+        )
+        for row in cursor:
+            yield dict(row)
+
+
+def get_session_messages(
+    db_path: Path,
+    session_id: str,
+    provider: str = "claude",
+    con: sqlite3.Connection | None = None,
+) -> list[dict]:
+    """Fetch all messages for a session, ordered by timestamp."""
+    return list(iter_session_messages(db_path, session_id, provider=provider, con=con))
 
 
 def get_session_tool_calls(
     db_path: Path,
     session_id: str,
     provider: str = "claude",
+    con: sqlite3.Connection | None = None,
 ) -> list[dict]:
     """Fetch all tool calls for a session, ordered by timestamp."""
-    con = get_connection(db_path)
-    try:
-        rows = con.execute(
+    with _borrow_connection(db_path, con) as conn:
+        rows = conn.execute(
             """SELECT * FROM tool_calls
             WHERE provider = ? AND session_id = ?
             ORDER BY timestamp""",
             (provider, session_id),
         ).fetchall()
         return [dict(r) for r in rows]
-    finally:
-        con.close()
 
 
 def get_session_tool_usage(
     db_path: Path,
     session_id: str,
     provider: str = "claude",
+    con: sqlite3.Connection | None = None,
 ) -> list[dict]:
     """Aggregate tool call counts for a session, sorted by count descending."""
-    con = get_connection(db_path)
-    try:
-        rows = con.execute(
+    with _borrow_connection(db_path, con) as conn:
+        rows = conn.execute(
             "SELECT tool_name, COUNT(*) as count FROM tool_calls "
             "WHERE provider = ? AND session_id = ? "
             "GROUP BY tool_name ORDER BY count DESC",
             (provider, session_id),
         ).fetchall()
         return [dict(r) for r in rows]
-    finally:
-        con.close()
+
+
+_FILES_TOUCHED_SQL = """SELECT
+    file_path,
+    SUM(CASE WHEN tool_name IN ('Read', 'Glob', 'Grep')
+        THEN 1 ELSE 0 END) AS read_count,
+    SUM(CASE WHEN tool_name = 'Edit' THEN 1 ELSE 0 END) AS edit_count,
+    SUM(CASE WHEN tool_name = 'Write' THEN 1 ELSE 0 END) AS write_count,
+    COUNT(*) AS total
+FROM tool_calls
+WHERE provider = ? AND session_id = ? AND file_path IS NOT NULL
+GROUP BY file_path"""
 
 
 def get_session_files_touched(
     db_path: Path,
     session_id: str,
     provider: str = "claude",
+    con: sqlite3.Connection | None = None,
 ) -> list[dict]:
     """Aggregate file access patterns for a session.
 
@@ -110,22 +173,105 @@ def get_session_files_touched(
     Returns list of dicts with file_path, read_count, edit_count, write_count, total.
     Only includes rows where file_path IS NOT NULL. Sorted by total desc.
     """
-    con = get_connection(db_path)
-    try:
-        rows = con.execute(
+    with _borrow_connection(db_path, con) as conn:
+        rows = conn.execute(
+            f"{_FILES_TOUCHED_SQL}\nORDER BY total DESC",
+            (provider, session_id),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def get_session_repeated_reads(
+    db_path: Path,
+    session_id: str,
+    provider: str = "claude",
+    min_reads: int = 3,
+    limit: int = 10,
+    con: sqlite3.Connection | None = None,
+) -> list[dict]:
+    """Files read at least min_reads times, most-read first, capped at limit.
+
+    Same row shape as get_session_files_touched; feeds the repeated_reads
+    suggestion rule without a Python-side filter and sort.
+    """
+    with _borrow_connection(db_path, con) as conn:
+        rows = conn.execute(
+            f"""{_FILES_TOUCHED_SQL}
+            HAVING read_count >= ?
+            ORDER BY read_count DESC, total DESC
+            LIMIT ?""",
+            (provider, session_id, min_reads, limit),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def get_session_token_totals_by_tools(
+    db_path: Path,
+    session_id: str,
+    provider: str = "claude",
+    con: sqlite3.Connection | None = None,
+) -> list[dict]:
+    """Sum message tokens per (role, tool_names) combination for a session.
+
+    Sessions repeat a small set of tool_names strings across many turns, so
+    grouping in SQL lets the analyzer categorize each combination once
+    instead of walking every message row.
+    """
+    with _borrow_connection(db_path, con) as conn:
+        rows = conn.execute(
             """SELECT
-                file_path,
-                SUM(CASE WHEN tool_name IN ('Read', 'Glob', 'Grep')
-                    THEN 1 ELSE 0 END) AS read_count,
-                SUM(CASE WHEN tool_name = 'Edit' THEN 1 ELSE 0 END) AS edit_count,
-                SUM(CASE WHEN tool_name = 'Write' THEN 1 ELSE 0 END) AS write_count,
-                COUNT(*) AS total
-            FROM tool_calls
-            WHERE provider = ? AND session_id = ? AND file_path IS NOT NULL
-            GROUP BY file_path
-            ORDER BY total DESC""",
+                role,
+                tool_names,
+                MIN(first_tool) AS first_tool,
+                COALESCE(SUM(input_tokens), 0) AS input_tokens,
+                COALESCE(SUM(output_tokens), 0) AS output_tokens,
+                COALESCE(SUM(cache_read_tokens), 0) AS cache_read_tokens,
+                COALESCE(SUM(cache_creation_tokens), 0) AS cache_creation_tokens
+            FROM messages
+            WHERE provider = ? AND session_id = ?
+            GROUP BY role, tool_names""",
             (provider, session_id),
         ).fetchall()
         return [dict(r) for r in rows]
-    finally:
-        con.close()
+
+
+def get_session_autopsy_bundle(
+    db_path: Path,
+    session_id: str,
+    provider: str | None = None,
+) -> dict | None:
+    """Fetch everything the autopsy report needs in one read transaction.
+
+    Runs the individual session queries over one connection inside a single
+    BEGIN/COMMIT so they share one snapshot and one shared-lock acquisition.
+    Returns None when the session does not exist, otherwise a dict with keys
+    session, messages, tool_usage, files_touched, repeated_reads,
+    and tool_token_totals.
+    """
+    with session_queries(db_path) as con:
+        con.execute("BEGIN")
+        try:
+            session = get_session(db_path, session_id, provider=provider, con=con)
+            if session is None:
+                return None
+            provider = session["provider"]
+            return {
+                "session": session,
+                "messages": get_session_messages(
+                    db_path, session_id, provider=provider, con=con
+                ),
+                "tool_usage": get_session_tool_usage(
+                    db_path, session_id, provider=provider, con=con
+                ),
+                "files_touched": get_session_files_touched(
+                    db_path, session_id, provider=provider, con=con
+                ),
+                "repeated_reads": get_session_repeated_reads(
+                    db_path, session_id, provider=provider, con=con
+                ),
+                "tool_token_totals": get_session_token_totals_by_tools(
+                    db_path, session_id, provider=provider, con=con
+                ),
+            }
+        finally:
+            con.execute("COMMIT")
@@ -175,39 +175,38 @@ def _render_cost(cost: CostAnalysis) -> str:
 
 def _render_context_curve(context: ContextAnalysis) -> str:
     """Render ASCII bar chart of context utilization."""
-    if not context.context_curve:
-        return "No context data available."
-
-    curve = context.context_curve
+    tokens = context.context_tokens
     peak = context.peak_context_tokens
 
-    if peak == 0:
+    if not tokens or peak == 0:
         return "No context data available."
 
-    # Sample ~15 points from the curve
-    total_points = len(curve)
+    # Sample ~15 turns from the curve
+    total_points = len(tokens)
     if total_points <= 15:
-        sampled = curve
+        sampled = list(range(total_points))
     else:
         step = max(1, total_points // 15)
-        sampled = [curve[i] for i in range(0, total_points, step)]
+        sampled = list(range(0, total_points, step))
         # Always include the last point
-        if sampled[-1] != curve[-1]:
-            sampled.append(curve[-1])
+        if sampled[-1] != total_points - 1:
+            sampled.append(total_points - 1)
 
     # Compaction turn numbers for marking
     compaction_turns = {e.turn_number for e in context.compaction_events}
 
     bar_width = 20
     lines = []
-    for point in sampled:
-        ratio = point.cumulative_input_tokens / peak if peak > 0 else 0
+    for index in sampled:
+        turn_number = index + 1
+        point_tokens = tokens[index]
+        ratio = point_tokens / peak
         filled = int(ratio * bar_width)
         bar = "\u2588" * filled + "\u2591" * (bar_width - filled)
-        marker = " \u2190 compaction" if point.turn_number in compaction_turns else ""
+        marker = " \u2190 compaction" if turn_number in compaction_turns else ""
         lines.append(
-            f"Turn {point.turn_number:>3}: {bar} "
-            f"{_format_tokens(point.cumulative_input_tokens)}{marker}"
+            f"Turn {turn_number:>3}: {bar} "
+            f"{_format_tokens(point_tokens)}{marker}"
         )
 
     return "\n".join(lines)
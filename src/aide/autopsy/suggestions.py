@@ -15,14 +15,21 @@ def generate_suggestions(
     compaction_count: int,
     tool_call_count: int,
     instruction_target: str = "CLAUDE.md",
+    repeated_reads: list[dict] | None = None,
 ) -> list[ClaudeMdSuggestion]:
-    """Run all suggestion rules and return combined results."""
+    """Run all suggestion rules and return combined results.
+
+    repeated_reads is the pre-filtered, pre-sorted get_session_repeated_reads
+    result; when omitted it is derived from files_touched.
+    """
     suggestions: list[ClaudeMdSuggestion] = []
 
     # Rule 1: repeated_reads — files read 3+ times, capped at top 10
-    repeated = [f for f in files_touched if f["read_count"] >= 3]
-    repeated.sort(key=lambda f: f["read_count"], reverse=True)
-    for f in repeated[:10]:
+    if repeated_reads is None:
+        repeated_reads = [f for f in files_touched if f["read_count"] >= 3]
+        repeated_reads.sort(key=lambda f: f["read_count"], reverse=True)
+        repeated_reads = repeated_reads[:10]
+    for f in repeated_reads:
         suggestions.append(
             ClaudeMdSuggestion(
                 category="repeated_reads",
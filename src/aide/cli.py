@@ -2,26 +2,43 @@
 
 from __future__ import annotations
 
+import os
 import shutil
+from collections import deque
+from collections.abc import Iterator
+from contextlib import nullcontext
 from datetime import date, datetime, timedelta
+from itertools import islice
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
 
 from aide.config import AideConfig, LogSource, load_config
 from aide.db import (
+    checkpoint_db,
+    deferred_session_indexes,
     get_connection,
-    get_ingested_file,
+    get_ingested_mtimes,
     get_summary_stats,
     ingest_sessions,
     init_db,
-    log_ingestion,
     rebuild_daily_stats,
 )
 from aide.jobs import collect_launchd_job_statuses, format_timestamp
-from aide.providers import get_provider
 from aide.redaction import SUPPORTED_PROVIDERS, audit_redacted_path, redact_path
 
+if TYPE_CHECKING:
+    from aide.models import ParsedSession
+    from aide.providers import ProviderParser
+
+# Processes used to parse JSONL files during ingest; writes stay in the parent
+INGEST_PARSE_WORKERS = os.cpu_count() or 1
+# Parsed files held ahead of the writer; bounds memory when parsing outruns writes
+INGEST_PARSE_AHEAD = 16
+# Parsed files written per SQLite transaction
+INGEST_COMMIT_FILES = 16
+
 
 @click.group()
 def cli():
@@ -57,13 +74,50 @@ def resolve_ingest_sources(
     raise ValueError(f"Unsupported provider: {provider}")
 
 
+def _parse_files(
+    parse_file: ProviderParser,
+    paths: list[Path],
+) -> Iterator[list[ParsedSession]]:
+    """Yield parse_file(path) for each path in order, parsing in worker processes.
+
+    At most INGEST_PARSE_AHEAD files are in flight, so workers keep parsing
+    while the caller writes without piling up every parsed file in memory.
+    A single file is parsed inline; a pool isn't worth its startup cost.
+    """
+    if len(paths) < 2:
+        yield from map(parse_file, paths)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    remaining = iter(paths)
+    with ProcessPoolExecutor(max_workers=min(INGEST_PARSE_WORKERS, len(paths))) as pool:
+        in_flight = deque(
+            pool.submit(parse_file, path)
+            for path in islice(remaining, INGEST_PARSE_AHEAD)
+        )
+        while in_flight:
+            result = in_flight.popleft().result()
+            for path in islice(remaining, 1):
+                in_flight.append(pool.submit(parse_file, path))
+            yield result
+
+
 def ingest_source(
     db_path: Path,
     source: LogSource,
     full: bool,
     archive_raw: bool = False,
+    touched_dates: set[str] | None = None,
 ) -> dict:
-    """Ingest one configured source and return counters for CLI output."""
+    """Ingest one configured source and return counters for CLI output.
+
+    touched_dates, when given, collects the session dates written (see
+    ingest_sessions) so daily_stats can be refreshed incrementally.
+    """
+    # The parsers and multiprocessing are only needed here, so commands
+    # like stats and autopsy start without importing them
+    from aide.providers import get_provider
+
     adapter = get_provider(source.provider)
     archive_dir = db_path.parent / "archive" / source.provider
 
@@ -77,32 +131,46 @@ def ingest_source(
         "archived": 0,
     }
 
+    ingested_mtimes = {} if full else get_ingested_mtimes(db_path, provider=source.provider)
+    pending = []
     for file_path in jsonl_files:
-        file_key = str(file_path)
         file_stat = file_path.stat()
+        if ingested_mtimes.get(str(file_path)) == file_stat.st_mtime:
+            counters["skipped"] += 1
+            continue
+        pending.append((file_path, file_stat))
 
-        if not full:
-            existing = get_ingested_file(db_path, file_key, provider=source.provider)
-            if existing and existing["file_mtime"] == file_stat.st_mtime:
-                counters["skipped"] += 1
-                continue
-
-        sessions = adapter.parse_file(file_path)
+    # Parse in worker processes; SQLite writes stay in this process, in file
+    # order, one transaction per INGEST_COMMIT_FILES files
+    parsed = zip(
+        pending,
+        _parse_files(adapter.parse_file, [file_path for file_path, _ in pending]),
+    )
+    while batch := list(islice(parsed, INGEST_COMMIT_FILES)):
+        sessions = [s for _, file_sessions in batch for s in file_sessions]
         if sessions:
-            count = ingest_sessions(db_path, sessions)
-            log_ingestion(
+            counters["ingested"] += ingest_sessions(
                 db_path,
-                file_key,
-                file_stat.st_size,
-                file_stat.st_mtime,
-                count,
-                provider=source.provider,
+                sessions,
+                touched_dates=touched_dates,
+                skip_unchanged=not full,
+                log_entries=[
+                    (
+                        source.provider,
+                        str(file_path),
+                        file_stat.st_size,
+                        file_stat.st_mtime,
+                        len(file_sessions),
+                    )
+                    for (file_path, file_stat), file_sessions in batch
+                    if file_sessions
+                ],
             )
-            counters["ingested"] += count
 
         if archive_raw:
-            archive_jsonl(file_path, source.path, archive_dir)
-            counters["archived"] += 1
+            for (file_path, _), _ in batch:
+                archive_jsonl(file_path, source.path, archive_dir)
+                counters["archived"] += 1
 
     return counters
 
@@ -426,11 +494,18 @@ def ingest(
         click.echo("No log sources configured.")
         return
 
-    results = [
-        ingest_source(db_path, item, full=full, archive_raw=archive_raw)
-        for item in sources
-    ]
-    rebuild_daily_stats(db_path)
+    touched_dates: set[str] = set()
+    # A full re-ingest rewrites every session; rebuild reporting indexes once
+    with deferred_session_indexes(db_path) if full else nullcontext():
+        results = [
+            ingest_source(
+                db_path, item, full=full, archive_raw=archive_raw, touched_dates=touched_dates
+            )
+            for item in sources
+        ]
+    # --full rebuilds everything; otherwise only the dates this run wrote
+    rebuild_daily_stats(db_path, touched_dates=None if full else touched_dates)
+    checkpoint_db(db_path)
 
     total_ingested = sum(r["ingested"] for r in results)
     total_files = sum(r["files"] for r in results)
@@ -486,13 +561,13 @@ def stats(project: str | None):
 
     if project:
         match = [
-            p for p in summary["sessions_by_project"] if p["project_name"] == project
+            p for p in summary["sessions_by_project"] if p.project_name == project
         ]
         if match:
             p = match[0]
             click.echo(
-                f"\n{p['project_name']}: {p['session_count']} sessions, "
-                f"${p['total_cost']:.2f} {cost_label}"
+                f"\n{p.project_name}: {p.session_count} sessions, "
+                f"${p.total_cost:.2f} {cost_label}"
             )
         else:
             click.echo(f"\nNo data for project '{project}'.")
@@ -500,8 +575,8 @@ def stats(project: str | None):
         click.echo("\nBy project:")
         for p in summary["sessions_by_project"]:
             click.echo(
-                f"  {p['project_name']}: {p['session_count']} sessions, "
-                f"${p['total_cost']:.2f}"
+                f"  {p.project_name}: {p.session_count} sessions, "
+                f"${p.total_cost:.2f}"
             )
 
 
@@ -798,29 +873,27 @@ def autopsy(session_id: str, provider: str | None):
         analyze_cost,
         analyze_suggestions,
         analyze_summary,
+        partition_files,
     )
-    from aide.autopsy.queries import (
-        get_session,
-        get_session_files_touched,
-        get_session_messages,
-        get_session_tool_calls,
-        get_session_tool_usage,
-    )
+    from aide.autopsy.queries import get_session_autopsy_bundle
     from aide.autopsy.report import render_report
 
-    session = get_session(db_path, session_id, provider=provider)
-    if session is None:
+    bundle = get_session_autopsy_bundle(db_path, session_id, provider=provider)
+    if bundle is None:
         click.echo(f"Session '{session_id}' not found.", err=True)
         raise SystemExit(1)
+    session = bundle["session"]
     provider = session["provider"]
+    messages = bundle["messages"]
+    files_touched = bundle["files_touched"]
 
-    messages = get_session_messages(db_path, session_id, provider=provider)
-    tool_calls = get_session_tool_calls(db_path, session_id, provider=provider)
-    tool_usage = get_session_tool_usage(db_path, session_id, provider=provider)
-    files_touched = get_session_files_touched(db_path, session_id, provider=provider)
-
-    summary = analyze_summary(session, tool_usage, files_touched)
-    cost_analysis = analyze_cost(session, messages, tool_calls)
+    partition = partition_files(files_touched)
+    summary = analyze_summary(
+        session, bundle["tool_usage"], files_touched, partition=partition
+    )
+    cost_analysis = analyze_cost(
+        session, messages, tool_token_totals=bundle["tool_token_totals"]
+    )
     context = analyze_context(messages)
     suggestions = analyze_suggestions(
         files_touched,
@@ -828,6 +901,8 @@ def autopsy(session_id: str, provider: str | None):
         context.estimated_compaction_count,
         session["tool_call_count"],
         provider=provider,
+        partition=partition,
+        repeated_reads=bundle["repeated_reads"],
     )
 
     report = render_report(summary, cost_analysis, context, suggestions)
@@ -8,26 +8,32 @@ migration.
 
 from __future__ import annotations
 
-import json
 import re
 import shlex
 from collections import Counter, defaultdict
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 from aide.cost import estimate_cost
 from aide.models import ParsedMessage, ParsedSession, ToolCall
-from aide.parser import _compute_work_blocks, _parse_timestamp
+from aide.parser import (
+    _BY_TIMESTAMP,
+    _EDIT_TOOLS,
+    _compute_work_blocks,
+    _content_digest,
+    _intern,
+    _iter_jsonl,
+    _json_loads,
+    _parse_timestamp,
+    _walk_jsonl,
+)
 
 
 def discover_codex_jsonl_files(log_dir: Path) -> list[Path]:
     """Find Codex session JSONL files."""
-    log_dir = Path(log_dir)
-    if not log_dir.exists():
-        return []
-    results = sorted(log_dir.rglob("*.jsonl"))
-    return [path for path in results if "subagents" not in path.parts]
+    return sorted(_walk_jsonl(log_dir))
 
 
 def parse_codex_jsonl_file(file_path: Path) -> list[ParsedSession]:
@@ -52,143 +58,151 @@ def parse_codex_jsonl_file(file_path: Path) -> list[ParsedSession]:
     project_candidates: Counter[str] = Counter()
     model: str | None = None
 
-    with open(file_path) as f:
-        for index, line in enumerate(f):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                continue
+    digest = _content_digest(file_path)
 
-            timestamp = _parse_timestamp(data.get("timestamp", ""))
-            started_at = started_at or timestamp
-            payload = data.get("payload") or {}
-            if not isinstance(payload, dict):
-                continue
-
-            payload_type = payload.get("type") or data.get("type", "")
+    for index, data in _iter_jsonl(file_path, digest):
+        timestamp = _parse_timestamp(data.get("timestamp", ""))
+        started_at = started_at or timestamp
+        payload = data.get("payload") or {}
+        if not isinstance(payload, dict):
+            continue
 
-            if data.get("type") == "session_meta":
-                session_id = payload.get("id") or session_id
-                cwd = payload.get("cwd") or cwd
-                _add_project_candidate(project_candidates, payload.get("cwd"))
-                model = payload.get("model") or model
-                continue
+        payload_type = _intern(payload.get("type") or data.get("type", ""))
 
-            if payload_type == "turn_context":
-                cwd = payload.get("cwd") or cwd
-                _add_project_candidate(project_candidates, payload.get("cwd"))
-                model = payload.get("model") or model
-                approval = payload.get("approval_policy")
-                sandbox = payload.get("sandbox_policy")
-                if approval:
-                    approval_policies.append(str(approval))
-                if sandbox:
-                    sandbox_policies.append(_policy_name(sandbox))
-                continue
+        if data.get("type") == "session_meta":
+            session_id = payload.get("id") or session_id
+            cwd = payload.get("cwd") or cwd
+            _add_project_candidate(project_candidates, payload.get("cwd"))
+            model = payload.get("model") or model
+            continue
 
-            if payload_type == "token_count":
-                info = payload.get("info") or {}
-                total_usage = info.get("total_token_usage") or {}
-                if isinstance(total_usage, dict):
-                    token_totals = {
-                        "input_tokens": _int(total_usage.get("input_tokens")),
-                        "output_tokens": _int(total_usage.get("output_tokens")),
-                        "cached_input_tokens": _int(total_usage.get("cached_input_tokens")),
-                        "reasoning_output_tokens": _int(
-                            total_usage.get("reasoning_output_tokens")
-                        ),
-                        "total_tokens": _int(total_usage.get("total_tokens")),
-                    }
-                    peak_context_tokens = max(
-                        peak_context_tokens,
-                        _int(info.get("model_context_window")),
-                        token_totals["total_tokens"],
-                    )
-                continue
+        if payload_type == "turn_context":
+            cwd = payload.get("cwd") or cwd
+            _add_project_candidate(project_candidates, payload.get("cwd"))
+            model = payload.get("model") or model
+            approval = payload.get("approval_policy")
+            sandbox = payload.get("sandbox_policy")
+            if approval:
+                approval_policies.append(str(approval))
+            if sandbox:
+                sandbox_policies.append(_policy_name(sandbox))
+            continue
 
-            if payload_type in {"user_message", "agent_message", "message"}:
-                role = _message_role(payload_type, payload)
-                content_length = _content_length(payload)
-                messages.append(
-                    ParsedMessage(
-                        uuid=f"{file_path.stem}:{index}",
-                        parent_uuid=None,
-                        session_id=session_id,
-                        timestamp=timestamp,
-                        role=role,
-                        type=payload_type,
-                        input_tokens=0,
-                        output_tokens=0,
-                        cache_read_tokens=0,
-                        cache_creation_tokens=0,
-                        model=model,
-                        content_length=content_length,
-                        prompt_length=content_length if role == "user" else 0,
-                    )
+        if payload_type == "token_count":
+            info = payload.get("info") or {}
+            total_usage = info.get("total_token_usage") or {}
+            if isinstance(total_usage, dict):
+                token_totals = {
+                    "input_tokens": _int(total_usage.get("input_tokens")),
+                    "output_tokens": _int(total_usage.get("output_tokens")),
+                    "cached_input_tokens": _int(total_usage.get("cached_input_tokens")),
+                    "reasoning_output_tokens": _int(
+                        total_usage.get("reasoning_output_tokens")
+                    ),
+                    "total_tokens": _int(total_usage.get("total_tokens")),
+                }
+                peak_context_tokens = max(
+                    peak_context_tokens,
+                    _int(info.get("model_context_window")),
+                    token_totals["total_tokens"],
                 )
-                continue
+            continue
 
-            if payload_type == "function_call":
-                args = _json_object(payload.get("arguments"))
-                cwd = cwd or _workdir_from_args(args)
-                _add_project_candidate(project_candidates, _workdir_from_args(args))
-                tc = _tool_call_from_function_payload(payload, timestamp, args=args)
-                if tc is None:
-                    continue
-                _add_project_candidate(project_candidates, tc.file_path)
-                _add_command_project_candidates(project_candidates, tc.command)
-                tool_calls_by_id[payload.get("call_id", f"{index}")] = tc
-                messages.append(
-                    ParsedMessage(
-                        uuid=f"{file_path.stem}:{index}",
-                        parent_uuid=None,
-                        session_id=session_id,
-                        timestamp=timestamp,
-                        role="assistant",
-                        type="function_call",
-                        input_tokens=0,
-                        output_tokens=0,
-                        cache_read_tokens=0,
-                        cache_creation_tokens=0,
-                        model=model,
-                        content_length=0,
-                        tool_calls=[tc],
-                    )
+        if payload_type in {"user_message", "agent_message", "message"}:
+            role = _intern(_message_role(payload_type, payload))
+            content_length = _content_length(payload)
+            messages.append(
+                ParsedMessage(
+                    uuid=f"{file_path.stem}:{index}",
+                    parent_uuid=None,
+                    session_id=session_id,
+                    timestamp=timestamp,
+                    role=role,
+                    type=payload_type,
+                    input_tokens=0,
+                    output_tokens=0,
+                    cache_read_tokens=0,
+                    cache_creation_tokens=0,
+                    model=model,
+                    content_length=content_length,
+                    prompt_length=content_length if role == "user" else 0,
                 )
-                continue
+            )
+            continue
 
-            if payload_type == "function_call_output":
-                call_id = payload.get("call_id")
-                output = payload.get("output")
-                if call_id in tool_calls_by_id and _output_looks_error(output):
-                    tool_calls_by_id[call_id].is_error = True
+        if payload_type == "function_call":
+            args = _json_object(payload.get("arguments"))
+            cwd = cwd or _workdir_from_args(args)
+            _add_project_candidate(project_candidates, _workdir_from_args(args))
+            tc = _tool_call_from_function_payload(payload, timestamp, args=args)
+            if tc is None:
                 continue
+            _add_project_candidate(project_candidates, tc.file_path)
+            _add_command_project_candidates(project_candidates, tc.command)
+            tool_calls_by_id[payload.get("call_id", f"{index}")] = tc
+            messages.append(
+                ParsedMessage(
+                    uuid=f"{file_path.stem}:{index}",
+                    parent_uuid=None,
+                    session_id=session_id,
+                    timestamp=timestamp,
+                    role="assistant",
+                    type="function_call",
+                    input_tokens=0,
+                    output_tokens=0,
+                    cache_read_tokens=0,
+                    cache_creation_tokens=0,
+                    model=model,
+                    content_length=0,
+                    tool_calls=[tc],
+                )
+            )
+            continue
 
-            if payload_type == "exec_command_end":
-                cwd = cwd or payload.get("cwd")
-                _add_project_candidate(project_candidates, payload.get("cwd"))
-                call_id = payload.get("call_id")
-                if call_id in tool_calls_by_id:
-                    tc = tool_calls_by_id[call_id]
-                    exit_code = payload.get("exit_code")
-                    tc.is_error = exit_code not in (0, None)
-                    if tc.file_path is None:
-                        tc.file_path = _file_path_from_parsed_cmd(payload.get("parsed_cmd"))
-                    _apply_parsed_cmd_semantics(tc, payload.get("parsed_cmd"))
-                    _add_project_candidate(project_candidates, tc.file_path)
-                continue
+        if payload_type == "function_call_output":
+            call_id = payload.get("call_id")
+            output = payload.get("output")
+            if call_id in tool_calls_by_id and _output_looks_error(output):
+                tool_calls_by_id[call_id].is_error = True
+            continue
+
+        if payload_type == "exec_command_end":
+            cwd = cwd or payload.get("cwd")
+            _add_project_candidate(project_candidates, payload.get("cwd"))
+            call_id = payload.get("call_id")
+            if call_id in tool_calls_by_id:
+                tc = tool_calls_by_id[call_id]
+                exit_code = payload.get("exit_code")
+                tc.is_error = exit_code not in (0, None)
+                if tc.file_path is None:
+                    tc.file_path = _file_path_from_parsed_cmd(payload.get("parsed_cmd"))
+                _apply_parsed_cmd_semantics(tc, payload.get("parsed_cmd"))
+                _add_project_candidate(project_candidates, tc.file_path)
+            continue
 
     if not messages:
         return []
 
-    messages.sort(key=lambda m: m.timestamp)
+    messages.sort(key=_BY_TIMESTAMP)
     started = messages[0].timestamp if messages else started_at or _now()
     ended = messages[-1].timestamp if messages else started
     duration_seconds = int((ended - started).total_seconds())
-    all_tool_calls = [tc for m in messages for tc in m.tool_calls]
+    # One pass for the per-session counters
+    user_count = assistant_count = tool_call_count = tool_error_count = 0
+    tool_counts: Counter[str] = Counter()
+    file_edit_counts: dict[str, int] = defaultdict(int)
+    for m in messages:
+        if m.role == "user":
+            user_count += 1
+        elif m.role == "assistant":
+            assistant_count += 1
+        for tc in m.tool_calls:
+            tool_call_count += 1
+            tool_counts[tc.tool_name] += 1
+            if tc.is_error:
+                tool_error_count += 1
+            if tc.tool_name in _EDIT_TOOLS and tc.file_path:
+                file_edit_counts[tc.file_path] += 1
     project_path = _choose_codex_project_path(
         cwd or str(file_path.parent),
         project_candidates,
@@ -218,22 +232,22 @@ def parse_codex_jsonl_file(file_path: Path) -> list[ParsedSession]:
         total_cache_creation_tokens=0,
         estimated_cost_usd=cost,
         message_count=len(messages),
-        user_message_count=sum(1 for m in messages if m.role == "user"),
-        assistant_message_count=sum(1 for m in messages if m.role == "assistant"),
-        tool_call_count=len(all_tool_calls),
-        file_read_count=sum(1 for tc in all_tool_calls if tc.tool_name == "Read"),
-        file_write_count=sum(1 for tc in all_tool_calls if tc.tool_name == "Write"),
-        file_edit_count=sum(1 for tc in all_tool_calls if tc.tool_name == "Edit"),
-        bash_count=sum(1 for tc in all_tool_calls if tc.tool_name == "Bash"),
+        user_message_count=user_count,
+        assistant_message_count=assistant_count,
+        tool_call_count=tool_call_count,
+        file_read_count=tool_counts["Read"],
+        file_write_count=tool_counts["Write"],
+        file_edit_count=tool_counts["Edit"],
+        bash_count=tool_counts["Bash"],
         compaction_count=0,
         peak_context_tokens=peak_context_tokens,
         custom_title=None,
         total_turn_duration_ms=0,
         turn_count=0,
         max_turn_duration_ms=0,
-        tool_error_count=sum(1 for tc in all_tool_calls if tc.is_error),
+        tool_error_count=tool_error_count,
         git_branch=None,
-        rework_file_count=_rework_file_count(all_tool_calls),
+        rework_file_count=sum(1 for c in file_edit_counts.values() if c >= 3),
         test_after_edit_rate=0.0,
         total_thinking_chars=0,
         thinking_message_count=0,
@@ -241,6 +255,7 @@ def parse_codex_jsonl_file(file_path: Path) -> list[ParsedSession]:
         active_duration_seconds=sum(b.duration_seconds for b in work_blocks),
         work_blocks=work_blocks,
         provider="codex",
+        content_hash=digest.hexdigest(),
     )
     return [session]
 
@@ -253,7 +268,7 @@ def _tool_call_from_function_payload(
     name = str(payload.get("name") or "")
     args = args if args is not None else _json_object(payload.get("arguments"))
     command = _command_from_args(name, args)
-    tool_name = _codex_tool_name(name, command)
+    tool_name = _intern(_codex_tool_name(name, command))
     if tool_name is None:
         return None
 
@@ -445,8 +460,8 @@ def _json_object(value: Any) -> dict[str, Any]:
     if not isinstance(value, str):
         return {}
     try:
-        parsed = json.loads(value)
-    except json.JSONDecodeError:
+        parsed = _json_loads(value)
+    except ValueError:
         return {}
     return parsed if isinstance(parsed, dict) else {}
 
@@ -533,6 +548,7 @@ def _is_ambiguous_codex_project_path(project_path: str) -> bool:
     return ".codex" in parts and "sessions" in parts
 
 
+@lru_cache(maxsize=1024)
 def _derive_codex_project_name(project_path: str) -> str:
     path = Path(project_path)
     parts = path.parts
@@ -545,14 +561,6 @@ def _derive_codex_project_name(project_path: str) -> str:
     return path.name or "codex"
 
 
-def _rework_file_count(tool_calls: list[ToolCall]) -> int:
-    edit_counts: dict[str, int] = defaultdict(int)
-    for tc in tool_calls:
-        if tc.tool_name in {"Edit", "Write"} and tc.file_path:
-            edit_counts[tc.file_path] += 1
-    return sum(1 for count in edit_counts.values() if count >= 3)
-
-
 def _permission_mode(
     approval_policies: list[str], sandbox_policies: list[str],
 ) -> str | None:
@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+# libyaml's C loader when PyYAML was built with it, else the pure-Python one
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 CONFIG_PATH = Path("~/.config/aide/config.yaml")
 
 DEFAULTS = {
@@ -48,20 +52,33 @@ def save_config_value(key: str, value: object, config_path: Path | None = None)
     existing: dict = {}
     if config_path.is_file():
         with open(config_path) as f:
-            loaded = yaml.safe_load(f)
+            loaded = yaml.load(f, Loader=_YAML_LOADER)
         if isinstance(loaded, dict):
             existing = loaded
 
     existing[key] = value
     with open(config_path, "w") as f:
         yaml.dump(existing, f, default_flow_style=False)
+    _read_user_config.cache_clear()
+
+
+@lru_cache(maxsize=8)
+def _read_user_config(config_path: Path, mtime_ns: int, size: int) -> Any:
+    """Parse the YAML config file.
+
+    mtime_ns and size are only part of the cache key, so an edited file is
+    re-read instead of served stale.
+    """
+    with open(config_path) as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
 
 
 def load_config(config_path: Path | None = None) -> AideConfig:
     """Load config from ~/.config/aide/config.yaml, merged with defaults.
 
     Expand ~ in paths. Create parent directories for db_path if they don't exist.
-    If no config file exists, return defaults (don't error).
+    If no config file exists, return defaults (don't error). The parsed YAML is
+    cached per path until the file's mtime or size changes.
     """
     if config_path is None:
         config_path = CONFIG_PATH
@@ -72,8 +89,8 @@ def load_config(config_path: Path | None = None) -> AideConfig:
     configured_sources: list[LogSource] | None = None
 
     if config_path.is_file():
-        with open(config_path) as f:
-            user_config = yaml.safe_load(f)
+        stat = config_path.stat()
+        user_config = _read_user_config(config_path, stat.st_mtime_ns, stat.st_size)
         if isinstance(user_config, dict):
             for key in DEFAULTS:
                 if key in user_config:
@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+from collections import Counter
+from collections.abc import Iterable
+from functools import lru_cache
+
 # Per-model pricing (dollars per million tokens).
 MODEL_PRICING = {
     "opus": {
@@ -101,6 +105,7 @@ def _openai_pricing_for_model(model: str | None) -> dict[str, float]:
     return DEFAULT_OPENAI_PRICING
 
 
+@lru_cache(maxsize=2048)
 def estimate_cost(
     input_tokens: int,
     output_tokens: int,
@@ -114,7 +119,13 @@ def estimate_cost(
     Claude logs store non-cached input tokens separately from cache reads.
     Codex/OpenAI logs store total input tokens plus cached input tokens, so
     cached input is subtracted from billable uncached input for OpenAI pricing.
+
+    Memoized: token tuples repeat heavily across turns (user and system rows
+    are all zeros), and every argument is hashable.
     """
+    if not (input_tokens or output_tokens or cache_read_tokens or cache_creation_tokens):
+        return 0.0
+
     pricing = _pricing_for_model(model, provider=provider)
     provider_lower = provider.lower()
     billable_input_tokens = input_tokens
@@ -128,3 +139,21 @@ def estimate_cost(
         + cache_creation_tokens * pricing["cache_creation"] / 1_000_000
     )
     return round(cost, 4)
+
+
+def estimate_cost_batch(
+    token_rows: Iterable[tuple[int, int, int, int, str | None]],
+    provider: str = "claude",
+) -> float:
+    """Total estimated cost of many (input, output, cache_read, cache_creation, model) rows.
+
+    Equal to summing estimate_cost over the rows (each row is still rounded
+    individually), but identical rows are priced once and multiplied by their
+    count. Sessions repeat the same token tuples heavily.
+    """
+    total = 0.0
+    for (inp, out, cache_read, cache_creation, model), count in Counter(token_rows).items():
+        total += count * estimate_cost(
+            inp, out, cache_read, cache_creation, model=model, provider=provider
+        )
+    return round(total, 4)
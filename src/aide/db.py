@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import json
 import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from operator import attrgetter
 from pathlib import Path
+from typing import NamedTuple
 
 from aide.models import (
     ARTIFACT_CONFIDENCE_VALUES,
@@ -12,6 +17,7 @@ from aide.models import (
     ARTIFACT_STATUS_VALUES,
     ARTIFACT_TYPE_VALUES,
     ParsedSession,
+    ToolCall,
 )
 
 
@@ -56,6 +62,7 @@ CREATE TABLE IF NOT EXISTS sessions (
     thinking_message_count INTEGER DEFAULT 0,
     permission_mode TEXT,
     active_duration_seconds INTEGER DEFAULT 0,
+    content_hash TEXT,
     source_file TEXT NOT NULL,
     ingested_at TEXT DEFAULT (datetime('now')),
     UNIQUE(provider, session_id)
@@ -77,6 +84,7 @@ CREATE TABLE IF NOT EXISTS messages (
     content_length INTEGER DEFAULT 0,
     has_tool_use INTEGER DEFAULT 0,
     tool_names TEXT,
+    first_tool TEXT,
     model TEXT,
     stop_reason TEXT,
     prompt_length INTEGER DEFAULT 0,
@@ -126,6 +134,14 @@ CREATE TABLE IF NOT EXISTS daily_stats (
     PRIMARY KEY (date, project_name)
 );
 
+CREATE TABLE IF NOT EXISTS daily_tool_stats (
+    date TEXT NOT NULL,
+    provider TEXT NOT NULL DEFAULT 'claude',
+    tool_name TEXT NOT NULL,
+    count INTEGER DEFAULT 0,
+    PRIMARY KEY (date, provider, tool_name)
+);
+
 CREATE TABLE IF NOT EXISTS ingest_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     provider TEXT NOT NULL DEFAULT 'claude',
@@ -220,9 +236,14 @@ CREATE TABLE IF NOT EXISTS effectiveness_snapshots (
 );
 
 CREATE INDEX IF NOT EXISTS idx_sessions_started_at ON sessions(started_at);
-CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions(project_name);
-CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(provider, session_id);
-CREATE INDEX IF NOT EXISTS idx_tool_calls_session ON tool_calls(provider, session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_started_date
+    ON sessions(date(started_at), project_name);
+CREATE INDEX IF NOT EXISTS idx_messages_session_ts
+    ON messages(provider, session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_session_ts
+    ON tool_calls(provider, session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_timestamp ON tool_calls(timestamp);
+CREATE INDEX IF NOT EXISTS idx_work_blocks_started_at ON work_blocks(started_at);
 CREATE INDEX IF NOT EXISTS idx_semantic_artifacts_project
     ON semantic_artifacts(project_name, status, artifact_type);
 CREATE INDEX IF NOT EXISTS idx_semantic_artifacts_source
@@ -242,15 +263,74 @@ CREATE VIEW IF NOT EXISTS v_sessions_quarter AS
 """
 
 
+# Key columns of idx_sessions_project_rollup: the GROUP BY column, then every
+# column the per-project aggregates read, so they never touch the table rows
+_PROJECT_ROLLUP_COLUMNS = (
+    "project_name",
+    "estimated_cost_usd",
+    "active_duration_seconds",
+    "total_input_tokens",
+    "total_output_tokens",
+    "total_cache_read_tokens",
+    "total_cache_creation_tokens",
+    "provider",
+)
+
+# Prepared statements kept per connection (sqlite3 defaults to 128); the
+# dashboard's long-lived connections can exceed that
+STATEMENT_CACHE_SIZE = 256
+
+# Per-connection tuning; journal_mode=WAL is persistent and set once in init_db.
+# Writers checkpoint every 1000 WAL pages (~4 MiB), and a checkpoint trims the
+# -wal file back to journal_size_limit instead of leaving it at its peak size.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA wal_autocheckpoint = 1000",
+    "PRAGMA journal_size_limit = 33554432",
+)
+
+
 def init_db(db_path: Path) -> None:
-    """Create tables if they don't exist, then run any needed migrations."""
+    """Create tables if they don't exist, then run any needed migrations.
+
+    Also switches the database to WAL so dashboard reads don't block on ingest.
+    """
     con = sqlite3.connect(db_path)
     try:
+        con.execute("PRAGMA journal_mode = WAL")
+        backfill_tool_stats = not _table_exists(con, "daily_tool_stats")
         con.executescript(_SCHEMA)
         con.commit()
     finally:
         con.close()
     _migrate_db(db_path)
+    # Databases created before the rollup existed get it filled once here;
+    # after that, rebuild_daily_stats keeps it current
+    if backfill_tool_stats:
+        con = get_connection(db_path)
+        try:
+            _refresh_daily_tool_stats(con, since="")
+            con.commit()
+        finally:
+            con.close()
+
+
+def checkpoint_db(db_path: Path) -> None:
+    """Fold the WAL back into the database, truncate it, and refresh stats.
+
+    Called after ingest (the only writer), so the dashboard reads from a
+    short WAL with current planner stats.
+    """
+    con = get_connection(db_path)
+    try:
+        con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        con.execute("PRAGMA optimize")
+    finally:
+        con.close()
 
 
 def _migrate_db(db_path: Path) -> None:
@@ -275,6 +355,7 @@ def _migrate_db(db_path: Path) -> None:
             "thinking_message_count": "INTEGER DEFAULT 0",
             "permission_mode": "TEXT",
             "active_duration_seconds": "INTEGER DEFAULT 0",
+            "content_hash": "TEXT",
         }
         for col, col_type in session_migrations.items():
             if col not in session_cols:
@@ -288,11 +369,22 @@ def _migrate_db(db_path: Path) -> None:
             "model": "TEXT",
             "stop_reason": "TEXT",
             "prompt_length": "INTEGER DEFAULT 0",
+            "first_tool": "TEXT",
         }
         if msg_cols_rows:
             for col, col_type in msg_migrations.items():
                 if col not in msg_cols:
                     con.execute(f"ALTER TABLE messages ADD COLUMN {col} {col_type}")
+            if "first_tool" not in msg_cols:
+                # Backfill from the comma-joined tool_names written at ingest
+                con.execute(
+                    """UPDATE messages SET first_tool = CASE
+                        WHEN instr(tool_names, ',') > 0
+                            THEN substr(tool_names, 1, instr(tool_names, ',') - 1)
+                        ELSE tool_names
+                    END
+                    WHERE tool_names IS NOT NULL AND tool_names != ''"""
+                )
 
         # --- tool_calls table (may not exist in old schemas) ---
         tc_cols_rows = con.execute("PRAGMA table_info(tool_calls)").fetchall()
@@ -330,6 +422,14 @@ def _migrate_db(db_path: Path) -> None:
         _ensure_provider_identity_constraints(con)
 
         con.commit()
+
+        # Give the planner statistics for the indexes: a full ANALYZE the
+        # first time, then let PRAGMA optimize decide when to refresh
+        if _table_exists(con, "sqlite_stat1"):
+            con.execute("PRAGMA optimize")
+        else:
+            con.execute("ANALYZE")
+        con.commit()
     finally:
         con.close()
 
@@ -381,6 +481,7 @@ def _ensure_provider_identity_constraints(con: sqlite3.Connection) -> None:
                 thinking_message_count INTEGER DEFAULT 0,
                 permission_mode TEXT,
                 active_duration_seconds INTEGER DEFAULT 0,
+                content_hash TEXT,
                 source_file TEXT NOT NULL,
                 ingested_at TEXT DEFAULT (datetime('now')),
                 UNIQUE(provider, session_id)
@@ -426,15 +527,44 @@ def _ensure_provider_identity_constraints(con: sqlite3.Connection) -> None:
         )
 
     con.execute("CREATE INDEX IF NOT EXISTS idx_sessions_started_at ON sessions(started_at)")
-    con.execute("CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions(project_name)")
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sessions_started_date "
+        "ON sessions(date(started_at), project_name)"
+    )
+    # Covers the per-project GROUP BY rollups (get_summary_stats and the
+    # dashboard's cost/projects queries, provider-filtered or not); created
+    # here rather than in _SCHEMA because very old sessions tables lack
+    # these columns. It supersedes the narrower project_name and
+    # (project_name, cost) indexes, which are strict prefixes of it.
+    con.execute("DROP INDEX IF EXISTS idx_sessions_project")
+    con.execute("DROP INDEX IF EXISTS idx_sessions_project_cost")
+    if set(_PROJECT_ROLLUP_COLUMNS) <= set(_table_columns(con, "sessions")):
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_project_rollup "
+            f"ON sessions({', '.join(_PROJECT_ROLLUP_COLUMNS)})"
+        )
+    # (provider, session_id) indexes are prefixes of the timestamp-ordered ones
+    con.execute("DROP INDEX IF EXISTS idx_messages_session")
+    con.execute("DROP INDEX IF EXISTS idx_tool_calls_session")
     if _table_exists(con, "messages"):
         con.execute(
-            "CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(provider, session_id)"
+            "CREATE INDEX IF NOT EXISTS idx_messages_session_ts "
+            "ON messages(provider, session_id, timestamp)"
         )
     if _table_exists(con, "tool_calls"):
         con.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tool_calls_session "
-            "ON tool_calls(provider, session_id)"
+            "CREATE INDEX IF NOT EXISTS idx_tool_calls_session_ts "
+            "ON tool_calls(provider, session_id, timestamp)"
+        )
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tool_calls_name ON tool_calls(tool_name, provider)"
+        )
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tool_calls_timestamp ON tool_calls(timestamp)"
+        )
+    if _table_exists(con, "work_blocks"):
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_work_blocks_started_at ON work_blocks(started_at)"
         )
     con.execute(
         """CREATE VIEW IF NOT EXISTS v_sessions_30d AS
@@ -485,236 +615,408 @@ def _has_unique_index(
     return False
 
 
-def get_connection(db_path: Path) -> sqlite3.Connection:
-    """Get a connection with row_factory = sqlite3.Row."""
-    con = sqlite3.connect(db_path)
+def get_connection(db_path: Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Get a tuned connection with row_factory = sqlite3.Row."""
+    con = sqlite3.connect(
+        db_path,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=check_same_thread,
+    )
     con.row_factory = sqlite3.Row
+    for pragma in _CONNECTION_PRAGMAS:
+        con.execute(pragma)
     return con
 
 
-def ingest_sessions(db_path: Path, sessions: list[ParsedSession]) -> int:
-    """Insert parsed sessions into the database.
+_SESSION_INSERT_SQL = """INSERT OR REPLACE INTO sessions (
+    provider, session_id, project_path, project_name, started_at, ended_at,
+    duration_seconds, total_input_tokens, total_output_tokens,
+    total_cache_read_tokens, total_cache_creation_tokens,
+    estimated_cost_usd, message_count, user_message_count,
+    assistant_message_count, tool_call_count, file_read_count,
+    file_write_count, file_edit_count, bash_count,
+    compaction_count, peak_context_tokens,
+    custom_title, total_turn_duration_ms, turn_count,
+    max_turn_duration_ms, tool_error_count, git_branch,
+    rework_file_count, test_after_edit_rate,
+    total_thinking_chars, thinking_message_count,
+    permission_mode, active_duration_seconds,
+    content_hash, source_file
+) VALUES (
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+    ?, ?, ?, ?, ?, ?
+)"""
+
+# Columns copied verbatim from the model come first, in attribute order, so
+# the row builders can fetch them with one C-level attrgetter call
+_MESSAGE_INSERT_SQL = """INSERT INTO messages (
+    provider, session_id, message_uuid, parent_uuid, role, type,
+    input_tokens, output_tokens, cache_read_tokens, cache_creation_tokens,
+    content_length, model, stop_reason, prompt_length,
+    timestamp, has_tool_use, tool_names, first_tool
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+_MESSAGE_FIELDS = attrgetter(
+    "uuid", "parent_uuid", "role", "type",
+    "input_tokens", "output_tokens", "cache_read_tokens", "cache_creation_tokens",
+    "content_length", "model", "stop_reason", "prompt_length",
+)
 
-    Uses INSERT OR REPLACE on (provider, session_id). Also inserts messages and tool_calls.
-    Returns count of sessions ingested.
+# has_tool_use, tool_names, first_tool for a message without tool calls
+_NO_TOOL_COLUMNS = (0, None, None)
+
+_TOOL_CALL_INSERT_SQL = """INSERT INTO tool_calls (
+    provider, session_id, message_uuid, tool_name, file_path,
+    tool_use_id, command, description, old_string_len, new_string_len,
+    timestamp, is_error
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+_TOOL_CALL_FIELDS = attrgetter(
+    "tool_name", "file_path", "tool_use_id", "command", "description",
+    "old_string_len", "new_string_len",
+)
+
+_WORK_BLOCK_INSERT_SQL = """INSERT INTO work_blocks (
+    provider, session_id, block_index, started_at, ended_at,
+    duration_seconds, message_count
+) VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+# Child tables cleared before a session is re-ingested
+_SESSION_CHILD_TABLES = ("messages", "tool_calls", "work_blocks")
+
+_INGEST_LOG_INSERT_SQL = """INSERT OR REPLACE INTO ingest_log
+    (provider, source_file, file_size, file_mtime, session_count)
+VALUES (?, ?, ?, ?, ?)"""
+
+
+def _session_ids_by_provider(
+    keys: list[tuple[str, str]],
+) -> Iterator[tuple[str, str]]:
+    """Yield (provider, JSON array of session_ids) for use with json_each(?).
+
+    One bound JSON parameter per provider replaces an IN list of ?s, so a
+    batch of any size is one statement with no host-parameter limit.
     """
-    con = get_connection(db_path)
-    try:
-        for s in sessions:
-            provider = s.provider or "claude"
-            # Delete existing child rows for re-ingestion
-            con.execute(
-                "DELETE FROM messages WHERE provider = ? AND session_id = ?",
-                (provider, s.session_id),
-            )
+    by_provider: dict[str, list[str]] = {}
+    for provider, session_id in keys:
+        by_provider.setdefault(provider, []).append(session_id)
+    for provider, session_ids in by_provider.items():
+        yield provider, json.dumps(session_ids)
+
+
+def _delete_session_children(
+    con: sqlite3.Connection,
+    keys: list[tuple[str, str]],
+) -> None:
+    """Delete child rows for (provider, session_id) keys, one statement per table."""
+    for provider, session_ids in _session_ids_by_provider(keys):
+        for table in _SESSION_CHILD_TABLES:
             con.execute(
-                "DELETE FROM tool_calls WHERE provider = ? AND session_id = ?",
-                (provider, s.session_id),
+                f"DELETE FROM {table} WHERE provider = ? "
+                "AND session_id IN (SELECT value FROM json_each(?))",
+                (provider, session_ids),
             )
-            con.execute(
-                "DELETE FROM work_blocks WHERE provider = ? AND session_id = ?",
-                (provider, s.session_id),
+
+
+def _session_dates(con: sqlite3.Connection, keys: list[tuple[str, str]]) -> set[str]:
+    """Return the distinct date(started_at) values of the stored sessions in keys."""
+    dates: set[str] = set()
+    for provider, session_ids in _session_ids_by_provider(keys):
+        rows = con.execute(
+            "SELECT DISTINCT date(started_at) FROM sessions WHERE provider = ? "
+            "AND session_id IN (SELECT value FROM json_each(?))",
+            (provider, session_ids),
+        )
+        dates.update(row[0] for row in rows if row[0] is not None)
+    return dates
+
+
+def _unchanged_session_keys(
+    con: sqlite3.Connection,
+    latest: dict[tuple[str, str], ParsedSession],
+) -> set[tuple[str, str]]:
+    """Return keys whose stored content_hash equals the parsed session's."""
+    keys = [key for key, s in latest.items() if s.content_hash]
+    unchanged: set[tuple[str, str]] = set()
+    for provider, session_ids in _session_ids_by_provider(keys):
+        rows = con.execute(
+            "SELECT session_id, content_hash FROM sessions WHERE provider = ? "
+            "AND session_id IN (SELECT value FROM json_each(?))",
+            (provider, session_ids),
+        )
+        for session_id, content_hash in rows:
+            if content_hash == latest[(provider, session_id)].content_hash:
+                unchanged.add((provider, session_id))
+    return unchanged
+
+
+def _session_rows(latest: dict[tuple[str, str], ParsedSession]) -> Iterator[tuple]:
+    for (provider, session_id), s in latest.items():
+        yield (
+            provider,
+            session_id,
+            s.project_path,
+            s.project_name,
+            s.started_at.isoformat(),
+            s.ended_at.isoformat() if s.ended_at else None,
+            s.duration_seconds,
+            s.total_input_tokens,
+            s.total_output_tokens,
+            s.total_cache_read_tokens,
+            s.total_cache_creation_tokens,
+            s.estimated_cost_usd,
+            s.message_count,
+            s.user_message_count,
+            s.assistant_message_count,
+            s.tool_call_count,
+            s.file_read_count,
+            s.file_write_count,
+            s.file_edit_count,
+            s.bash_count,
+            s.compaction_count,
+            s.peak_context_tokens,
+            s.custom_title,
+            s.total_turn_duration_ms,
+            s.turn_count,
+            s.max_turn_duration_ms,
+            s.tool_error_count,
+            s.git_branch,
+            s.rework_file_count,
+            s.test_after_edit_rate,
+            s.total_thinking_chars,
+            s.thinking_message_count,
+            s.permission_mode,
+            s.active_duration_seconds,
+            s.content_hash,
+            s.source_file,
+        )
+
+
+def _tool_columns(tool_calls: list[ToolCall]) -> tuple[int, str | None, str | None]:
+    """has_tool_use, tool_names and first_tool for a message's tool calls."""
+    if not tool_calls:
+        return _NO_TOOL_COLUMNS
+    first = tool_calls[0].tool_name
+    if len(tool_calls) == 1:
+        return (1, first, first)
+    return (1, ",".join([tc.tool_name for tc in tool_calls]), first)
+
+
+def _message_rows(latest: dict[tuple[str, str], ParsedSession]) -> Iterator[tuple]:
+    for (provider, session_id), s in latest.items():
+        for m in s.messages:
+            yield (
+                provider,
+                session_id,
+                *_MESSAGE_FIELDS(m),
+                m.timestamp.isoformat(),
+                *_tool_columns(m.tool_calls),
             )
 
-            # Upsert session
-            con.execute(
-                """INSERT OR REPLACE INTO sessions (
-                    provider, session_id, project_path, project_name, started_at, ended_at,
-                    duration_seconds, total_input_tokens, total_output_tokens,
-                    total_cache_read_tokens, total_cache_creation_tokens,
-                    estimated_cost_usd, message_count, user_message_count,
-                    assistant_message_count, tool_call_count, file_read_count,
-                    file_write_count, file_edit_count, bash_count,
-                    compaction_count, peak_context_tokens,
-                    custom_title, total_turn_duration_ms, turn_count,
-                    max_turn_duration_ms, tool_error_count, git_branch,
-                    rework_file_count, test_after_edit_rate,
-                    total_thinking_chars, thinking_message_count,
-                    permission_mode, active_duration_seconds,
-                    source_file
-                ) VALUES (
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?, ?
-                )""",
-                (
+
+def _tool_call_rows(latest: dict[tuple[str, str], ParsedSession]) -> Iterator[tuple]:
+    for (provider, session_id), s in latest.items():
+        for m in s.messages:
+            for tc in m.tool_calls:
+                yield (
                     provider,
-                    s.session_id,
-                    s.project_path,
-                    s.project_name,
-                    s.started_at.isoformat(),
-                    s.ended_at.isoformat() if s.ended_at else None,
-                    s.duration_seconds,
-                    s.total_input_tokens,
-                    s.total_output_tokens,
-                    s.total_cache_read_tokens,
-                    s.total_cache_creation_tokens,
-                    s.estimated_cost_usd,
-                    s.message_count,
-                    s.user_message_count,
-                    s.assistant_message_count,
-                    s.tool_call_count,
-                    s.file_read_count,
-                    s.file_write_count,
-                    s.file_edit_count,
-                    s.bash_count,
-                    s.compaction_count,
-                    s.peak_context_tokens,
-                    s.custom_title,
-                    s.total_turn_duration_ms,
-                    s.turn_count,
-                    s.max_turn_duration_ms,
-                    s.tool_error_count,
-                    s.git_branch,
-                    s.rework_file_count,
-                    s.test_after_edit_rate,
-                    s.total_thinking_chars,
-                    s.thinking_message_count,
-                    s.permission_mode,
-                    s.active_duration_seconds,
-                    s.source_file,
-                ),
+                    session_id,
+                    m.uuid,
+                    *_TOOL_CALL_FIELDS(tc),
+                    tc.timestamp.isoformat(),
+                    1 if tc.is_error else 0,
+                )
+
+
+def _work_block_rows(latest: dict[tuple[str, str], ParsedSession]) -> Iterator[tuple]:
+    for (provider, session_id), s in latest.items():
+        for wb in s.work_blocks:
+            yield (
+                provider,
+                session_id,
+                wb.block_index,
+                wb.started_at.isoformat(),
+                wb.ended_at.isoformat(),
+                wb.duration_seconds,
+                wb.message_count,
             )
 
-            # Insert messages
-            for m in s.messages:
-                tool_names = (
-                    ",".join(tc.tool_name for tc in m.tool_calls)
-                    if m.tool_calls
-                    else None
-                )
-                con.execute(
-                    """INSERT INTO messages (
-                        provider, session_id, message_uuid, parent_uuid, role, type,
-                        timestamp, input_tokens, output_tokens,
-                        cache_read_tokens, cache_creation_tokens,
-                        content_length, has_tool_use, tool_names,
-                        model, stop_reason, prompt_length
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        provider,
-                        s.session_id,
-                        m.uuid,
-                        m.parent_uuid,
-                        m.role,
-                        m.type,
-                        m.timestamp.isoformat(),
-                        m.input_tokens,
-                        m.output_tokens,
-                        m.cache_read_tokens,
-                        m.cache_creation_tokens,
-                        m.content_length,
-                        1 if m.tool_calls else 0,
-                        tool_names,
-                        m.model,
-                        m.stop_reason,
-                        m.prompt_length,
-                    ),
-                )
 
-                # Insert tool_calls
-                for tc in m.tool_calls:
-                    con.execute(
-                        """INSERT INTO tool_calls (
-                            provider, session_id, message_uuid, tool_name, file_path, timestamp,
-                            tool_use_id, command, description, is_error,
-                            old_string_len, new_string_len
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                        (
-                            provider,
-                            s.session_id,
-                            m.uuid,
-                            tc.tool_name,
-                            tc.file_path,
-                            tc.timestamp.isoformat(),
-                            tc.tool_use_id,
-                            tc.command,
-                            tc.description,
-                            1 if tc.is_error else 0,
-                            tc.old_string_len,
-                            tc.new_string_len,
-                        ),
-                    )
-
-            # Insert work_blocks
-            for wb in s.work_blocks:
-                con.execute(
-                    """INSERT INTO work_blocks (
-                        provider, session_id, block_index, started_at, ended_at,
-                        duration_seconds, message_count
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        provider,
-                        s.session_id,
-                        wb.block_index,
-                        wb.started_at.isoformat(),
-                        wb.ended_at.isoformat(),
-                        wb.duration_seconds,
-                        wb.message_count,
-                    ),
-                )
+def ingest_sessions(
+    db_path: Path,
+    sessions: list[ParsedSession],
+    touched_dates: set[str] | None = None,
+    skip_unchanged: bool = False,
+    log_entries: Iterable[tuple[str, str, int, float, int]] = (),
+) -> int:
+    """Insert parsed sessions into the database.
 
+    Uses INSERT OR REPLACE on (provider, session_id). Also inserts messages and tool_calls.
+    Rows are streamed from generators into executemany inside one BEGIN IMMEDIATE
+    transaction, rolled back on error. Returns count of sessions ingested.
+
+    If touched_dates is given, it is updated with every date(started_at) the
+    write affected (old and new dates of replaced sessions), ready to pass to
+    rebuild_daily_stats.
+
+    With skip_unchanged (off by default; aide ingest turns it on for
+    incremental runs), sessions whose content_hash matches the stored row
+    are left as they are; they still count toward the returned total.
+
+    log_entries are (provider, source_file, file_size, file_mtime,
+    session_count) ingest_log rows committed in the same transaction, so a
+    batch of files is recorded only once its sessions are stored.
+    """
+    # A later duplicate replaces an earlier one, children included
+    latest: dict[tuple[str, str], ParsedSession] = {}
+    for s in sessions:
+        latest[(s.provider or "claude", s.session_id)] = s
+
+    con = get_connection(db_path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            if skip_unchanged:
+                for key in _unchanged_session_keys(con, latest):
+                    del latest[key]
+            keys = list(latest)
+            dates = _session_dates(con, keys) if touched_dates is not None else None
+            _delete_session_children(con, keys)
+            con.executemany(_SESSION_INSERT_SQL, _session_rows(latest))
+            con.executemany(_MESSAGE_INSERT_SQL, _message_rows(latest))
+            con.executemany(_TOOL_CALL_INSERT_SQL, _tool_call_rows(latest))
+            con.executemany(_WORK_BLOCK_INSERT_SQL, _work_block_rows(latest))
+            con.executemany(_INGEST_LOG_INSERT_SQL, log_entries)
+            if dates is not None:
+                dates |= _session_dates(con, keys)
+        except Exception:
+            con.rollback()
+            raise
         con.commit()
+        if dates is not None:
+            touched_dates |= dates
         return len(sessions)
     finally:
         con.close()
 
 
-def rebuild_daily_stats(db_path: Path) -> None:
-    """Delete and rebuild the daily_stats table from sessions data.
+@contextmanager
+def deferred_session_indexes(db_path: Path) -> Iterator[None]:
+    """Drop the sessions table's secondary indexes for a bulk load, then rebuild.
 
-    Groups by date (from started_at) and project_name.
-    Also creates aggregate rows per date with project_name = NULL.
+    Ingest only looks sessions up by (provider, session_id), which the UNIQUE
+    constraint's index serves, so the reporting indexes can be rebuilt in one
+    sorted pass at the end instead of updated row by row. Child-table indexes
+    stay: ingest's per-session deletes depend on them. If the load dies
+    midway, init_db recreates the dropped indexes on the next run.
     """
     con = get_connection(db_path)
     try:
-        con.execute("DELETE FROM daily_stats")
+        indexes = con.execute(
+            """SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND tbl_name = 'sessions'
+                AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%'"""
+        ).fetchall()
+        for name, _ in indexes:
+            con.execute(f'DROP INDEX "{name}"')
+        con.commit()
+        try:
+            yield
+        finally:
+            for _, sql in indexes:
+                con.execute(sql)
+            con.commit()
+    finally:
+        con.close()
 
-        # Per-project stats
-        con.execute(
-            """INSERT INTO daily_stats (
-                date, project_name, session_count,
-                total_input_tokens, total_output_tokens,
-                total_cache_read_tokens, estimated_cost_usd,
-                total_duration_seconds, tool_call_count
-            )
-            SELECT
-                date(started_at) AS date,
-                project_name,
-                COUNT(*) AS session_count,
-                SUM(total_input_tokens) AS total_input_tokens,
-                SUM(total_output_tokens) AS total_output_tokens,
-                SUM(total_cache_read_tokens) AS total_cache_read_tokens,
-                SUM(estimated_cost_usd) AS estimated_cost_usd,
-                SUM(duration_seconds) AS total_duration_seconds,
-                SUM(tool_call_count) AS tool_call_count
-            FROM sessions
-            GROUP BY date(started_at), project_name"""
-        )
 
-        # All-projects aggregate per date (project_name = NULL)
-        con.execute(
-            """INSERT INTO daily_stats (
-                date, project_name, session_count,
-                total_input_tokens, total_output_tokens,
-                total_cache_read_tokens, estimated_cost_usd,
-                total_duration_seconds, tool_call_count
-            )
-            SELECT
-                date(started_at) AS date,
-                NULL,
-                COUNT(*) AS session_count,
-                SUM(total_input_tokens) AS total_input_tokens,
-                SUM(total_output_tokens) AS total_output_tokens,
-                SUM(total_cache_read_tokens) AS total_cache_read_tokens,
-                SUM(estimated_cost_usd) AS estimated_cost_usd,
-                SUM(duration_seconds) AS total_duration_seconds,
-                SUM(tool_call_count) AS tool_call_count
-            FROM sessions
-            GROUP BY date(started_at)"""
-        )
+# One scan of sessions: per-project rows are aggregated in a CTE, and the
+# all-projects row per date (project_name = NULL) is rolled up from those
+# rows rather than from sessions. A CTE referenced twice is materialized once.
+_DAILY_STATS_INSERT_SQL = """WITH per_project AS (
+    SELECT
+        date(started_at) AS date,
+        project_name,
+        COUNT(*) AS session_count,
+        SUM(total_input_tokens) AS total_input_tokens,
+        SUM(total_output_tokens) AS total_output_tokens,
+        SUM(total_cache_read_tokens) AS total_cache_read_tokens,
+        SUM(estimated_cost_usd) AS estimated_cost_usd,
+        SUM(duration_seconds) AS total_duration_seconds,
+        SUM(tool_call_count) AS tool_call_count
+    FROM sessions
+    {where}
+    GROUP BY date(started_at), project_name
+)
+INSERT INTO daily_stats (
+    date, project_name, session_count,
+    total_input_tokens, total_output_tokens,
+    total_cache_read_tokens, estimated_cost_usd,
+    total_duration_seconds, tool_call_count
+)
+SELECT * FROM per_project
+UNION ALL
+SELECT
+    date,
+    NULL,
+    SUM(session_count),
+    SUM(total_input_tokens),
+    SUM(total_output_tokens),
+    SUM(total_cache_read_tokens),
+    SUM(estimated_cost_usd),
+    SUM(total_duration_seconds),
+    SUM(tool_call_count)
+FROM per_project
+GROUP BY date"""
+
+
+_DAILY_TOOL_STATS_INSERT_SQL = """INSERT INTO daily_tool_stats (date, provider, tool_name, count)
+SELECT date(timestamp), provider, tool_name, COUNT(*)
+FROM tool_calls
+WHERE timestamp >= ?
+GROUP BY date(timestamp), provider, tool_name"""
+
+
+def _refresh_daily_tool_stats(con: sqlite3.Connection, since: str) -> None:
+    """Recompute daily_tool_stats for every date from since onwards.
+
+    since is an ISO date; "" recomputes everything.
+    """
+    con.execute("DELETE FROM daily_tool_stats WHERE date >= ?", (since,))
+    con.execute(_DAILY_TOOL_STATS_INSERT_SQL, (since,))
+
+
+def rebuild_daily_stats(db_path: Path, touched_dates: set[str] | None = None) -> None:
+    """Rebuild the daily_stats and daily_tool_stats rollups.
+
+    daily_stats groups sessions by date (from started_at) and project_name,
+    plus an aggregate row per date with project_name = NULL.
+    daily_tool_stats counts tool calls by date (from their own timestamp),
+    provider and tool_name.
+    With touched_dates, only those dates of daily_stats are deleted and
+    recomputed, and daily_tool_stats from the earliest of them onwards (a
+    session's tool calls never predate its start); otherwise both tables
+    are rebuilt.
+    """
+    if touched_dates is not None and not touched_dates:
+        return
 
+    con = get_connection(db_path)
+    try:
+        if touched_dates is None:
+            where = ""
+            params: tuple[str, ...] = ()
+            con.execute("DELETE FROM daily_stats")
+        else:
+            params = tuple(sorted(touched_dates))
+            placeholders = ", ".join("?" * len(params))
+            where = f"WHERE date(started_at) IN ({placeholders})"
+            con.execute(f"DELETE FROM daily_stats WHERE date IN ({placeholders})", params)
+
+        con.execute(_DAILY_STATS_INSERT_SQL.format(where=where), params)
+        _refresh_daily_tool_stats(con, since=min(params, default=""))
         con.commit()
     finally:
         con.close()
@@ -732,9 +1034,7 @@ def log_ingestion(
     con = get_connection(db_path)
     try:
         con.execute(
-            """INSERT OR REPLACE INTO ingest_log
-                (provider, source_file, file_size, file_mtime, session_count)
-            VALUES (?, ?, ?, ?, ?)""",
+            _INGEST_LOG_INSERT_SQL,
             (provider, source_file, file_size, file_mtime, session_count),
         )
         con.commit()
@@ -766,21 +1066,48 @@ def get_ingested_file(
         con.close()
 
 
+def get_ingested_mtimes(db_path: Path, provider: str = "claude") -> dict[str, float]:
+    """Return {source_file: file_mtime} for every file ingested for provider.
+
+    Lets a caller check many files against the ingest_log with one query
+    instead of one get_ingested_file round-trip per file.
+    """
+    con = get_connection(db_path)
+    try:
+        rows = con.execute(
+            "SELECT source_file, file_mtime FROM ingest_log WHERE provider = ?",
+            (provider,),
+        )
+        return {row["source_file"]: row["file_mtime"] for row in rows}
+    finally:
+        con.close()
+
+
+class ProjectSummary(NamedTuple):
+    """One sessions_by_project row from get_summary_stats."""
+
+    project_name: str
+    session_count: int
+    total_cost: float
+
+
 def get_summary_stats(db_path: Path) -> dict:
     """Return summary statistics across all sessions.
 
     Returns: total_sessions, total_cost, total_projects, date_range,
-    sessions_by_project.
+    sessions_by_project (a list of ProjectSummary tuples, costliest first).
     """
     con = get_connection(db_path)
+    # Plain tuples: no sqlite3.Row or per-row dict for the project list
+    con.row_factory = None
     try:
-        row = con.execute(
+        total_sessions, total_cost, total_projects, min_date, max_date = con.execute(
             """SELECT
-                COUNT(*) AS total_sessions,
-                COALESCE(SUM(estimated_cost_usd), 0) AS total_cost,
-                COUNT(DISTINCT project_name) AS total_projects,
-                MIN(started_at) AS min_date,
-                MAX(started_at) AS max_date
+                COUNT(*),
+                COALESCE(SUM(estimated_cost_usd), 0),
+                COUNT(DISTINCT project_name),
+                MIN(started_at),
+                MAX(started_at)
             FROM sessions"""
         ).fetchone()
 
@@ -795,21 +1122,11 @@ def get_summary_stats(db_path: Path) -> dict:
         ).fetchall()
 
         return {
-            "total_sessions": row["total_sessions"],
-            "total_cost": row["total_cost"],
-            "total_projects": row["total_projects"],
-            "date_range": {
-                "min": row["min_date"],
-                "max": row["max_date"],
-            },
-            "sessions_by_project": [
-                {
-                    "project_name": r["project_name"],
-                    "session_count": r["session_count"],
-                    "total_cost": r["total_cost"],
-                }
-                for r in by_project
-            ],
+            "total_sessions": total_sessions,
+            "total_cost": total_cost,
+            "total_projects": total_projects,
+            "date_range": {"min": min_date, "max": max_date},
+            "sessions_by_project": list(map(ProjectSummary._make, by_project)),
         }
     finally:
         con.close()
@@ -54,7 +54,7 @@ ARTIFACT_EVENT_TYPE_VALUES = (
 ARTIFACT_EVENT_TYPES = frozenset(ARTIFACT_EVENT_TYPE_VALUES)
 
 
-@dataclass
+@dataclass(slots=True)
 class SemanticArtifact:
     """A durable, reviewable project-memory candidate.
 
@@ -77,7 +77,7 @@ class SemanticArtifact:
     id: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ArtifactEvidence:
     """Summarized evidence supporting a semantic artifact."""
 
@@ -91,7 +91,7 @@ class ArtifactEvidence:
     id: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ArtifactEvent:
     """Lifecycle event for artifact review and maintenance."""
 
@@ -101,7 +101,7 @@ class ArtifactEvent:
     id: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkBlock:
     """A continuous stretch of activity within a session.
 
@@ -116,7 +116,7 @@ class WorkBlock:
     message_count: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """A single tool invocation extracted from an assistant message."""
 
@@ -131,7 +131,7 @@ class ToolCall:
     new_string_len: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedMessage:
     """A single message extracted from a JSONL log line."""
 
@@ -153,7 +153,7 @@ class ParsedMessage:
     thinking_chars: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedSession:
     """A complete session extracted from one or more JSONL files.
 
@@ -198,4 +198,7 @@ class ParsedSession:
     permission_mode: str | None = None
     active_duration_seconds: int = 0
     work_blocks: list[WorkBlock] = field(default_factory=list)
+    # Digest of the raw log lines this session was parsed from; unchanged
+    # sessions are skipped on re-ingest
+    content_hash: str | None = None
     provider: str = "claude"
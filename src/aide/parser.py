@@ -2,36 +2,119 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
-from collections import defaultdict
+import os
+import sys
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
+from typing import Any
 
 from aide.models import ParsedMessage, ParsedSession, ToolCall, WorkBlock
 
 try:
-    from aide.cost import estimate_cost
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Read buffer for JSONL logs; files can run to hundreds of MB
+JSONL_READ_BUFFER = 1 << 20
+
+# Tools that modify files: rework and test-after-edit are measured on these
+_EDIT_TOOLS = frozenset({"Edit", "Write"})
+
+# Sort key for messages; logs are written in time order, so the sort is
+# usually one linear Timsort run
+_BY_TIMESTAMP = attrgetter("timestamp")
+
+# Distinct timestamp strings remembered by _parse_iso_timestamp
+TIMESTAMP_CACHE_SIZE = 1 << 16
+
+# Claude Code writes these lines with "type" first; they carry file backups
+# the parser never reads, so they are dropped before JSON decoding. Matching
+# only the line prefix keeps a message that merely quotes the string safe;
+# lines in any other key order are still decoded and skipped by type.
+_CLAUDE_SKIP_PREFIXES = (
+    b'{"type":"file-history-snapshot"',
+    b'{"type": "file-history-snapshot"',
+)
+
+try:
+    from aide.cost import estimate_cost_batch
 except ImportError:
 
-    def estimate_cost(
-        input_tokens: int,
-        output_tokens: int,
-        cache_read_tokens: int = 0,
-        cache_creation_tokens: int = 0,
-        model: str | None = None,
+    def estimate_cost_batch(
+        token_rows: Iterable[tuple[int, int, int, int, str | None]],
+        provider: str = "claude",
     ) -> float:
-        return (
-            input_tokens * 3.0
-            + output_tokens * 15.0
-            + cache_read_tokens * 0.30
-            + cache_creation_tokens * 3.75
-        ) / 1_000_000
+        return round(sum(
+            inp * 3.0 + out * 15.0 + cache_read * 0.30 + cache_creation * 3.75
+            for inp, out, cache_read, cache_creation, _ in token_rows
+        ) / 1_000_000, 4)
+
+
+def _intern(value: Any) -> Any:
+    """sys.intern strings; pass None and other non-str values through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _content_digest(file_path: Path) -> Any:
+    """Start a blake2b digest for a log file, keyed by its path."""
+    return hashlib.blake2b(str(file_path).encode(), digest_size=16)
+
+
+def _iter_jsonl_lines(
+    file_path: Path,
+    skip_prefixes: tuple[bytes, ...] = (),
+) -> Iterator[tuple[int, bytes, Any]]:
+    """Yield (line_index, raw_line, decoded_object) for each valid JSON line.
+
+    Reads raw bytes through a large buffer and hands them straight to the
+    decoder (orjson when installed), skipping the per-line str decode.
+    raw_line is the stripped bytes the object was decoded from.
+    Blank and malformed lines are skipped but still count toward line_index.
+    Lines starting with one of skip_prefixes are dropped without decoding.
+    """
+    with open(file_path, "rb", buffering=JSONL_READ_BUFFER) as f:
+        for index, line in enumerate(f):
+            line = line.strip()
+            if not line or (skip_prefixes and line.startswith(skip_prefixes)):
+                continue
+            try:
+                yield index, line, _json_loads(line)
+            except ValueError:
+                continue
+
+
+def _iter_jsonl(
+    file_path: Path,
+    digest: Any = None,
+    skip_prefixes: tuple[bytes, ...] = (),
+) -> Iterator[tuple[int, Any]]:
+    """Yield (line_index, decoded_object) for each valid JSON line in file_path.
+
+    When digest is given, every decoded line is fed to it as it is read.
+    """
+    for index, line, data in _iter_jsonl_lines(file_path, skip_prefixes):
+        if digest is not None:
+            digest.update(line)
+        yield index, data
 
 
 def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
     """Parse a single JSONL file. Returns list of sessions (usually 1)."""
     file_path = Path(file_path)
-    messages_by_session: dict[str, list[ParsedMessage]] = defaultdict(list)
+    messages_by_session: dict[str, list[ParsedMessage]] = {}
+    # Lines for one session arrive in runs (usually the whole file), so the
+    # list for the latest session_id is kept at hand instead of looked up
+    current_session_id: str | None = None
+    current_messages: list[ParsedMessage] = []
     # Per-session metadata collected from special line types
     session_titles: dict[str, str] = {}
     session_turn_durations: dict[str, list[int]] = defaultdict(list)
@@ -45,181 +128,78 @@ def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
     # Track permission modes per session
     session_permission_modes: dict[str, list[str]] = defaultdict(list)
 
-    with open(file_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                continue
+    # One content digest per session, fed only that session's own lines, so
+    # a session left untouched while its file grows keeps its hash
+    session_digests: dict[str, Any] = {}
 
-            msg_type = data.get("type", "")
+    for _, line, data in _iter_jsonl_lines(file_path, _CLAUDE_SKIP_PREFIXES):
+        msg_type = data.get("type", "")
 
-            # Skip file-history-snapshot lines
-            if msg_type == "file-history-snapshot":
-                continue
-
-            session_id = data.get("sessionId")
-            if not session_id:
-                continue
-
-            # Handle custom-title lines
-            if msg_type == "custom-title":
-                title = data.get("customTitle", "")
-                if title:
-                    session_titles[session_id] = title
-                continue
-
-            # Handle turn_duration system lines
-            subtype = data.get("subtype", "")
-            if subtype == "turn_duration":
-                duration_ms = data.get("durationMs", 0)
-                if duration_ms > 0:
-                    session_turn_durations[session_id].append(duration_ms)
-                continue
-
-            uuid = data.get("uuid", "")
-            parent_uuid = data.get("parentUuid")
-
-            timestamp_str = data.get("timestamp", "")
-            timestamp = _parse_timestamp(timestamp_str)
-
-            # Extract git branch from first user message per session
-            if msg_type == "user" and session_id not in session_git_branches:
-                git_branch = data.get("gitBranch")
-                if git_branch:
-                    session_git_branches[session_id] = git_branch
-
-            # Extract permission mode from user messages
-            if msg_type == "user":
-                perm_mode = data.get("permissionMode")
-                if perm_mode:
-                    session_permission_modes[session_id].append(perm_mode)
-
-            message_data = data.get("message")
-
-            # Handle lines without a message field (e.g. compact_boundary)
-            if message_data is None:
-                role = "system"
-                # Extract compaction metadata if present
-                if subtype == "compact_boundary":
-                    compact_meta = data.get("compactMetadata", {}) or {}
-                    pre_tokens = compact_meta.get("preTokens")
-                    if pre_tokens and isinstance(pre_tokens, int):
-                        session_compact_pre_tokens[session_id].append(pre_tokens)
-                parsed = ParsedMessage(
-                    uuid=uuid,
-                    parent_uuid=parent_uuid,
-                    session_id=session_id,
-                    timestamp=timestamp,
-                    role=role,
-                    type=msg_type,
-                    input_tokens=0,
-                    output_tokens=0,
-                    cache_read_tokens=0,
-                    cache_creation_tokens=0,
-                    content_length=len(data.get("content", "") or ""),
-                )
-                messages_by_session[session_id].append(parsed)
-                continue
+        # Skip file-history-snapshot lines
+        if msg_type == "file-history-snapshot":
+            continue
 
-            # Extract role
-            role = message_data.get("role", "")
-            if not role:
-                if msg_type in ("system", "progress"):
-                    role = msg_type
-                else:
-                    role = msg_type
-
-            # Extract token usage
-            usage = message_data.get("usage", {}) or {}
-            input_tokens = usage.get("input_tokens", 0)
-            output_tokens = usage.get("output_tokens", 0)
-            cache_creation_tokens = usage.get("cache_creation_input_tokens", 0)
-            cache_read_tokens = usage.get("cache_read_input_tokens", 0)
-
-            # Extract model and stop_reason from assistant messages
-            model = None
-            stop_reason = None
-            if role == "assistant":
-                model = message_data.get("model")
-                stop_reason = message_data.get("stop_reason")
-
-            # Extract tool calls, content_length, prompt_length, thinking, and error ids
-            tool_calls: list[ToolCall] = []
-            content_length = 0
-            prompt_length = 0
-            thinking_chars = 0
-            content = message_data.get("content")
-
-            if isinstance(content, str):
-                content_length = len(content)
-                if role == "user":
-                    prompt_length = content_length
-            elif isinstance(content, list):
-                for item in content:
-                    if not isinstance(item, dict):
-                        continue
-                    item_type = item.get("type", "")
-                    if item_type == "text":
-                        text_len = len(item.get("text", ""))
-                        content_length += text_len
-                        if role == "user":
-                            prompt_length += text_len
-                    elif item_type == "tool_use":
-                        tool_name = item.get("name", "")
-                        tool_input = item.get("input", {}) or {}
-                        tool_file_path = tool_input.get("file_path")
-                        tool_use_id = item.get("id")
-
-                        # Extract Bash-specific fields
-                        command = None
-                        description = None
-                        if tool_name == "Bash":
-                            command = tool_input.get("command")
-                            description = tool_input.get("description")
-
-                        # Extract edit/write size fields
-                        old_string_len = None
-                        new_string_len = None
-                        if tool_name == "Edit":
-                            old_str = tool_input.get("old_string")
-                            new_str = tool_input.get("new_string")
-                            if old_str is not None:
-                                old_string_len = len(old_str)
-                            if new_str is not None:
-                                new_string_len = len(new_str)
-                        elif tool_name == "Write":
-                            write_content = tool_input.get("content")
-                            if write_content is not None:
-                                new_string_len = len(write_content)
+        session_id = data.get("sessionId")
+        if not session_id:
+            continue
+        # These strings repeat line after line; interning keeps one shared
+        # copy per value across the parsed messages and tool calls
+        session_id = _intern(session_id)
+        msg_type = _intern(msg_type)
+
+        digest = session_digests.get(session_id)
+        if digest is None:
+            digest = session_digests[session_id] = _content_digest(file_path)
+        digest.update(line)
+
+        # Handle custom-title lines
+        if msg_type == "custom-title":
+            title = data.get("customTitle", "")
+            if title:
+                session_titles[session_id] = title
+            continue
 
-                        tc = ToolCall(
-                            tool_name=tool_name,
-                            file_path=tool_file_path,
-                            timestamp=timestamp,
-                            tool_use_id=tool_use_id,
-                            command=command,
-                            description=description,
-                            old_string_len=old_string_len,
-                            new_string_len=new_string_len,
-                        )
-                        tool_calls.append(tc)
-                        if tool_use_id:
-                            tool_use_id_map[tool_use_id] = tc
-                    elif item_type == "thinking":
-                        thinking_text = item.get("thinking", "")
-                        if thinking_text:
-                            thinking_chars += len(thinking_text)
-                    elif item_type == "tool_result":
-                        # Check for errors in tool results
-                        if item.get("is_error"):
-                            result_tool_use_id = item.get("tool_use_id")
-                            if result_tool_use_id:
-                                error_tool_use_ids.add(result_tool_use_id)
+        # Handle turn_duration system lines
+        subtype = data.get("subtype", "")
+        if subtype == "turn_duration":
+            duration_ms = data.get("durationMs", 0)
+            if duration_ms > 0:
+                session_turn_durations[session_id].append(duration_ms)
+            continue
 
+        if session_id != current_session_id:
+            current_session_id = session_id
+            current_messages = messages_by_session.setdefault(session_id, [])
+
+        uuid = data.get("uuid", "")
+        parent_uuid = data.get("parentUuid")
+
+        timestamp_str = data.get("timestamp", "")
+        timestamp = _parse_timestamp(timestamp_str)
+
+        # Extract git branch from first user message per session
+        if msg_type == "user" and session_id not in session_git_branches:
+            git_branch = data.get("gitBranch")
+            if git_branch:
+                session_git_branches[session_id] = git_branch
+
+        # Extract permission mode from user messages
+        if msg_type == "user":
+            perm_mode = data.get("permissionMode")
+            if perm_mode:
+                session_permission_modes[session_id].append(perm_mode)
+
+        message_data = data.get("message")
+
+        # Handle lines without a message field (e.g. compact_boundary)
+        if message_data is None:
+            role = "system"
+            # Extract compaction metadata if present
+            if subtype == "compact_boundary":
+                compact_meta = data.get("compactMetadata", {}) or {}
+                pre_tokens = compact_meta.get("preTokens")
+                if pre_tokens and isinstance(pre_tokens, int):
+                    session_compact_pre_tokens[session_id].append(pre_tokens)
             parsed = ParsedMessage(
                 uuid=uuid,
                 parent_uuid=parent_uuid,
@@ -227,18 +207,119 @@ def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
                 timestamp=timestamp,
                 role=role,
                 type=msg_type,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                cache_read_tokens=cache_read_tokens,
-                cache_creation_tokens=cache_creation_tokens,
-                content_length=content_length,
-                tool_calls=tool_calls,
-                model=model,
-                stop_reason=stop_reason,
-                prompt_length=prompt_length,
-                thinking_chars=thinking_chars,
+                input_tokens=0,
+                output_tokens=0,
+                cache_read_tokens=0,
+                cache_creation_tokens=0,
+                content_length=len(data.get("content", "") or ""),
             )
-            messages_by_session[session_id].append(parsed)
+            current_messages.append(parsed)
+            continue
+
+        # Extract role
+        role = _intern(message_data.get("role", "")) or msg_type
+
+        # Extract token usage
+        usage = message_data.get("usage", {}) or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        cache_creation_tokens = usage.get("cache_creation_input_tokens", 0)
+        cache_read_tokens = usage.get("cache_read_input_tokens", 0)
+
+        # Extract model and stop_reason from assistant messages
+        model = None
+        stop_reason = None
+        if role == "assistant":
+            model = _intern(message_data.get("model"))
+            stop_reason = _intern(message_data.get("stop_reason"))
+
+        # Extract tool calls, content_length, prompt_length, thinking, and error ids
+        tool_calls: list[ToolCall] = []
+        content_length = 0
+        prompt_length = 0
+        thinking_chars = 0
+        content = message_data.get("content")
+
+        if isinstance(content, str):
+            content_length = len(content)
+            if role == "user":
+                prompt_length = content_length
+        elif isinstance(content, list):
+            for item in content:
+                if not isinstance(item, dict):
+                    continue
+                item_type = item.get("type", "")
+                if item_type == "text":
+                    text_len = len(item.get("text", ""))
+                    content_length += text_len
+                    if role == "user":
+                        prompt_length += text_len
+                elif item_type == "tool_use":
+                    tool_name = _intern(item.get("name", ""))
+                    tool_input = item.get("input", {}) or {}
+                    tool_file_path = tool_input.get("file_path")
+                    tool_use_id = item.get("id")
+
+                    # Most calls carry only the four leading fields; build
+                    # those positionally and pass keywords only for the
+                    # tools that fill in more
+                    if tool_name == "Bash":
+                        tc = ToolCall(
+                            tool_name, tool_file_path, timestamp, tool_use_id,
+                            command=tool_input.get("command"),
+                            description=tool_input.get("description"),
+                        )
+                    elif tool_name == "Edit":
+                        old_str = tool_input.get("old_string")
+                        new_str = tool_input.get("new_string")
+                        tc = ToolCall(
+                            tool_name, tool_file_path, timestamp, tool_use_id,
+                            old_string_len=None if old_str is None else len(old_str),
+                            new_string_len=None if new_str is None else len(new_str),
+                        )
+                    elif tool_name == "Write":
+                        write_content = tool_input.get("content")
+                        tc = ToolCall(
+                            tool_name, tool_file_path, timestamp, tool_use_id,
+                            new_string_len=(
+                                None if write_content is None else len(write_content)
+                            ),
+                        )
+                    else:
+                        tc = ToolCall(tool_name, tool_file_path, timestamp, tool_use_id)
+                    tool_calls.append(tc)
+                    if tool_use_id:
+                        tool_use_id_map[tool_use_id] = tc
+                elif item_type == "thinking":
+                    thinking_text = item.get("thinking", "")
+                    if thinking_text:
+                        thinking_chars += len(thinking_text)
+                elif item_type == "tool_result":
+                    # Check for errors in tool results
+                    if item.get("is_error"):
+                        result_tool_use_id = item.get("tool_use_id")
+                        if result_tool_use_id:
+                            error_tool_use_ids.add(result_tool_use_id)
+
+        parsed = ParsedMessage(
+            uuid=uuid,
+            parent_uuid=parent_uuid,
+            session_id=session_id,
+            timestamp=timestamp,
+            role=role,
+            type=msg_type,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_creation_tokens=cache_creation_tokens,
+            content_length=content_length,
+            tool_calls=tool_calls,
+            model=model,
+            stop_reason=stop_reason,
+            prompt_length=prompt_length,
+            thinking_chars=thinking_chars,
+        )
+        current_messages.append(parsed)
 
     # Correlate errors: mark ToolCalls whose tool_use_id appeared in error results
     for err_id in error_tool_use_ids:
@@ -252,27 +333,75 @@ def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
     # Build ParsedSession objects
     sessions: list[ParsedSession] = []
     for session_id, messages in messages_by_session.items():
-        messages.sort(key=lambda m: m.timestamp)
+        messages.sort(key=_BY_TIMESTAMP)
 
         started_at = messages[0].timestamp
         ended_at = messages[-1].timestamp
         duration_seconds = int((ended_at - started_at).total_seconds())
 
-        total_input = sum(m.input_tokens for m in messages)
-        total_output = sum(m.output_tokens for m in messages)
-        total_cache_read = sum(m.cache_read_tokens for m in messages)
-        total_cache_creation = sum(m.cache_creation_tokens for m in messages)
-
-        user_count = sum(1 for m in messages if m.role == "user")
-        assistant_count = sum(1 for m in messages if m.role == "assistant")
+        # One pass over messages and their tool calls for every per-session
+        # counter; the derived metrics below reuse its outputs
+        total_input = total_output = total_cache_read = total_cache_creation = 0
+        user_count = assistant_count = 0
+        total_thinking_chars = thinking_message_count = 0
+        tool_call_count = tool_error_count = total_edits = tested_edits = 0
+        tool_counts: Counter[str] = Counter()
+        # Peak assistant context size, and how often it dropped by half from
+        # above 100k (the compaction heuristic used without compact_boundary)
+        peak_assistant_context = context_drops = prev_context = 0
+        file_edit_counts: dict[str, int] = defaultdict(int)
+        for m in messages:
+            total_input += m.input_tokens
+            total_output += m.output_tokens
+            total_cache_read += m.cache_read_tokens
+            total_cache_creation += m.cache_creation_tokens
+            if m.thinking_chars > 0:
+                total_thinking_chars += m.thinking_chars
+                thinking_message_count += 1
+            role = m.role
+            if role == "user":
+                user_count += 1
+            elif role == "assistant":
+                assistant_count += 1
+                context = m.input_tokens + m.cache_read_tokens + m.cache_creation_tokens
+                if context > peak_assistant_context:
+                    peak_assistant_context = context
+                if prev_context > 100_000 and context < prev_context * 0.5:
+                    context_drops += 1
+                prev_context = context
+            tool_calls = m.tool_calls
+            if not tool_calls:
+                continue
+            tool_call_count += len(tool_calls)
+            # Walk backwards so "a Bash call follows this edit" is one flag
+            bash_follows = False
+            for tc in reversed(tool_calls):
+                name = tc.tool_name
+                tool_counts[name] += 1
+                if tc.is_error:
+                    tool_error_count += 1
+                if name == "Bash":
+                    bash_follows = True
+                elif name in _EDIT_TOOLS:
+                    if tc.file_path:
+                        file_edit_counts[tc.file_path] += 1
+                    # An edit is "tested" when a later call in the same
+                    # assistant message runs Bash
+                    if role == "assistant":
+                        total_edits += 1
+                        if bash_follows:
+                            tested_edits += 1
 
-        all_tool_calls = [tc for m in messages for tc in m.tool_calls]
-        tool_call_count = len(all_tool_calls)
+        # Errors are correlated by tool_use_id across the whole file, so a
+        # tool_result logged under another session can flag one of this
+        # session's calls; folding the count in keeps the hash honest
+        digest = session_digests[session_id]
+        digest.update(b"errors:%d" % tool_error_count)
 
-        file_read_count = sum(1 for tc in all_tool_calls if tc.tool_name == "Read")
-        file_write_count = sum(1 for tc in all_tool_calls if tc.tool_name == "Write")
-        file_edit_count = sum(1 for tc in all_tool_calls if tc.tool_name == "Edit")
-        bash_count = sum(1 for tc in all_tool_calls if tc.tool_name == "Bash")
+        file_read_count = tool_counts["Read"]
+        file_write_count = tool_counts["Write"]
+        file_edit_count = tool_counts["Edit"]
+        bash_count = tool_counts["Bash"]
 
         # Compute compaction data
         # Prefer compact_boundary metadata when available
@@ -281,25 +410,11 @@ def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
             compaction_count = len(pre_tokens_list)
             peak_context = max(pre_tokens_list)
             # Also check assistant message context sizes for a potentially higher peak
-            context_sizes = [
-                m.input_tokens + m.cache_read_tokens + m.cache_creation_tokens
-                for m in messages
-                if m.role == "assistant"
-            ]
-            if context_sizes:
-                peak_context = max(peak_context, max(context_sizes))
+            peak_context = max(peak_context, peak_assistant_context)
         else:
             # Fallback: heuristic from assistant message context drops
-            context_sizes = [
-                m.input_tokens + m.cache_read_tokens + m.cache_creation_tokens
-                for m in messages
-                if m.role == "assistant"
-            ]
-            peak_context = max(context_sizes) if context_sizes else 0
-            compaction_count = 0
-            for i in range(1, len(context_sizes)):
-                if context_sizes[i - 1] > 100_000 and context_sizes[i] < context_sizes[i - 1] * 0.5:
-                    compaction_count += 1
+            peak_context = peak_assistant_context
+            compaction_count = context_drops
 
         # Turn duration metrics
         turn_durations = session_turn_durations.get(session_id, [])
@@ -307,9 +422,6 @@ def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
         turn_count = len(turn_durations)
         max_turn_duration_ms = max(turn_durations) if turn_durations else 0
 
-        # Tool error count
-        tool_error_count = sum(1 for tc in all_tool_calls if tc.is_error)
-
         # Git branch
         git_branch = session_git_branches.get(session_id)
 
@@ -317,38 +429,15 @@ def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
         custom_title = session_titles.get(session_id)
 
         # Derived: rework_file_count (files edited 3+ times)
-        file_edit_counts: dict[str, int] = defaultdict(int)
-        for tc in all_tool_calls:
-            if tc.tool_name in ("Edit", "Write") and tc.file_path:
-                file_edit_counts[tc.file_path] += 1
         rework_file_count = sum(1 for c in file_edit_counts.values() if c >= 3)
 
         # Derived: test_after_edit_rate
-        # Within each assistant message, if Edit/Write is followed by Bash, the edit is "tested"
-        total_edits = 0
-        tested_edits = 0
-        for m in messages:
-            if m.role != "assistant" or not m.tool_calls:
-                continue
-            for i, tc in enumerate(m.tool_calls):
-                if tc.tool_name in ("Edit", "Write"):
-                    total_edits += 1
-                    # Check if any subsequent tool call in this message is Bash
-                    for j in range(i + 1, len(m.tool_calls)):
-                        if m.tool_calls[j].tool_name == "Bash":
-                            tested_edits += 1
-                            break
         test_after_edit_rate = tested_edits / total_edits if total_edits > 0 else 0.0
 
-        # Thinking metrics
-        total_thinking_chars = sum(m.thinking_chars for m in messages)
-        thinking_message_count = sum(1 for m in messages if m.thinking_chars > 0)
-
         # Permission mode — most common mode in this session
         perm_modes = session_permission_modes.get(session_id, [])
         if perm_modes:
-            from collections import Counter as _Counter
-            permission_mode = _Counter(perm_modes).most_common(1)[0][0]
+            permission_mode = Counter(perm_modes).most_common(1)[0][0]
         else:
             permission_mode = None
 
@@ -358,14 +447,14 @@ def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
             b.duration_seconds for b in work_blocks
         )
 
-        cost = round(sum(
-            estimate_cost(
+        cost = estimate_cost_batch(
+            (
                 m.input_tokens, m.output_tokens,
                 m.cache_read_tokens, m.cache_creation_tokens,
-                model=m.model,
+                m.model,
             )
             for m in messages
-        ), 4)
+        )
 
         session = ParsedSession(
             session_id=session_id,
@@ -404,23 +493,37 @@ def parse_jsonl_file(file_path: Path) -> list[ParsedSession]:
             permission_mode=permission_mode,
             active_duration_seconds=active_duration_seconds,
             work_blocks=work_blocks,
+            content_hash=digest.hexdigest(),
         )
         sessions.append(session)
 
     return sessions
 
 
+def _walk_jsonl(log_dir: Path) -> Iterator[Path]:
+    """Yield *.jsonl files under log_dir, never descending into subagents/.
+
+    One os.scandir per directory; d_type from the listing answers the
+    file/dir question without a stat per entry. Symlinked directories are
+    not followed, matching Path.rglob.
+    """
+    stack = [os.fspath(log_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name != "subagents":
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".jsonl") and entry.is_file():
+                        yield Path(entry.path)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+
 def discover_jsonl_files(log_dir: Path) -> list[Path]:
     """Find all JSONL files in the log directory, excluding subagent logs."""
-    log_dir = Path(log_dir)
-    results: list[Path] = []
-    for jsonl_file in log_dir.rglob("*.jsonl"):
-        # Exclude files inside subagents/ subdirectories
-        if "subagents" in jsonl_file.parts:
-            continue
-        results.append(jsonl_file)
-    results.sort()
-    return results
+    return sorted(_walk_jsonl(log_dir))
 
 
 IDLE_GAP_SECONDS = 30 * 60  # 30 minutes
@@ -473,15 +576,26 @@ def _parse_timestamp(ts: str) -> datetime:
     """Parse an ISO 8601 timestamp string into a datetime."""
     if not ts:
         return datetime.now(tz=timezone.utc)
+    return _parse_iso_timestamp(ts)
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _parse_iso_timestamp(ts: str) -> datetime:
+    """fromisoformat, cached: log lines written together share timestamps.
+
+    datetimes are immutable, so one instance can be shared by every message
+    and tool call carrying the same string.
+    """
     # Handle Z suffix
-    ts = ts.replace("Z", "+00:00")
-    return datetime.fromisoformat(ts)
+    return datetime.fromisoformat(ts.replace("Z", "+00:00"))
 
 
+@lru_cache(maxsize=1024)
 def _derive_project_name(project_path: str) -> str:
     """Derive a human-friendly project name from a Claude project directory name.
 
     e.g. '-Users-username-projects-myproject' -> 'myproject'
+    Cached: every log file in a project directory asks for the same name.
     """
     marker = "-projects-"
     idx = project_path.rfind(marker)
@@ -1,16 +1,24 @@
 """SQL query functions for the dashboard — all reads, no writes.
 
-Each function takes db_path as first argument, opens a connection,
-runs queries, and returns plain dicts/lists. Connections are always
-closed in a finally block.
+Each function takes db_path as first argument, borrows a pooled
+connection, runs queries, and returns plain dicts/lists. Connections
+are handed back to the pool when the query function returns.
 """
 
 from __future__ import annotations
 
 import ast
+import atexit
+import functools
+import json
+import os
 import shlex
 import sqlite3
+import threading
+import time
 from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from pathlib import Path as _Path
@@ -18,6 +26,137 @@ from pathlib import Path as _Path
 from aide.cost import OPENAI_PROVIDERS, estimate_cost
 from aide.db import get_connection
 
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+
+# Idle connections kept per database; extras beyond this are closed on return.
+POOL_MAX_IDLE = 4
+
+_idle_connections: dict[str, list[sqlite3.Connection]] = {}
+_pool_lock = threading.Lock()
+
+
+@contextmanager
+def _read_connection(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """Borrow an idle connection for db_path, opening one if none is free.
+
+    Request threads come and go with the web server, so connections are
+    shared across threads rather than cached per thread; each one is only
+    ever used by a single borrower at a time.
+    """
+    key = str(db_path)
+    with _pool_lock:
+        idle = _idle_connections.get(key)
+        con = idle.pop() if idle else None
+    if con is None:
+        con = get_connection(db_path, check_same_thread=False)
+    try:
+        yield con
+    finally:
+        if con.in_transaction:
+            con.rollback()
+        # Callers may switch to plain tuples for large result sets
+        con.row_factory = sqlite3.Row
+        with _pool_lock:
+            idle = _idle_connections.setdefault(key, [])
+            if len(idle) < POOL_MAX_IDLE:
+                idle.append(con)
+                con = None
+        if con is not None:
+            con.close()
+
+
+def close_connections() -> None:
+    """Close every pooled connection and forget every pooled database.
+
+    Registered with atexit so the dashboard closes its connections on exit.
+    """
+    with _pool_lock:
+        pooled = [con for idle in _idle_connections.values() for con in idle]
+        _idle_connections.clear()
+    for con in pooled:
+        con.close()
+
+
+atexit.register(close_connections)
+
+
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+
+SUMMARY_CACHE_TTL_SECONDS = 60
+TREND_CACHE_TTL_SECONDS = 300
+# Expired entries are swept once the cache grows past this many keys.
+QUERY_CACHE_MAX_ENTRIES = 512
+
+_query_cache: dict[tuple, tuple[float, tuple, object]] = {}
+_cache_lock = threading.Lock()
+
+
+def _db_fingerprint(db_path: Path) -> tuple:
+    """Size and mtime of the database and its WAL.
+
+    Any commit — from this process or from a separate ``aide ingest`` —
+    touches one of the two files, so a changed fingerprint means cached
+    results may be stale.
+    """
+    fingerprint: list[int | None] = []
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        # Opening a reader creates an empty WAL; treat it like a missing one
+        if st is None or not st.st_size:
+            fingerprint.extend((None, None))
+        else:
+            fingerprint.extend((st.st_mtime_ns, st.st_size))
+    return tuple(fingerprint)
+
+
+def _cached(ttl: float) -> Callable[[Callable], Callable]:
+    """Cache a query function's result for ttl seconds or until the DB changes.
+
+    Cached values are shared between callers and must be treated as
+    read-only.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(db_path: Path, *args, **kwargs):
+            key = (func.__name__, str(db_path), args, tuple(sorted(kwargs.items())))
+            fingerprint = _db_fingerprint(db_path)
+            now = time.monotonic()
+            with _cache_lock:
+                entry = _query_cache.get(key)
+            if entry is not None and entry[0] > now and entry[1] == fingerprint:
+                return entry[2]
+            value = func(db_path, *args, **kwargs)
+            with _cache_lock:
+                if len(_query_cache) >= QUERY_CACHE_MAX_ENTRIES:
+                    for stale in [k for k, e in _query_cache.items() if e[0] <= now]:
+                        del _query_cache[stale]
+                _query_cache[key] = (now + ttl, fingerprint, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def clear_query_cache(db_path: Path | None = None) -> None:
+    """Drop cached query results for db_path, or for every database."""
+    with _cache_lock:
+        if db_path is None:
+            _query_cache.clear()
+            return
+        key_path = str(db_path)
+        for key in [k for k in _query_cache if k[1] == key_path]:
+            del _query_cache[key]
+
+
 # ---------------------------------------------------------------------------
 # Error categorization
 # ---------------------------------------------------------------------------
@@ -118,7 +257,54 @@ _EXPENSIVE_NO_EDIT_COST_USD = 1.00
 _LOW_ACTIVE_TIME_SECONDS = 60
 _LOW_ACTIVE_TIME_RATIO = 0.05
 
-
+# Session columns the detail page renders or derives values from
+_SESSION_DETAIL_COLUMNS = (
+    "provider",
+    "session_id",
+    "project_name",
+    "source_file",
+    "started_at",
+    "duration_seconds",
+    "active_duration_seconds",
+    "total_input_tokens",
+    "total_output_tokens",
+    "total_cache_read_tokens",
+    "total_cache_creation_tokens",
+    "estimated_cost_usd",
+    "message_count",
+    "user_message_count",
+    "assistant_message_count",
+    "thinking_message_count",
+    "total_thinking_chars",
+    "turn_count",
+    "total_turn_duration_ms",
+    "max_turn_duration_ms",
+    "tool_error_count",
+    "custom_title",
+    "git_branch",
+    "permission_mode",
+)
+_SESSION_DETAIL_SELECT = ", ".join(_SESSION_DETAIL_COLUMNS)
+
+# Per-file counter each file tool feeds; other tools that carry a
+# file_path count toward none
+_FILE_TOOL_KINDS = {
+    "Read": "read_count",
+    "Glob": "read_count",
+    "Grep": "read_count",
+    "Edit": "edit_count",
+    "Write": "write_count",
+}
+# Per-file read/edit/write counts: Read/Glob/Grep = read, Edit = edit,
+# Write = write; other tools that carry a file_path count toward none.
+_FILE_TOOL_COUNTS = """
+    SUM(tool_name IN ('Read', 'Glob', 'Grep')) AS read_count,
+    SUM(tool_name = 'Edit') AS edit_count,
+    SUM(tool_name = 'Write') AS write_count,
+    SUM(tool_name IN ('Read', 'Glob', 'Grep', 'Edit', 'Write')) AS total"""
+
+
+@_cached(SUMMARY_CACHE_TTL_SECONDS)
 def get_overview_summary(db_path: Path, provider: str | None = None) -> dict:
     """Summary stats for the overview page.
 
@@ -129,85 +315,74 @@ def get_overview_summary(db_path: Path, provider: str | None = None) -> dict:
             today: {sessions, cost},
         }
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         today = date.today()
         thirty_days_ago = (today - timedelta(days=30)).isoformat()
         # Monday of the current week
         week_start = (today - timedelta(days=today.weekday())).isoformat()
-        today_str = today.isoformat()
 
-        provider_filter = "AND provider = ?" if provider else ""
-        provider_params = (provider,) if provider else ()
-        wb_provider_filter = "AND provider = ?" if provider else ""
-
-        row_30d = con.execute(
-            f"""SELECT
-                COUNT(*) AS sessions,
-                COALESCE(SUM(estimated_cost_usd), 0) AS cost,
-                COUNT(DISTINCT project_name) AS projects
-            FROM sessions
-            WHERE date(started_at) >= ? {provider_filter}""",
-            (thirty_days_ago, *provider_params),
-        ).fetchone()
+        # Plain comparisons against ISO date strings keep the started_at
+        # indexes usable: "2026-01-05T09:00:00+00:00" >= "2026-01-05".
+        provider_filter = "AND provider = :provider" if provider else ""
+        params = {
+            "d30": thirty_days_ago,
+            "week": week_start,
+            "today": today.isoformat(),
+            "tomorrow": (today + timedelta(days=1)).isoformat(),
+            "provider": provider,
+        }
 
-        row_week = con.execute(
+        # One pass over the 30-day window; the week and today buckets are
+        # subsets of it.
+        row = con.execute(
             f"""SELECT
-                COUNT(*) AS sessions,
-                COALESCE(SUM(estimated_cost_usd), 0) AS cost,
-                COUNT(DISTINCT project_name) AS projects
+                COUNT(*) AS sessions_30d,
+                COALESCE(SUM(estimated_cost_usd), 0) AS cost_30d,
+                COUNT(DISTINCT project_name) AS projects_30d,
+                COUNT(CASE WHEN started_at >= :week THEN 1 END) AS sessions_week,
+                COALESCE(SUM(CASE WHEN started_at >= :week
+                                  THEN estimated_cost_usd END), 0) AS cost_week,
+                COUNT(DISTINCT CASE WHEN started_at >= :week
+                                    THEN project_name END) AS projects_week,
+                COUNT(CASE WHEN started_at >= :today AND started_at < :tomorrow
+                           THEN 1 END) AS sessions_today,
+                COALESCE(SUM(CASE WHEN started_at >= :today AND started_at < :tomorrow
+                                  THEN estimated_cost_usd END), 0) AS cost_today
             FROM sessions
-            WHERE date(started_at) >= ? {provider_filter}""",
-            (week_start, *provider_params),
+            WHERE started_at >= :d30 {provider_filter}""",
+            params,
         ).fetchone()
 
-        row_today = con.execute(
+        wb = con.execute(
             f"""SELECT
-                COUNT(*) AS sessions,
-                COALESCE(SUM(estimated_cost_usd), 0) AS cost
-            FROM sessions
-            WHERE date(started_at) = ? {provider_filter}""",
-            (today_str, *provider_params),
-        ).fetchone()
-
-        # Work block counts for each period
-        wb_30d = con.execute(
-            f"""SELECT COUNT(*) AS n FROM work_blocks
-            WHERE date(started_at) >= ? {wb_provider_filter}""",
-            (thirty_days_ago, *provider_params),
-        ).fetchone()
-        wb_week = con.execute(
-            f"""SELECT COUNT(*) AS n FROM work_blocks
-            WHERE date(started_at) >= ? {wb_provider_filter}""",
-            (week_start, *provider_params),
-        ).fetchone()
-        wb_today = con.execute(
-            f"""SELECT COUNT(*) AS n FROM work_blocks
-            WHERE date(started_at) = ? {wb_provider_filter}""",
-            (today_str, *provider_params),
+                COUNT(*) AS n_30d,
+                COUNT(CASE WHEN started_at >= :week THEN 1 END) AS n_week,
+                COUNT(CASE WHEN started_at >= :today AND started_at < :tomorrow
+                           THEN 1 END) AS n_today
+            FROM work_blocks
+            WHERE started_at >= :d30 {provider_filter}""",
+            params,
         ).fetchone()
 
         return {
             "last_30d": {
-                "sessions": row_30d["sessions"],
-                "work_blocks": wb_30d["n"],
-                "cost": row_30d["cost"],
-                "projects": row_30d["projects"],
+                "sessions": row["sessions_30d"],
+                "work_blocks": wb["n_30d"],
+                "cost": row["cost_30d"],
+                "projects": row["projects_30d"],
             },
             "this_week": {
-                "sessions": row_week["sessions"],
-                "work_blocks": wb_week["n"],
-                "cost": row_week["cost"],
-                "projects": row_week["projects"],
+                "sessions": row["sessions_week"],
+                "work_blocks": wb["n_week"],
+                "cost": row["cost_week"],
+                "projects": row["projects_week"],
             },
             "today": {
-                "sessions": row_today["sessions"],
-                "work_blocks": wb_today["n"],
-                "cost": row_today["cost"],
+                "sessions": row["sessions_today"],
+                "work_blocks": wb["n_today"],
+                "cost": row["cost_today"],
             },
         }
-    finally:
-        con.close()
 
 
 def get_data_freshness(db_path: Path) -> list[dict]:
@@ -216,8 +391,7 @@ def get_data_freshness(db_path: Path) -> list[dict]:
     Returns one row for each known provider without exposing raw source paths.
     """
     providers = ("claude", "codex")
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         session_rows = con.execute(
             """SELECT
                 provider,
@@ -258,10 +432,9 @@ def get_data_freshness(db_path: Path) -> list[dict]:
                 ),
             })
         return result
-    finally:
-        con.close()
 
 
+@_cached(TREND_CACHE_TTL_SECONDS)
 def get_daily_cost_series(
     db_path: Path,
     days: int = 90,
@@ -272,25 +445,23 @@ def get_daily_cost_series(
     Returns:
         [{date, cost, cost_7d_avg}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         cutoff = (date.today() - timedelta(days=days)).isoformat()
         provider_filter = "AND provider = ?" if provider else ""
         params = (cutoff, provider) if provider else (cutoff,)
+        con.row_factory = None
         rows = con.execute(
             f"""SELECT date(started_at) AS date,
                       COALESCE(SUM(estimated_cost_usd), 0) AS cost
             FROM sessions
-            WHERE date(started_at) >= ? {provider_filter}
+            WHERE started_at >= ? {provider_filter}
             GROUP BY date(started_at)
             ORDER BY date""",
             params,
         ).fetchall()
 
         # Build a date→cost map, then fill gaps with $0
-        cost_map: dict[str, float] = {}
-        for row in rows:
-            cost_map[row["date"]] = row["cost"] or 0.0
+        cost_map: dict[str, float] = {day: cost or 0.0 for day, cost in rows}
 
         if not cost_map:
             return []
@@ -315,10 +486,9 @@ def get_daily_cost_series(
             current += timedelta(days=1)
 
         return result
-    finally:
-        con.close()
 
 
+@_cached(TREND_CACHE_TTL_SECONDS)
 def get_weekly_session_counts(
     db_path: Path,
     weeks: int = 12,
@@ -329,28 +499,27 @@ def get_weekly_session_counts(
     Returns:
         [{week_start, session_count}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         cutoff = (date.today() - timedelta(weeks=weeks)).isoformat()
         provider_filter = "AND provider = ?" if provider else ""
         params = (cutoff, provider) if provider else (cutoff,)
+        # week_start: 'weekday 1' advances to the next Monday (or stays on
+        # one), then '-7 days' steps back a week
         rows = con.execute(
             f"""SELECT
-                -- SQLite: date(started_at, 'weekday 0', '-6 days') gives Monday
                 date(started_at, 'weekday 1', '-7 days') AS week_start,
                 COUNT(*) AS session_count
             FROM sessions
-            WHERE date(started_at) >= ? {provider_filter}
+            WHERE started_at >= ? {provider_filter}
             GROUP BY week_start
             ORDER BY week_start""",
             params,
         ).fetchall()
 
         return [{"week_start": r["week_start"], "session_count": r["session_count"]} for r in rows]
-    finally:
-        con.close()
 
 
+@_cached(TREND_CACHE_TTL_SECONDS)
 def get_weekly_work_block_counts(
     db_path: Path,
     weeks: int = 12,
@@ -361,8 +530,7 @@ def get_weekly_work_block_counts(
     Returns:
         [{week_start, work_block_count}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         cutoff = (date.today() - timedelta(weeks=weeks)).isoformat()
         provider_filter = "AND provider = ?" if provider else ""
         params = (cutoff, provider) if provider else (cutoff,)
@@ -371,7 +539,7 @@ def get_weekly_work_block_counts(
                 date(started_at, 'weekday 1', '-7 days') AS week_start,
                 COUNT(*) AS work_block_count
             FROM work_blocks
-            WHERE date(started_at) >= ? {provider_filter}
+            WHERE started_at >= ? {provider_filter}
             GROUP BY week_start
             ORDER BY week_start""",
             params,
@@ -381,18 +549,16 @@ def get_weekly_work_block_counts(
             {"week_start": r["week_start"], "work_block_count": r["work_block_count"]}
             for r in rows
         ]
-    finally:
-        con.close()
 
 
+@_cached(SUMMARY_CACHE_TTL_SECONDS)
 def get_cost_by_project(db_path: Path, provider: str | None = None) -> list[dict]:
     """Total cost per project, sorted descending.
 
     Returns:
         [{project_name, total_cost}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         where = "WHERE provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -407,18 +573,16 @@ def get_cost_by_project(db_path: Path, provider: str | None = None) -> list[dict
         ).fetchall()
 
         return [{"project_name": r["project_name"], "total_cost": r["total_cost"]} for r in rows]
-    finally:
-        con.close()
 
 
+@_cached(SUMMARY_CACHE_TTL_SECONDS)
 def get_token_breakdown(db_path: Path, provider: str | None = None) -> dict:
     """Total token counts across all sessions.
 
     Returns:
         {input, output, cache_read, cache_creation}
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         where = "WHERE provider = ?" if provider else ""
         params = (provider,) if provider else ()
         row = con.execute(
@@ -438,10 +602,9 @@ def get_token_breakdown(db_path: Path, provider: str | None = None) -> dict:
             "cache_read": row["cache_read"],
             "cache_creation": row["cache_creation"],
         }
-    finally:
-        con.close()
 
 
+@_cached(SUMMARY_CACHE_TTL_SECONDS)
 def get_projects_table(db_path: Path, provider: str | None = None) -> list[dict]:
     """Project summary table for the projects page.
 
@@ -449,8 +612,7 @@ def get_projects_table(db_path: Path, provider: str | None = None) -> list[dict]
         [{project_name, session_count, total_cost, avg_cost_per_session,
           total_duration_seconds, total_tokens}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         where = "WHERE provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -489,8 +651,6 @@ def get_projects_table(db_path: Path, provider: str | None = None) -> list[dict]
             }
             for r in rows
         ]
-    finally:
-        con.close()
 
 
 def get_session_scatter_data(
@@ -502,30 +662,30 @@ def get_session_scatter_data(
     Returns:
         [{provider, session_id, project_name, estimated_cost_usd, started_at}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         where = "WHERE provider = ?" if provider else ""
         params = (provider,) if provider else ()
+        con.row_factory = None
+        # Iterate the cursor directly rather than holding a fetchall() list
+        # alongside the dicts built from it
         rows = con.execute(
             f"""SELECT provider, session_id, project_name, estimated_cost_usd, started_at
             FROM sessions
             {where}
             ORDER BY started_at""",
             params,
-        ).fetchall()
+        )
 
         return [
             {
-                "provider": r["provider"],
-                "session_id": r["session_id"],
-                "project_name": r["project_name"],
-                "estimated_cost_usd": r["estimated_cost_usd"],
-                "started_at": r["started_at"],
+                "provider": prov,
+                "session_id": sid,
+                "project_name": project,
+                "estimated_cost_usd": cost,
+                "started_at": started,
             }
-            for r in rows
+            for prov, sid, project, cost, started in rows
         ]
-    finally:
-        con.close()
 
 
 def get_sessions_list(
@@ -548,8 +708,7 @@ def get_sessions_list(
         [{session_id, project_name, started_at, duration_seconds,
           message_count, tool_call_count, estimated_cost_usd}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         signal_keys = None
         if investigation_signal:
             signal_rows = get_investigation_sessions_for_signal(
@@ -566,12 +725,15 @@ def get_sessions_list(
 
         query = """SELECT
                 s.provider, s.session_id, s.project_name, s.started_at, s.duration_seconds,
-                s.active_duration_seconds,
+                COALESCE(s.active_duration_seconds, 0),
                 s.message_count, s.user_message_count, s.tool_call_count,
-                s.estimated_cost_usd, s.total_input_tokens, s.total_output_tokens,
-                s.total_cache_read_tokens, s.total_cache_creation_tokens,
-                s.file_edit_count, s.file_write_count, s.compaction_count,
-                s.custom_title, s.tool_error_count,
+                s.estimated_cost_usd,
+                COALESCE(s.total_input_tokens, 0) + COALESCE(s.total_output_tokens, 0)
+                    + COALESCE(s.total_cache_read_tokens, 0)
+                    + COALESCE(s.total_cache_creation_tokens, 0),
+                COALESCE(s.file_edit_count, 0) + COALESCE(s.file_write_count, 0),
+                COALESCE(s.compaction_count, 0) > 0,
+                s.custom_title, COALESCE(s.tool_error_count, 0),
                 (SELECT COUNT(*) FROM work_blocks wb
                  WHERE wb.provider = s.provider
                    AND wb.session_id = s.session_id) AS work_block_count
@@ -586,45 +748,50 @@ def get_sessions_list(
             filters.append("s.provider = ?")
             params.append(provider)
         if signal_keys is not None:
-            signal_clauses = []
-            for signal_provider, signal_session_id in sorted(signal_keys):
-                signal_clauses.append("(s.provider = ? AND s.session_id = ?)")
-                params.extend([signal_provider, signal_session_id])
-            filters.append("(" + " OR ".join(signal_clauses) + ")")
+            # One JSON parameter keeps the SQL text the same whatever the
+            # number of matching sessions, so the prepared statement is reused
+            filters.append(
+                "(s.provider, s.session_id) IN ("
+                "SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') "
+                "FROM json_each(?))"
+            )
+            params.append(json.dumps(sorted(signal_keys)))
 
         if filters:
             query += " WHERE " + " AND ".join(filters)
 
         query += " ORDER BY s.started_at DESC"
 
-        rows = con.execute(query, tuple(params)).fetchall()
+        # Plain tuples streamed straight off the cursor: this list covers
+        # every session
+        con.row_factory = None
+        rows = con.execute(query, tuple(params))
 
         return [
             {
-                "session_id": r["session_id"],
-                "provider": r["provider"],
-                "project_name": r["project_name"],
-                "started_at": r["started_at"],
-                "duration_seconds": r["duration_seconds"],
-                "active_duration_seconds": r["active_duration_seconds"] or 0,
-                "work_block_count": r["work_block_count"],
-                "message_count": r["message_count"],
-                "user_message_count": r["user_message_count"],
-                "tool_call_count": r["tool_call_count"],
-                "estimated_cost_usd": r["estimated_cost_usd"],
-                "total_tokens": (
-                    (r["total_input_tokens"] or 0) + (r["total_output_tokens"] or 0)
-                    + (r["total_cache_read_tokens"] or 0) + (r["total_cache_creation_tokens"] or 0)
-                ),
-                "edits": (r["file_edit_count"] or 0) + (r["file_write_count"] or 0),
-                "had_compaction": (r["compaction_count"] or 0) > 0,
-                "custom_title": r["custom_title"],
-                "tool_error_count": r["tool_error_count"] or 0,
+                "session_id": sid,
+                "provider": prov,
+                "project_name": project,
+                "started_at": started,
+                "duration_seconds": duration,
+                "active_duration_seconds": active,
+                "work_block_count": work_blocks,
+                "message_count": messages,
+                "user_message_count": user_messages,
+                "tool_call_count": tool_calls,
+                "estimated_cost_usd": cost,
+                "total_tokens": total_tokens,
+                "edits": edits,
+                "had_compaction": bool(had_compaction),
+                "custom_title": title,
+                "tool_error_count": tool_errors,
             }
-            for r in rows
+            for (
+                prov, sid, project, started, duration, active,
+                messages, user_messages, tool_calls, cost,
+                total_tokens, edits, had_compaction, title, tool_errors, work_blocks,
+            ) in rows
         ]
-    finally:
-        con.close()
 
 
 def get_investigation_sessions_for_signal(
@@ -663,175 +830,170 @@ def get_session_detail(
 ) -> dict | None:
     """Full detail for a single session.
 
+    All reads run inside one BEGIN/COMMIT so they see the same snapshot.
+
     Returns:
         Dict with all session fields plus:
         - tool_usage: [{tool_name, count}, ...]
         - files_touched: [{file_path, read_count, edit_count, write_count, total}, ...]
         Returns None if session not found.
     """
-    con = get_connection(db_path)
-    try:
-        if provider is None:
-            session = con.execute(
-                """SELECT * FROM sessions
-                WHERE session_id = ?
-                ORDER BY CASE WHEN provider = 'claude' THEN 0 ELSE 1 END
-                LIMIT 1""",
-                (session_id,),
-            ).fetchone()
-        else:
-            session = con.execute(
-                "SELECT * FROM sessions WHERE provider = ? AND session_id = ?",
-                (provider, session_id),
-            ).fetchone()
-
-        if session is None:
-            return None
-
-        detail = dict(session)
-        provider = detail["provider"]
-        max_turn_duration_ms = detail.get("max_turn_duration_ms") or 0
-        detail["turn_metrics_reliable"] = (
-            max_turn_duration_ms <= _TURN_WAIT_IDLE_THRESHOLD_MS
-        )
-        detail["turn_metrics_note"] = (
-            "Provider-reported turn waits include an idle gap over 30 minutes, "
-            "so turn wait totals are not summarized. Active time excludes this gap."
-            if not detail["turn_metrics_reliable"]
-            else None
-        )
-
-        # Tool usage breakdown
-        tool_rows = con.execute(
-            """SELECT tool_name, COUNT(*) AS count
-            FROM tool_calls
-            WHERE provider = ? AND session_id = ?
-            GROUP BY tool_name
-            ORDER BY count DESC""",
-            (provider, session_id),
-        ).fetchall()
-
-        detail["tool_usage"] = [
-            {"tool_name": r["tool_name"], "count": r["count"]} for r in tool_rows
-        ]
+    with _read_connection(db_path) as con:
+        con.execute("BEGIN")
+        try:
+            if provider is None:
+                session = con.execute(
+                    f"""SELECT {_SESSION_DETAIL_SELECT} FROM sessions
+                    WHERE session_id = ?
+                    ORDER BY CASE WHEN provider = 'claude' THEN 0 ELSE 1 END
+                    LIMIT 1""",
+                    (session_id,),
+                ).fetchone()
+            else:
+                session = con.execute(
+                    f"SELECT {_SESSION_DETAIL_SELECT} FROM sessions "
+                    "WHERE provider = ? AND session_id = ?",
+                    (provider, session_id),
+                ).fetchone()
+
+            if session is None:
+                return None
+
+            detail = dict(zip(_SESSION_DETAIL_COLUMNS, session))
+            provider = detail["provider"]
+            max_turn_duration_ms = detail.get("max_turn_duration_ms") or 0
+            detail["turn_metrics_reliable"] = (
+                max_turn_duration_ms <= _TURN_WAIT_IDLE_THRESHOLD_MS
+            )
+            detail["turn_metrics_note"] = (
+                "Provider-reported turn waits include an idle gap over 30 minutes, "
+                "so turn wait totals are not summarized. Active time excludes this gap."
+                if not detail["turn_metrics_reliable"]
+                else None
+            )
 
-        # Files touched with read/edit/write breakdown
-        READ_TOOLS = {"Read", "Glob", "Grep"}
-        EDIT_TOOLS = {"Edit"}
-        WRITE_TOOLS = {"Write"}
+            # Tool usage and the per-file read/edit/write breakdown share one
+            # pass over the session's tool calls, grouped by (tool, file)
+            pair_rows = con.execute(
+                """SELECT tool_name, file_path, COUNT(*),
+                          MIN(timestamp), MIN(rowid)
+                FROM tool_calls
+                WHERE provider = ? AND session_id = ?
+                GROUP BY tool_name, file_path""",
+                (provider, session_id),
+            ).fetchall()
 
-        file_rows = con.execute(
-            """SELECT tool_name, file_path
-            FROM tool_calls
-            WHERE provider = ? AND session_id = ? AND file_path IS NOT NULL""",
-            (provider, session_id),
-        ).fetchall()
+            tool_counts: Counter[str] = Counter()
+            files: dict[str, dict] = {}
+            first_use: dict[str, tuple] = {}
+            to = 0
+            for tool_name, file_path, count, first_ts, first_id in pair_rows:
+                tool_counts[tool_name] += count
+                if file_path is None:
+                    continue
+                to += count
+                f = files.get(file_path)
+                if f is None:
+                    f = files[file_path] = {
+                        "file_path": file_path, "read_count": 0, "edit_count": 0,
+                        "write_count": 0, "total": 0,
+                    }
+                    first_use[file_path] = (first_ts, first_id)
+                else:
+                    first_use[file_path] = min(first_use[file_path], (first_ts, first_id))
+                kind = _FILE_TOOL_KINDS.get(tool_name)
+                if kind is not None:
+                    f[kind] += count
+                    f["total"] += count
+
+            # Ties between tools keep tool_name order (most_common is stable)
+            detail["tool_usage"] = [
+                {"tool_name": tool_name, "count": count}
+                for tool_name, count in tool_counts.most_common()
+            ]
+            # Equally busy files are listed in order of first use
+            detail["files_touched"] = sorted(
+                files.values(),
+                key=lambda f: (-f["total"], first_use[f["file_path"]]),
+            )
 
-        files: dict[str, dict] = {}
-        for r in file_rows:
-            fp = r["file_path"]
-            tn = r["tool_name"]
-            if fp not in files:
-                files[fp] = {"file_path": fp, "read_count": 0, "edit_count": 0, "write_count": 0}
-            if tn in READ_TOOLS:
-                files[fp]["read_count"] += 1
-            elif tn in EDIT_TOOLS:
-                files[fp]["edit_count"] += 1
-            elif tn in WRITE_TOOLS:
-                files[fp]["write_count"] += 1
-
-        file_list = list(files.values())
-        for f in file_list:
-            f["total"] = f["read_count"] + f["edit_count"] + f["write_count"]
-        file_list.sort(key=lambda x: x["total"], reverse=True)
-
-        detail["files_touched"] = file_list
-
-        # File focus ratio
-        focus_row = con.execute(
-            """SELECT COUNT(DISTINCT file_path) AS unique_files,
-                      COUNT(*) AS total_ops
-            FROM tool_calls
-            WHERE provider = ? AND session_id = ? AND file_path IS NOT NULL""",
-            (provider, session_id),
-        ).fetchone()
-        uf = focus_row["unique_files"] or 0
-        to = focus_row["total_ops"] or 0
-        detail["file_focus_ratio"] = uf / to if to > 0 else 0.0
-        detail["unique_files"] = uf
-
-        # Thinking ratio for this session
-        detail["thinking_ratio"] = (
-            detail["thinking_message_count"] / detail["assistant_message_count"]
-            if detail.get("assistant_message_count") and detail["assistant_message_count"] > 0
-            else 0.0
-        )
+            # File focus ratio
+            uf = len(files)
+            detail["file_focus_ratio"] = uf / to if to > 0 else 0.0
+            detail["unique_files"] = uf
 
-        # First prompt length
-        first_prompt = con.execute(
-            """SELECT content_length FROM messages
-            WHERE provider = ? AND session_id = ? AND role = 'user'
-            ORDER BY id LIMIT 1""",
-            (provider, session_id),
-        ).fetchone()
-        detail["first_prompt_len"] = (
-            first_prompt["content_length"] if first_prompt else 0
-        )
+            # Thinking ratio for this session
+            detail["thinking_ratio"] = (
+                detail["thinking_message_count"] / detail["assistant_message_count"]
+                if detail.get("assistant_message_count") and detail["assistant_message_count"] > 0
+                else 0.0
+            )
 
-        # Work blocks for this session
-        wb_rows = con.execute(
-            """SELECT block_index, started_at, ended_at,
-                      duration_seconds, message_count
-            FROM work_blocks
-            WHERE provider = ? AND session_id = ?
-            ORDER BY block_index""",
-            (provider, session_id),
-        ).fetchall()
-        detail["work_blocks"] = [
-            {
-                "block_index": wb["block_index"],
-                "started_at": wb["started_at"],
-                "ended_at": wb["ended_at"],
-                "duration_seconds": wb["duration_seconds"],
-                "message_count": wb["message_count"],
-            }
-            for wb in wb_rows
-        ]
+            # First prompt length
+            first_prompt = con.execute(
+                """SELECT content_length FROM messages
+                WHERE provider = ? AND session_id = ? AND role = 'user'
+                ORDER BY id LIMIT 1""",
+                (provider, session_id),
+            ).fetchone()
+            detail["first_prompt_len"] = (
+                first_prompt["content_length"] if first_prompt else 0
+            )
 
-        # Error breakdown for this session
-        if detail.get("tool_error_count") and detail["tool_error_count"] > 0:
-            err_rows = con.execute(
-                """SELECT tool_name, command, description
-                FROM tool_calls
-                WHERE is_error = 1 AND provider = ? AND session_id = ?""",
+            # Work blocks for this session
+            wb_rows = con.execute(
+                """SELECT block_index, started_at, ended_at,
+                          duration_seconds, message_count
+                FROM work_blocks
+                WHERE provider = ? AND session_id = ?
+                ORDER BY block_index""",
                 (provider, session_id),
             ).fetchall()
-            categories: dict[str, int] = {}
-            for r in err_rows:
-                cat = _categorize_error(r["tool_name"], r["command"], r["description"])
-                categories[cat] = categories.get(cat, 0) + 1
-            err_list = [
-                {"category": cat, "count": count}
-                for cat, count in categories.items()
+            detail["work_blocks"] = [
+                {
+                    "block_index": wb["block_index"],
+                    "started_at": wb["started_at"],
+                    "ended_at": wb["ended_at"],
+                    "duration_seconds": wb["duration_seconds"],
+                    "message_count": wb["message_count"],
+                }
+                for wb in wb_rows
             ]
-            err_list.sort(key=lambda x: x["count"], reverse=True)
-            detail["error_breakdown"] = err_list
-        else:
-            detail["error_breakdown"] = []
 
-        return detail
-    finally:
-        con.close()
+            # Error breakdown for this session
+            if detail.get("tool_error_count") and detail["tool_error_count"] > 0:
+                err_rows = con.execute(
+                    """SELECT tool_name, command, description
+                    FROM tool_calls
+                    WHERE is_error = 1 AND provider = ? AND session_id = ?""",
+                    (provider, session_id),
+                ).fetchall()
+                categories: dict[str, int] = {}
+                for r in err_rows:
+                    cat = _categorize_error(r["tool_name"], r["command"], r["description"])
+                    categories[cat] = categories.get(cat, 0) + 1
+                err_list = [
+                    {"category": cat, "count": count}
+                    for cat, count in categories.items()
+                ]
+                err_list.sort(key=lambda x: x["count"], reverse=True)
+                detail["error_breakdown"] = err_list
+            else:
+                detail["error_breakdown"] = []
+
+            return detail
+        finally:
+            con.execute("COMMIT")
 
 
+@_cached(SUMMARY_CACHE_TTL_SECONDS)
 def get_tool_counts(db_path: Path, provider: str | None = None) -> list[dict]:
     """Total usage count per tool, sorted descending.
 
     Returns:
         [{tool_name, count}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         where = "WHERE provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -844,8 +1006,6 @@ def get_tool_counts(db_path: Path, provider: str | None = None) -> list[dict]:
         ).fetchall()
 
         return [{"tool_name": r["tool_name"], "count": r["count"]} for r in rows]
-    finally:
-        con.close()
 
 
 def get_tool_weekly(
@@ -853,34 +1013,32 @@ def get_tool_weekly(
     weeks: int = 12,
     provider: str | None = None,
 ) -> list[dict]:
-    """Tool usage grouped by week and tool name.
+    """Tool usage grouped by week and tool name, from the daily_tool_stats rollup.
 
     Returns:
         [{week_start, tool_name, count}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         cutoff = (date.today() - timedelta(weeks=weeks)).isoformat()
         provider_filter = "AND provider = ?" if provider else ""
         params = (cutoff, provider) if provider else (cutoff,)
+        con.row_factory = None
         rows = con.execute(
             f"""SELECT
-                date(timestamp, 'weekday 1', '-7 days') AS week_start,
+                date(date, 'weekday 1', '-7 days') AS week_start,
                 tool_name,
-                COUNT(*) AS count
-            FROM tool_calls
-            WHERE date(timestamp) >= ? {provider_filter}
+                SUM(count) AS count
+            FROM daily_tool_stats
+            WHERE date >= ? {provider_filter}
             GROUP BY week_start, tool_name
             ORDER BY week_start, count DESC""",
             params,
         ).fetchall()
 
         return [
-            {"week_start": r["week_start"], "tool_name": r["tool_name"], "count": r["count"]}
-            for r in rows
+            {"week_start": week_start, "tool_name": tool_name, "count": count}
+            for week_start, tool_name, count in rows
         ]
-    finally:
-        con.close()
 
 
 def get_tool_daily(
@@ -888,36 +1046,32 @@ def get_tool_daily(
     days: int = 90,
     provider: str | None = None,
 ) -> list[dict]:
-    """Tool usage grouped by day and tool name.
+    """Tool usage grouped by day and tool name, from the daily_tool_stats rollup.
 
     Returns:
         [{date, tool_name, count}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         cutoff = (date.today() - timedelta(days=days)).isoformat()
         provider_filter = "AND provider = ?" if provider else ""
         params = (cutoff, provider) if provider else (cutoff,)
+        con.row_factory = None
         rows = con.execute(
-            f"""SELECT
-                date(timestamp) AS date,
-                tool_name,
-                COUNT(*) AS count
-            FROM tool_calls
-            WHERE date(timestamp) >= ? {provider_filter}
+            f"""SELECT date, tool_name, SUM(count) AS count
+            FROM daily_tool_stats
+            WHERE date >= ? {provider_filter}
             GROUP BY date, tool_name
             ORDER BY date, count DESC""",
             params,
         ).fetchall()
 
         return [
-            {"date": r["date"], "tool_name": r["tool_name"], "count": r["count"]}
-            for r in rows
+            {"date": day, "tool_name": tool_name, "count": count}
+            for day, tool_name, count in rows
         ]
-    finally:
-        con.close()
 
 
+@_cached(SUMMARY_CACHE_TTL_SECONDS)
 def get_effectiveness_summary(db_path: Path, provider: str | None = None) -> dict:
     """Effectiveness metrics aggregated across all sessions.
 
@@ -927,8 +1081,7 @@ def get_effectiveness_summary(db_path: Path, provider: str | None = None) -> dic
          output_ratio, tokens_per_user_msg, turns_per_user_prompt,
          error_rate, iteration_error_pct, rework_rate, session_count}
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         where = "WHERE provider = ?" if provider else ""
         params = (provider,) if provider else ()
         row = con.execute(
@@ -1007,10 +1160,9 @@ def get_effectiveness_summary(db_path: Path, provider: str | None = None) -> dic
             ),
             "session_count": n,
         }
-    finally:
-        con.close()
 
 
+@_cached(TREND_CACHE_TTL_SECONDS)
 def get_effectiveness_trends(
     db_path: Path,
     days: int = 90,
@@ -1022,62 +1174,51 @@ def get_effectiveness_trends(
         [{date, session_id, cache_hit_rate, edit_ratio, had_compaction}, ...]
         Sorted by started_at ascending.
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         cutoff = (date.today() - timedelta(days=days)).isoformat()
         provider_filter = "AND provider = ?" if provider else ""
         params = (cutoff, provider) if provider else (cutoff,)
+        # OpenAI-style providers report cached input inside input tokens
+        if provider and provider.lower() in OPENAI_PROVIDERS:
+            denom = "COALESCE(total_input_tokens, 0) + COALESCE(total_cache_creation_tokens, 0)"
+        else:
+            denom = (
+                "COALESCE(total_input_tokens, 0) + COALESCE(total_cache_read_tokens, 0)"
+                " + COALESCE(total_cache_creation_tokens, 0)"
+            )
+        con.row_factory = None
         rows = con.execute(
             f"""SELECT
-                session_id,
                 started_at,
                 date(started_at) AS date,
-                total_input_tokens,
-                total_cache_read_tokens,
-                total_cache_creation_tokens,
-                tool_call_count,
-                file_edit_count,
-                file_write_count,
-                compaction_count
+                session_id,
+                COALESCE(ROUND(
+                    CAST(COALESCE(total_cache_read_tokens, 0) AS REAL)
+                    / NULLIF({denom}, 0), 4), 0.0) AS cache_hit_rate,
+                COALESCE(ROUND(
+                    CAST(COALESCE(file_edit_count, 0) + COALESCE(file_write_count, 0) AS REAL)
+                    / NULLIF(tool_call_count, 0), 4), 0.0) AS edit_ratio,
+                COALESCE(compaction_count, 0) > 0 AS had_compaction
             FROM sessions
-            WHERE date(started_at) >= ? {provider_filter}
+            WHERE started_at >= ? {provider_filter}
             ORDER BY started_at""",
             params,
         ).fetchall()
 
-        result = []
-        for r in rows:
-            if provider and provider.lower() in OPENAI_PROVIDERS:
-                denom = (
-                    (r["total_input_tokens"] or 0)
-                    + (r["total_cache_creation_tokens"] or 0)
-                )
-            else:
-                denom = (
-                    (r["total_input_tokens"] or 0)
-                    + (r["total_cache_read_tokens"] or 0)
-                    + (r["total_cache_creation_tokens"] or 0)
-                )
-            cache_hit_rate = (
-                (r["total_cache_read_tokens"] or 0) / denom if denom > 0 else 0.0
-            )
-            tools = r["tool_call_count"] or 0
-            edits_writes = (r["file_edit_count"] or 0) + (r["file_write_count"] or 0)
-            edit_ratio = edits_writes / tools if tools > 0 else 0.0
-            result.append({
-                "started_at": r["started_at"],
-                "date": r["date"],
-                "session_id": r["session_id"],
-                "cache_hit_rate": round(cache_hit_rate, 4),
-                "edit_ratio": round(edit_ratio, 4),
-                "had_compaction": (r["compaction_count"] or 0) > 0,
-            })
-
-        return result
-    finally:
-        con.close()
+        return [
+            {
+                "started_at": started,
+                "date": day,
+                "session_id": sid,
+                "cache_hit_rate": cache_hit_rate,
+                "edit_ratio": edit_ratio,
+                "had_compaction": bool(had_compaction),
+            }
+            for started, day, sid, cache_hit_rate, edit_ratio, had_compaction in rows
+        ]
 
 
+@_cached(SUMMARY_CACHE_TTL_SECONDS)
 def get_top_files(
     db_path: Path,
     limit: int = 20,
@@ -1091,44 +1232,22 @@ def get_top_files(
     Returns:
         [{file_path, read_count, edit_count, write_count, total}, ...]
     """
-    READ_TOOLS = {"Read", "Glob", "Grep"}
-    EDIT_TOOLS = {"Edit"}
-    WRITE_TOOLS = {"Write"}
-
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
-            f"""SELECT tool_name, file_path
+            f"""SELECT file_path, {_FILE_TOOL_COUNTS}
             FROM tool_calls
             WHERE file_path IS NOT NULL
                 AND tool_name IN ('Read', 'Glob', 'Grep', 'Edit', 'Write')
-                {provider_filter}""",
-            params,
+                {provider_filter}
+            GROUP BY file_path
+            ORDER BY total DESC, MIN(rowid)
+            LIMIT ?""",
+            (*params, limit),
         ).fetchall()
 
-        files: dict[str, dict] = {}
-        for r in rows:
-            fp = r["file_path"]
-            tn = r["tool_name"]
-            if fp not in files:
-                files[fp] = {"file_path": fp, "read_count": 0, "edit_count": 0, "write_count": 0}
-            if tn in READ_TOOLS:
-                files[fp]["read_count"] += 1
-            elif tn in EDIT_TOOLS:
-                files[fp]["edit_count"] += 1
-            elif tn in WRITE_TOOLS:
-                files[fp]["write_count"] += 1
-
-        file_list = list(files.values())
-        for f in file_list:
-            f["total"] = f["read_count"] + f["edit_count"] + f["write_count"]
-        file_list.sort(key=lambda x: x["total"], reverse=True)
-
-        return file_list[:limit]
-    finally:
-        con.close()
+        return [dict(r) for r in rows]
 
 
 def get_top_bash_commands(
@@ -1141,8 +1260,7 @@ def get_top_bash_commands(
     Returns:
         [{command, count, error_count, error_rate}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider, limit) if provider else (limit,)
         rows = con.execute(
@@ -1170,8 +1288,6 @@ def get_top_bash_commands(
             }
             for r in rows
         ]
-    finally:
-        con.close()
 
 
 # ---------------------------------------------------------------------------
@@ -1186,8 +1302,7 @@ def get_first_prompt_analysis(db_path: Path, provider: str | None = None) -> dic
         {buckets: [{label, n, avg_cost, avg_errors, avg_edits}, ...],
          scatter: [{prompt_len, cost, errors}, ...]}
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND s.provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -1250,8 +1365,6 @@ def get_first_prompt_analysis(db_path: Path, provider: str | None = None) -> dic
             })
 
         return {"buckets": buckets, "scatter": scatter}
-    finally:
-        con.close()
 
 
 def get_cost_concentration(db_path: Path, provider: str | None = None) -> dict:
@@ -1262,8 +1375,7 @@ def get_cost_concentration(db_path: Path, provider: str | None = None) -> dict:
                      custom_title, started_at}, ...],
          top3_pct: float, median: float, p90: float}
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -1304,8 +1416,6 @@ def get_cost_concentration(db_path: Path, provider: str | None = None) -> dict:
             "p90": costs_asc[int(n * 0.9)] if n > 1 else costs_asc[0],
             "total_cost": total_cost,
         }
-    finally:
-        con.close()
 
 
 def get_cost_per_edit_by_duration(
@@ -1317,8 +1427,7 @@ def get_cost_per_edit_by_duration(
     Returns:
         [{label, n, avg_cost_per_edit, total_cost, total_edits}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -1354,8 +1463,6 @@ def get_cost_per_edit_by_duration(
             })
 
         return result
-    finally:
-        con.close()
 
 
 def get_model_breakdown(db_path: Path, provider: str | None = None) -> list[dict]:
@@ -1365,8 +1472,7 @@ def get_model_breakdown(db_path: Path, provider: str | None = None) -> list[dict
         [{provider, model, msg_count, input_tokens, output_tokens, cache_tokens,
           estimated_cost}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -1405,8 +1511,6 @@ def get_model_breakdown(db_path: Path, provider: str | None = None) -> list[dict
             })
 
         return result
-    finally:
-        con.close()
 
 
 def get_tool_sequences(
@@ -1419,8 +1523,7 @@ def get_tool_sequences(
     Returns:
         [{from_tool, to_tool, count}, ...]
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         where = "WHERE provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -1446,8 +1549,6 @@ def get_tool_sequences(
             {"from_tool": a, "to_tool": b, "count": c}
             for (a, b), c in transitions.most_common(limit)
         ]
-    finally:
-        con.close()
 
 
 def get_time_patterns(db_path: Path, provider: str | None = None) -> dict:
@@ -1460,8 +1561,7 @@ def get_time_patterns(db_path: Path, provider: str | None = None) -> dict:
         {by_hour: [{hour, count}, ...],
          by_day: [{day, day_name, count}, ...]}
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         where = "WHERE provider = ?" if provider else ""
         params = (provider,) if provider else ()
         hour_rows = con.execute(
@@ -1498,8 +1598,6 @@ def get_time_patterns(db_path: Path, provider: str | None = None) -> dict:
                 for r in day_rows
             ],
         }
-    finally:
-        con.close()
 
 
 def get_user_response_times(db_path: Path, provider: str | None = None) -> dict:
@@ -1509,8 +1607,7 @@ def get_user_response_times(db_path: Path, provider: str | None = None) -> dict:
         {median_seconds: float, mean_seconds: float, count: int,
          buckets: [{label, count, pct}, ...]}
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -1578,8 +1675,6 @@ def get_user_response_times(db_path: Path, provider: str | None = None) -> dict:
             "count": n,
             "buckets": buckets,
         }
-    finally:
-        con.close()
 
 
 def get_thinking_stats(db_path: Path, provider: str | None = None) -> dict:
@@ -1592,8 +1687,7 @@ def get_thinking_stats(db_path: Path, provider: str | None = None) -> dict:
                        thinking_chars, thinking_messages, estimated_cost_usd,
                        tool_error_count}, ...]}
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -1634,8 +1728,6 @@ def get_thinking_stats(db_path: Path, provider: str | None = None) -> dict:
                 for r in rows[:10]
             ],
         }
-    finally:
-        con.close()
 
 
 def get_permission_mode_breakdown(
@@ -1647,8 +1739,7 @@ def get_permission_mode_breakdown(
     Returns:
         [{mode, count, pct}, ...] sorted by count desc.
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -1669,8 +1760,6 @@ def get_permission_mode_breakdown(
             }
             for r in rows
         ]
-    finally:
-        con.close()
 
 
 def get_permission_friction_summary(
@@ -1684,8 +1773,7 @@ def get_permission_friction_summary(
     errors without returning raw command strings or tool output.
     """
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND s.provider = ?" if provider else ""
         params = (cutoff.isoformat(), provider) if provider else (cutoff.isoformat(),)
 
@@ -1840,8 +1928,6 @@ def get_permission_friction_summary(
             )[:10],
             "top_sessions": top_sessions[:8],
         }
-    finally:
-        con.close()
 
 
 def get_investigation_queue(
@@ -1856,8 +1942,7 @@ def get_investigation_queue(
     categories. It does not expose raw commands, prompts, or tool output.
     """
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         session_params = (
             (cutoff.isoformat(), provider) if provider else (cutoff.isoformat(),)
@@ -2004,8 +2089,6 @@ def get_investigation_queue(
             reverse=True,
         )
         return rows[:limit]
-    finally:
-        con.close()
 
 
 def get_investigation_action_summary(
@@ -2201,8 +2284,7 @@ def get_effectiveness_daily_trends(
 ) -> list[dict]:
     """Daily effectiveness trend series for charting rates over time."""
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (cutoff.isoformat(), provider) if provider else (cutoff.isoformat(),)
         session_rows = con.execute(
@@ -2234,8 +2316,6 @@ def get_effectiveness_daily_trends(
         ).fetchall()
         for row in edit_rows:
             _add_edit_call_to_effectiveness_bucket(buckets[row["started_at"][:10]], row)
-    finally:
-        con.close()
 
     flagged_rows = get_investigation_queue(
         db_path,
@@ -2267,41 +2347,39 @@ def get_effectiveness_snapshot_history(
     scope = "provider" if provider else "all"
     provider_value = provider or "__all__"
 
-    con = get_connection(db_path)
     try:
-        rows = con.execute(
-            """SELECT snapshot_date AS date,
-                      window_days,
-                      scope,
-                      provider,
-                      project_name,
-                      session_count,
-                      total_cost,
-                      avg_cost_per_session,
-                      avg_active_seconds,
-                      error_rate,
-                      no_edit_session_count,
-                      no_edit_rate,
-                      edit_attribution_rate,
-                      cost_per_edit,
-                      review_session_count,
-                      review_rate,
-                      review_score
-            FROM effectiveness_snapshots
-            WHERE snapshot_date >= ?
-              AND scope = ?
-              AND provider = ?
-              AND project_name = '__all__'
-            ORDER BY snapshot_date""",
-            (cutoff.isoformat(), scope, provider_value),
-        ).fetchall()
-        return [dict(row) for row in rows]
+        with _read_connection(db_path) as con:
+            rows = con.execute(
+                """SELECT snapshot_date AS date,
+                          window_days,
+                          scope,
+                          provider,
+                          project_name,
+                          session_count,
+                          total_cost,
+                          avg_cost_per_session,
+                          avg_active_seconds,
+                          error_rate,
+                          no_edit_session_count,
+                          no_edit_rate,
+                          edit_attribution_rate,
+                          cost_per_edit,
+                          review_session_count,
+                          review_rate,
+                          review_score
+                FROM effectiveness_snapshots
+                WHERE snapshot_date >= ?
+                  AND scope = ?
+                  AND provider = ?
+                  AND project_name = '__all__'
+                ORDER BY snapshot_date""",
+                (cutoff.isoformat(), scope, provider_value),
+            ).fetchall()
+            return [dict(row) for row in rows]
     except sqlite3.OperationalError as exc:
         if "effectiveness_snapshots" not in str(exc):
             raise
         return []
-    finally:
-        con.close()
 
 
 _SNAPSHOT_CALLOUT_METRICS = (
@@ -2350,34 +2428,32 @@ def get_effectiveness_snapshot_callouts(
     limit: int = 6,
 ) -> list[dict]:
     """Largest changes between the latest two persisted snapshot dates."""
-    con = get_connection(db_path)
     try:
-        dates = [
-            row["snapshot_date"]
-            for row in con.execute(
-                """SELECT DISTINCT snapshot_date
+        with _read_connection(db_path) as con:
+            dates = [
+                row["snapshot_date"]
+                for row in con.execute(
+                    """SELECT DISTINCT snapshot_date
+                    FROM effectiveness_snapshots
+                    ORDER BY snapshot_date DESC
+                    LIMIT 2"""
+                ).fetchall()
+            ]
+            if len(dates) < 2:
+                return []
+
+            latest_date, previous_date = dates
+            rows = con.execute(
+                """SELECT *
                 FROM effectiveness_snapshots
-                ORDER BY snapshot_date DESC
-                LIMIT 2"""
+                WHERE snapshot_date IN (?, ?)
+                ORDER BY scope, provider, project_name""",
+                (latest_date, previous_date),
             ).fetchall()
-        ]
-        if len(dates) < 2:
-            return []
-
-        latest_date, previous_date = dates
-        rows = con.execute(
-            """SELECT *
-            FROM effectiveness_snapshots
-            WHERE snapshot_date IN (?, ?)
-            ORDER BY scope, provider, project_name""",
-            (latest_date, previous_date),
-        ).fetchall()
     except sqlite3.OperationalError as exc:
         if "effectiveness_snapshots" not in str(exc):
             raise
         return []
-    finally:
-        con.close()
 
     latest = {}
     previous = {}
@@ -2432,8 +2508,7 @@ def _collect_effectiveness_periods(
         _empty_effectiveness_periods,
     )
 
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (
             (previous_cutoff.isoformat(), provider)
@@ -2494,8 +2569,6 @@ def _collect_effectiveness_periods(
                 buckets[("__all__", "__all__")][period],
                 row,
             )
-    finally:
-        con.close()
 
     flagged_rows = get_investigation_queue(
         db_path,
@@ -3209,8 +3282,7 @@ def get_error_breakdown(db_path: Path, provider: str | None = None) -> list[dict
         [{category, count, pct}, ...] sorted by count desc.
         Empty list if no errors.
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         provider_filter = "AND provider = ?" if provider else ""
         params = (provider,) if provider else ()
         rows = con.execute(
@@ -3235,8 +3307,6 @@ def get_error_breakdown(db_path: Path, provider: str | None = None) -> list[dict
         ]
         result.sort(key=lambda x: x["count"], reverse=True)
         return result
-    finally:
-        con.close()
 
 
 def get_error_breakdown_for_session(
@@ -3249,8 +3319,7 @@ def get_error_breakdown_for_session(
     Returns:
         [{category, count}, ...] sorted by count desc.
     """
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         rows = con.execute(
             """SELECT tool_name, command, description
             FROM tool_calls
@@ -3272,8 +3341,6 @@ def get_error_breakdown_for_session(
         ]
         result.sort(key=lambda x: x["count"], reverse=True)
         return result
-    finally:
-        con.close()
 
 
 def get_artifacts_list(
@@ -3296,8 +3363,7 @@ def get_artifacts_list(
         params.append(artifact_type)
 
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         rows = con.execute(
             f"""SELECT
                 a.*,
@@ -3328,14 +3394,11 @@ def get_artifacts_list(
             }
             for row in rows
         ]
-    finally:
-        con.close()
 
 
 def get_artifact_filter_options(db_path: Path) -> dict:
     """Return project/type/status options present in artifact data."""
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         projects = [
             row["project_name"]
             for row in con.execute(
@@ -3358,14 +3421,11 @@ def get_artifact_filter_options(db_path: Path) -> dict:
             ).fetchall()
         ]
         return {"projects": projects, "statuses": statuses, "types": types}
-    finally:
-        con.close()
 
 
 def get_accepted_artifact_projects(db_path: Path) -> list[dict]:
     """Return projects that have accepted artifacts."""
-    con = get_connection(db_path)
-    try:
+    with _read_connection(db_path) as con:
         rows = con.execute(
             """SELECT project_name, COUNT(*) AS artifact_count
             FROM semantic_artifacts
@@ -3374,8 +3434,6 @@ def get_accepted_artifact_projects(db_path: Path) -> list[dict]:
             ORDER BY project_name"""
         ).fetchall()
         return [dict(row) for row in rows]
-    finally:
-        con.close()
 
 
 def _split_evidence(value: str | None) -> list[str]:
@@ -13,6 +13,7 @@ from aide.autopsy.analyzer import (
     analyze_cost,
     analyze_suggestions,
     analyze_summary,
+    partition_files,
 )
 from aide.autopsy.report import _format_duration, render_report
 from aide.autopsy.suggestions import generate_suggestions
@@ -165,21 +166,6 @@ def _make_test_messages(
     return messages
 
 
-def _make_test_tool_calls(session_id="test-session-001") -> list[dict]:
-    """Build tool_call dicts."""
-    return [
-        {"id": 1, "session_id": session_id, "message_uuid": "msg-a1",
-         "tool_name": "Read", "file_path": "/src/parser.py",
-         "timestamp": "2026-02-01T10:00:05"},
-        {"id": 2, "session_id": session_id, "message_uuid": "msg-a2",
-         "tool_name": "Edit", "file_path": "/src/parser.py",
-         "timestamp": "2026-02-01T10:00:15"},
-        {"id": 3, "session_id": session_id, "message_uuid": "msg-a3",
-         "tool_name": "Bash", "file_path": None,
-         "timestamp": "2026-02-01T10:00:25"},
-    ]
-
-
 def _make_test_tool_usage() -> list[dict]:
     """Build tool usage aggregation."""
     return [
@@ -357,6 +343,36 @@ class TestQueries:
         assert messages[0]["role"] == "user"
         assert messages[1]["role"] == "assistant"
 
+    def test_iter_session_messages_streams_rows(self, tmp_db):
+        """iter_session_messages yields the same dicts lazily."""
+        from aide.autopsy.queries import get_session_messages, iter_session_messages
+
+        init_db(tmp_db)
+        ingest_sessions(tmp_db, [_make_parsed_session()])
+
+        it = iter_session_messages(tmp_db, "test-session-001")
+        first = next(it)
+        assert first["role"] == "user"
+        assert [first, *it] == get_session_messages(tmp_db, "test-session-001")
+
+    def test_get_session_messages_coalesces_null_tokens(self, tmp_db):
+        """NULL token columns come back as 0."""
+        import sqlite3
+
+        from aide.autopsy.queries import get_session_messages
+
+        init_db(tmp_db)
+        ingest_sessions(tmp_db, [_make_parsed_session()])
+        con = sqlite3.connect(tmp_db)
+        con.execute("UPDATE messages SET cache_read_tokens = NULL, output_tokens = NULL")
+        con.commit()
+        con.close()
+
+        messages = get_session_messages(tmp_db, "test-session-001")
+        assert all(m["cache_read_tokens"] == 0 for m in messages)
+        assert all(m["output_tokens"] == 0 for m in messages)
+        assert analyze_context(messages).peak_context_tokens > 0
+
     def test_get_session_tool_calls(self, tmp_db):
         """get_session_tool_calls returns all tool calls."""
         from aide.autopsy.queries import get_session_tool_calls
@@ -424,6 +440,84 @@ class TestQueries:
         file_paths = [f["file_path"] for f in files]
         assert None not in file_paths
 
+    def test_get_session_repeated_reads_filters_and_sorts(self, tmp_db):
+        """Repeated reads are filtered, ordered, and capped in SQL."""
+        from aide.autopsy.queries import get_session_repeated_reads
+
+        init_db(tmp_db)
+        ingest_sessions(tmp_db, [_make_parsed_session()])
+
+        # parser.py is read twice in the fixture session
+        assert get_session_repeated_reads(tmp_db, "test-session-001") == []
+
+        rows = get_session_repeated_reads(tmp_db, "test-session-001", min_reads=1)
+        assert [r["file_path"] for r in rows] == ["/src/parser.py", "/src/main.py"]
+        assert rows[0]["read_count"] == 2
+
+        capped = get_session_repeated_reads(
+            tmp_db, "test-session-001", min_reads=1, limit=1
+        )
+        assert [r["file_path"] for r in capped] == ["/src/parser.py"]
+
+    def test_session_queries_shares_one_connection(self, tmp_db):
+        """Query functions reuse a passed connection without closing it."""
+        from aide.autopsy.queries import (
+            get_session,
+            get_session_files_touched,
+            get_session_messages,
+            session_queries,
+        )
+
+        init_db(tmp_db)
+        ingest_sessions(tmp_db, [_make_parsed_session()])
+
+        with session_queries(tmp_db) as con:
+            session = get_session(tmp_db, "test-session-001", con=con)
+            messages = get_session_messages(tmp_db, "test-session-001", con=con)
+            files = get_session_files_touched(tmp_db, "test-session-001", con=con)
+            # Still open after the calls above
+            assert con.execute("SELECT 1").fetchone()[0] == 1
+
+        assert session["session_id"] == "test-session-001"
+        assert len(messages) == 8
+        assert len(files) == 2
+
+    def test_get_session_autopsy_bundle(self, tmp_db):
+        """The bundle returns every autopsy input from one snapshot."""
+        from aide.autopsy.queries import get_session_autopsy_bundle
+
+        init_db(tmp_db)
+        ingest_sessions(tmp_db, [_make_parsed_session()])
+
+        bundle = get_session_autopsy_bundle(tmp_db, "test-session-001")
+        assert bundle["session"]["provider"] == "claude"
+        assert len(bundle["messages"]) == 8
+        assert len(bundle["files_touched"]) == 2
+        assert {u["tool_name"] for u in bundle["tool_usage"]} == {"Read", "Edit", "Bash"}
+        assert bundle["repeated_reads"] == []
+        assert get_session_autopsy_bundle(tmp_db, "nonexistent-id") is None
+
+    def test_token_totals_by_tools_match_message_rollup(self, tmp_db):
+        """SQL tool_names rollup yields the same cost categories as messages."""
+        from aide.autopsy.queries import (
+            get_session,
+            get_session_messages,
+            get_session_token_totals_by_tools,
+        )
+
+        init_db(tmp_db)
+        ingest_sessions(tmp_db, [_make_parsed_session()])
+
+        totals = get_session_token_totals_by_tools(tmp_db, "test-session-001")
+        assert sum(t["input_tokens"] for t in totals) == 9000
+        assert len(totals) < 8  # grouped, not one row per message
+
+        session = get_session(tmp_db, "test-session-001")
+        messages = get_session_messages(tmp_db, "test-session-001")
+        from_sql = analyze_cost(session, messages, tool_token_totals=totals)
+        from_messages = analyze_cost(session, messages)
+        assert from_sql.categories == from_messages.categories
+
 
 # ---------------------------------------------------------------------------
 # TestAnalyzeSummary
@@ -496,6 +590,19 @@ class TestAnalyzeSummary:
         assert result.files_modified == []
         assert result.files_read == []
 
+    def test_partition_files_single_pass_views(self):
+        """partition_files builds summary and suggestion file views together."""
+        partition = partition_files(_make_test_files_touched())
+
+        assert partition.files_modified == ["/src/main.py", "/src/parser.py"]
+        assert partition.files_read == [
+            "/src/main.py", "/src/parser.py", "/tests/test_parser.py",
+        ]
+        assert [f.file_path for f in partition.file_access_counts] == [
+            "/src/parser.py", "/src/main.py", "/tests/test_parser.py",
+        ]
+        assert [f.file_path for f in partition.repeated_reads] == ["/src/parser.py"]
+
 
 # ---------------------------------------------------------------------------
 # TestAnalyzeCost
@@ -509,9 +616,8 @@ class TestAnalyzeCost:
         """Messages with Read tools go to file_reads category."""
         session = _make_test_session()
         messages = _make_test_messages()
-        tool_calls = _make_test_tool_calls()
 
-        result = analyze_cost(session, messages, tool_calls)
+        result = analyze_cost(session, messages)
 
         cat_dict = {c.category: c for c in result.categories}
         assert cat_dict["file_reads"].input_tokens > 0
@@ -520,20 +626,35 @@ class TestAnalyzeCost:
         """Messages with Edit tools go to code_generation category."""
         session = _make_test_session()
         messages = _make_test_messages()
-        tool_calls = _make_test_tool_calls()
 
-        result = analyze_cost(session, messages, tool_calls)
+        result = analyze_cost(session, messages)
 
         cat_dict = {c.category: c for c in result.categories}
         assert cat_dict["code_generation"].input_tokens > 0
 
+    def test_first_known_tool_sets_category(self):
+        """Unknown leading tools fall through to the first categorized tool."""
+        from aide.autopsy.analyzer import _categorize_message
+
+        assert _categorize_message({"role": "assistant", "tool_names": "TodoWrite,Read"}) == (
+            "file_reads"
+        )
+        assert _categorize_message({"role": "assistant", "tool_names": "Bash,Edit"}) == (
+            "execution"
+        )
+        assert _categorize_message({"role": "assistant", "tool_names": "TodoWrite"}) == (
+            "orchestration"
+        )
+        assert _categorize_message({"role": "user", "tool_names": "Read"}) == (
+            "system_overhead"
+        )
+
     def test_system_user_messages_categorized_as_overhead(self):
         """User/system messages go to system_overhead."""
         session = _make_test_session()
         messages = _make_test_messages()
-        tool_calls = _make_test_tool_calls()
 
-        result = analyze_cost(session, messages, tool_calls)
+        result = analyze_cost(session, messages)
 
         cat_dict = {c.category: c for c in result.categories}
         # 4 user messages + 1 assistant without tools = system_overhead
@@ -543,9 +664,8 @@ class TestAnalyzeCost:
         """Category percentages approximately sum to 100%."""
         session = _make_test_session()
         messages = _make_test_messages()
-        tool_calls = _make_test_tool_calls()
 
-        result = analyze_cost(session, messages, tool_calls)
+        result = analyze_cost(session, messages)
 
         total_pct = sum(c.percentage for c in result.categories)
         # Allow small floating-point drift
@@ -555,9 +675,8 @@ class TestAnalyzeCost:
         """Most expensive turns are sorted by cost descending."""
         session = _make_test_session()
         messages = _make_test_messages()
-        tool_calls = _make_test_tool_calls()
 
-        result = analyze_cost(session, messages, tool_calls)
+        result = analyze_cost(session, messages)
 
         costs = [t.estimated_cost_usd for t in result.most_expensive_turns]
         assert costs == sorted(costs, reverse=True)
@@ -566,12 +685,28 @@ class TestAnalyzeCost:
         """At most 5 expensive turns returned."""
         session = _make_test_session()
         messages = _make_test_messages()
-        tool_calls = _make_test_tool_calls()
 
-        result = analyze_cost(session, messages, tool_calls)
+        result = analyze_cost(session, messages)
 
         assert len(result.most_expensive_turns) <= 5
 
+    def test_most_expensive_turns_ties_keep_turn_order(self):
+        """Equal-cost turns are reported in turn order, earliest first."""
+        session = _make_test_session()
+        messages = [
+            {
+                "role": "assistant", "tool_names": "Read", "model": None,
+                "input_tokens": 1000, "output_tokens": 100,
+                "cache_read_tokens": 0, "cache_creation_tokens": 0,
+            }
+            for _ in range(7)
+        ]
+
+        result = analyze_cost(session, messages)
+
+        assert [t.turn_number for t in result.most_expensive_turns] == [1, 2, 3, 4, 5]
+        assert result.most_expensive_turns[0].tool_names == "Read"
+
     def test_cache_efficiency_calculation(self):
         """Cache efficiency fields calculated correctly."""
         session = _make_test_session(
@@ -580,9 +715,8 @@ class TestAnalyzeCost:
             total_cache_creation_tokens=3000,
         )
         messages = _make_test_messages()
-        tool_calls = _make_test_tool_calls()
 
-        result = analyze_cost(session, messages, tool_calls)
+        result = analyze_cost(session, messages)
 
         ce = result.cache_efficiency
         assert ce.total_input_tokens == 9000
@@ -608,7 +742,7 @@ class TestAnalyzeCost:
         )
         messages = _make_test_messages(model="gpt-5.5")
 
-        result = analyze_cost(session, messages, [])
+        result = analyze_cost(session, messages)
 
         ce = result.cache_efficiency
         assert ce.total_input_tokens == 10000
@@ -628,7 +762,7 @@ class TestAnalyzeCost:
         )
         messages = []
 
-        result = analyze_cost(session, messages, [])
+        result = analyze_cost(session, messages)
 
         assert result.total_cost_usd == 0.0
         assert result.cache_efficiency.cache_hit_rate == 0.0
@@ -654,12 +788,16 @@ class TestAnalyzeContext:
         """Drop from 150K to 50K → compaction detected."""
         messages = [
             {"role": "assistant", "input_tokens": 50000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:01"},
             {"role": "assistant", "input_tokens": 100000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:02"},
             {"role": "assistant", "input_tokens": 150000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:03"},
             {"role": "assistant", "input_tokens": 50000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:04"},
         ]
 
@@ -685,6 +823,7 @@ class TestAnalyzeContext:
         """context_utilization_pct = peak / 200K."""
         messages = [
             {"role": "assistant", "input_tokens": 100000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:01"},
         ]
 
@@ -706,6 +845,7 @@ class TestAnalyzeContext:
         """Only user messages (no assistant) produce empty curve."""
         messages = [
             {"role": "user", "input_tokens": 0, "type": "user",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:01"},
         ]
 
@@ -714,6 +854,17 @@ class TestAnalyzeContext:
         assert result.context_curve == []
         assert result.peak_context_tokens == 0
 
+    def test_context_tokens_back_the_context_curve(self):
+        """context_tokens holds per-turn sizes; context_curve is derived from it."""
+        messages = _make_test_messages()
+
+        result = analyze_context(messages)
+
+        assert result.context_tokens.tolist() == [5000, 5500, 8000, 9000]
+        curve = result.context_curve
+        assert [p.turn_number for p in curve] == [1, 2, 3, 4]
+        assert [p.cumulative_input_tokens for p in curve] == [5000, 5500, 8000, 9000]
+
     def test_avg_input_tokens(self):
         """avg_input_tokens_per_turn calculated correctly (includes cache)."""
         messages = _make_test_messages()
@@ -726,8 +877,10 @@ class TestAnalyzeContext:
         """Drop below 50% doesn't trigger if previous < 100K."""
         messages = [
             {"role": "assistant", "input_tokens": 80000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:01"},
             {"role": "assistant", "input_tokens": 30000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:02"},
         ]
 
@@ -738,19 +891,27 @@ class TestAnalyzeContext:
         """Multiple compaction events detected correctly."""
         messages = [
             {"role": "assistant", "input_tokens": 50000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:01"},
             {"role": "assistant", "input_tokens": 120000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:02"},
             {"role": "assistant", "input_tokens": 40000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:03"},
             {"role": "assistant", "input_tokens": 130000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:04"},
             {"role": "assistant", "input_tokens": 50000, "type": "assistant",
+             "cache_read_tokens": 0, "cache_creation_tokens": 0,
              "timestamp": "2026-02-01T10:00:05"},
         ]
 
         result = analyze_context(messages)
         assert result.estimated_compaction_count == 2
+        assert [e.turn_number for e in result.compaction_events] == [3, 5]
+        assert result.compaction_events[0].tokens_before == 120000
+        assert result.compaction_events[0].estimated_tokens_lost == 80000
 
 
 # ---------------------------------------------------------------------------
@@ -919,10 +1080,9 @@ class TestReport:
         files_touched = _make_test_files_touched()
         model = "gpt-5.5" if provider == "codex" else None
         messages = _make_test_messages(model=model)
-        tool_calls = _make_test_tool_calls()
 
         summary = analyze_summary(session, tool_usage, files_touched)
-        cost = analyze_cost(session, messages, tool_calls)
+        cost = analyze_cost(session, messages)
         context = analyze_context(messages)
         suggestions = analyze_suggestions(
             files_touched, cost.cache_efficiency,
@@ -974,7 +1134,7 @@ class TestReport:
         session = _make_test_session(tool_call_count=5)
         # High cache hit rate, no repeated reads, no compactions
         summary = analyze_summary(session, [], [])
-        cost = analyze_cost(session, _make_test_messages(), [])
+        cost = analyze_cost(session, _make_test_messages())
         context = analyze_context(_make_test_messages())
         suggestions = analyze_suggestions(
             [], cost.cache_efficiency, 0, 5,
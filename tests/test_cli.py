@@ -1,9 +1,13 @@
 """Tests for CLI utilities."""
 
 import json
+import os
 import shutil
 import sqlite3
+import subprocess
+import sys
 from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
 from unittest.mock import patch
 
 from click.testing import CliRunner
@@ -153,6 +157,24 @@ def _semantic_artifact(project_name: str = "aide") -> SemanticArtifact:
     )
 
 
+def test_cli_import_defers_parsers_and_autopsy():
+    """Importing the CLI leaves ingest-only and autopsy modules unloaded."""
+    code = (
+        "import sys, aide.cli; "
+        "print(sorted(m for m in ('aide.providers', 'aide.parser', "
+        "'aide.autopsy.analyzer', 'concurrent.futures.process') if m in sys.modules))"
+    )
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": src},
+    ).stdout
+    assert out.strip() == "[]"
+
+
 class TestArchiveJsonl:
     def test_copies_file_to_archive(self, tmp_path):
         log_dir = tmp_path / "logs"
@@ -647,6 +669,62 @@ class TestIngestCommand:
         assert not (tmp_path / "archive").exists()
         assert get_summary_stats(db_path)["total_sessions"] == 1
 
+    def test_ingest_source_parses_multiple_files_in_pool(self, tmp_path):
+        db_path = tmp_path / "aide.db"
+        init_db(db_path)
+        log_dir = tmp_path / "claude"
+        for project in ("-Users-test-projects-app", "-Users-test-projects-other"):
+            project_dir = log_dir / project
+            project_dir.mkdir(parents=True)
+            shutil.copyfile("tests/fixtures/sample.jsonl", project_dir / "sample.jsonl")
+        source = LogSource(provider="claude", path=log_dir)
+
+        first = ingest_source(db_path, source, full=False)
+        second = ingest_source(db_path, source, full=False)
+
+        assert (first["files"], first["ingested"]) == (2, 2)
+        assert second["skipped"] == 2
+
+    @patch("aide.cli.INGEST_COMMIT_FILES", 2)
+    @patch("aide.cli.INGEST_PARSE_AHEAD", 1)
+    def test_ingest_source_batches_commits_with_bounded_parse_ahead(self, tmp_path):
+        db_path = tmp_path / "aide.db"
+        init_db(db_path)
+        log_dir = tmp_path / "claude"
+        projects = ("-Users-test-projects-a", "-Users-test-projects-b", "-Users-test-projects-c")
+        for project in projects:
+            project_dir = log_dir / project
+            project_dir.mkdir(parents=True)
+            shutil.copyfile("tests/fixtures/sample.jsonl", project_dir / "sample.jsonl")
+
+        result = ingest_source(db_path, LogSource(provider="claude", path=log_dir), full=False)
+
+        assert (result["files"], result["ingested"]) == (3, 3)
+        con = sqlite3.connect(db_path)
+        logged = [row[0] for row in con.execute("SELECT source_file FROM ingest_log")]
+        con.close()
+        assert sorted(logged) == [str(log_dir / p / "sample.jsonl") for p in projects]
+
+    def test_ingest_source_skips_unchanged_files(self, tmp_path):
+        db_path = tmp_path / "aide.db"
+        init_db(db_path)
+        log_dir = tmp_path / "claude"
+        project_dir = log_dir / "-Users-test-projects-app"
+        project_dir.mkdir(parents=True)
+        shutil.copyfile(
+            "tests/fixtures/sample.jsonl",
+            project_dir / "sample.jsonl",
+        )
+        source = LogSource(provider="claude", path=log_dir)
+
+        first = ingest_source(db_path, source, full=False)
+        second = ingest_source(db_path, source, full=False)
+        forced = ingest_source(db_path, source, full=True)
+
+        assert (first["ingested"], first["skipped"]) == (1, 0)
+        assert (second["ingested"], second["skipped"]) == (0, 1)
+        assert (forced["ingested"], forced["skipped"]) == (1, 0)
+
     def test_ingest_source_ingests_codex_source(self, tmp_path):
         db_path = tmp_path / "aide.db"
         init_db(db_path)
@@ -135,3 +135,33 @@ def test_load_config_rejects_malformed_sources(tmp_path):
 
     with pytest.raises(ValueError, match="sources must be a list"):
         load_config(config_path=config_file)
+
+
+def test_load_config_reuses_parse_until_file_changes(tmp_path):
+    """Repeat loads hit the YAML cache; an edited file is re-read."""
+    from aide.config import _read_user_config
+
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("port: 9999\n")
+    _read_user_config.cache_clear()
+
+    assert load_config(config_path=config_file).port == 9999
+    assert load_config(config_path=config_file).port == 9999
+    assert _read_user_config.cache_info().hits == 1
+
+    config_file.write_text("port: 10001\n")
+    assert load_config(config_path=config_file).port == 10001
+
+
+def test_save_config_value_is_visible_to_next_load(tmp_path):
+    from aide.config import save_config_value
+
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("port: 9999\n")
+    assert load_config(config_path=config_file).subscription_user is False
+
+    save_config_value("subscription_user", True, config_path=config_file)
+
+    config = load_config(config_path=config_file)
+    assert config.subscription_user is True
+    assert config.port == 9999
@@ -7,6 +7,7 @@ from aide.cost import (
     OPENAI_MODEL_PRICING,
     _pricing_for_model,
     estimate_cost,
+    estimate_cost_batch,
 )
 
 
@@ -37,6 +38,35 @@ class TestEstimateCost:
         assert estimate_cost(input_tokens=1, output_tokens=0) == 0.0
         assert estimate_cost(input_tokens=333, output_tokens=0) == 0.001
 
+    def test_repeated_token_shapes_hit_cache(self):
+        estimate_cost.cache_clear()
+        for _ in range(3):
+            assert estimate_cost(1000, 500, model="claude-opus-4-6") == 0.0525
+        info = estimate_cost.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+
+
+class TestEstimateCostBatch:
+    def test_matches_sum_of_rounded_rows(self):
+        rows = [
+            (1000, 500, 0, 0, None),
+            (0, 0, 0, 0, None),
+            (1000, 500, 0, 0, None),
+            (333, 7, 12_000, 40, "claude-opus-4-6"),
+        ]
+        expected = round(
+            sum(estimate_cost(i, o, cr, cc, model=m) for i, o, cr, cc, m in rows), 4
+        )
+        assert estimate_cost_batch(rows) == expected
+
+    def test_provider_applies_to_every_row(self):
+        rows = [(1_000_000, 100_000, 400_000, 0, "gpt-5.5")] * 2
+        assert estimate_cost_batch(rows, provider="codex") == 12.4
+
+    def test_empty(self):
+        assert estimate_cost_batch([]) == 0.0
+
 
 class TestPerModelPricing:
     def test_opus_pricing(self):
@@ -2,9 +2,13 @@
 
 from datetime import datetime, timezone
 
+import pytest
+
 from aide.db import (
     _migrate_db,
+    deferred_session_indexes,
     get_ingested_file,
+    get_ingested_mtimes,
     get_summary_stats,
     ingest_sessions,
     init_db,
@@ -352,6 +356,34 @@ def test_semantic_artifact_indexes_exist(tmp_db):
     assert "idx_artifact_events_artifact" in event_indexes
 
 
+def test_project_and_tool_rollups_use_covering_indexes(tmp_db):
+    """Per-project and per-tool GROUP BYs are answered from indexes alone."""
+    import sqlite3
+
+    init_db(tmp_db)
+    con = sqlite3.connect(tmp_db)
+    project_plan = " ".join(
+        row[3]
+        for row in con.execute(
+            "EXPLAIN QUERY PLAN SELECT project_name, COUNT(*),"
+            " SUM(estimated_cost_usd), SUM(active_duration_seconds),"
+            " SUM(total_input_tokens) + SUM(total_output_tokens)"
+            " + SUM(total_cache_read_tokens) + SUM(total_cache_creation_tokens)"
+            " FROM sessions GROUP BY project_name"
+        )
+    )
+    tool_plan = " ".join(
+        row[3]
+        for row in con.execute(
+            "EXPLAIN QUERY PLAN SELECT tool_name, COUNT(*) FROM tool_calls GROUP BY tool_name"
+        )
+    )
+    con.close()
+
+    assert "COVERING INDEX idx_sessions_project_rollup" in project_plan
+    assert "COVERING INDEX idx_tool_calls_name" in tool_plan
+
+
 def test_init_db_adds_semantic_artifact_tables_to_existing_database(tmp_db):
     """Existing databases gain artifact tables through normal init_db startup."""
     import sqlite3
@@ -466,6 +498,215 @@ def test_reingest_replaces_not_duplicates(tmp_db):
     con.close()
 
 
+def test_duplicate_session_in_one_batch_keeps_last(tmp_db):
+    """A repeated session_id within one call behaves like sequential re-ingest."""
+    import sqlite3
+
+    init_db(tmp_db)
+    ingest_sessions(tmp_db, [_make_session(cost=0.05), _make_session(cost=0.10)])
+
+    con = sqlite3.connect(tmp_db)
+    assert con.execute("SELECT estimated_cost_usd FROM sessions").fetchall() == [(0.10,)]
+    assert con.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 2
+    assert con.execute("SELECT COUNT(*) FROM tool_calls").fetchone()[0] == 2
+    con.close()
+
+
+def test_unchanged_content_hash_skips_rewrite(tmp_db):
+    """A session whose content_hash is unchanged is not rewritten."""
+    import sqlite3
+
+    init_db(tmp_db)
+    session = _make_session(cost=0.05)
+    session.content_hash = "abc"
+    ingest_sessions(tmp_db, [session])
+
+    con = sqlite3.connect(tmp_db)
+    con.execute("UPDATE sessions SET ingested_at = 'marker'")
+    con.commit()
+
+    touched: set[str] = set()
+    same = _make_session(cost=0.10)
+    same.content_hash = "abc"
+    assert ingest_sessions(tmp_db, [same], touched_dates=touched, skip_unchanged=True) == 1
+    assert touched == set()
+    assert con.execute("SELECT estimated_cost_usd, ingested_at FROM sessions").fetchall() == [
+        (0.05, "marker")
+    ]
+
+    # Skipping is opt-in: a plain call still replaces the row
+    ingest_sessions(tmp_db, [same])
+    assert con.execute("SELECT estimated_cost_usd FROM sessions").fetchall() == [(0.10,)]
+
+    changed = _make_session(cost=0.20)
+    changed.content_hash = "def"
+    ingest_sessions(tmp_db, [changed], skip_unchanged=True)
+    assert con.execute("SELECT estimated_cost_usd, content_hash FROM sessions").fetchall() == [
+        (0.20, "def")
+    ]
+    assert con.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 2
+    con.close()
+
+
+def test_deferred_session_indexes_rebuilt_after_bulk_load(tmp_db):
+    """Secondary sessions indexes are dropped during the load and restored."""
+    import sqlite3
+
+    init_db(tmp_db)
+
+    def session_indexes():
+        con = sqlite3.connect(tmp_db)
+        names = {
+            row[0]
+            for row in con.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'sessions'"
+            )
+        }
+        con.close()
+        return names
+
+    before = session_indexes()
+    assert "idx_sessions_started_date" in before
+
+    with pytest.raises(RuntimeError), deferred_session_indexes(tmp_db):
+        ingest_sessions(tmp_db, [_make_session()])
+        during = session_indexes()
+        raise RuntimeError("load failed")
+
+    assert "idx_sessions_started_date" not in during
+    assert any(name.startswith("sqlite_autoindex") for name in during)
+    assert session_indexes() == before
+
+
+def test_reingest_batch_larger_than_parameter_limit(tmp_db):
+    """Re-ingesting more sessions than SQLite's host-parameter limit replaces them all."""
+    import sqlite3
+
+    init_db(tmp_db)
+    batch = [_make_session(session_id=f"sess-{i}") for i in range(1100)]
+    ingest_sessions(tmp_db, batch)
+    touched: set[str] = set()
+    ingest_sessions(tmp_db, batch, touched_dates=touched)
+
+    con = sqlite3.connect(tmp_db)
+    assert con.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1100
+    assert con.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 2200
+    con.close()
+    assert touched == {"2025-01-15"}
+
+
+def test_failed_ingest_rolls_back_whole_batch(tmp_db):
+    """An insert error leaves previously stored rows untouched."""
+    import sqlite3
+
+    init_db(tmp_db)
+    ingest_sessions(tmp_db, [_make_session(cost=0.05)])
+
+    broken = _make_session(session_id="sess-002")
+    broken.project_path = None  # violates NOT NULL
+    with pytest.raises(sqlite3.IntegrityError):
+        ingest_sessions(tmp_db, [_make_session(cost=0.10), broken])
+
+    con = sqlite3.connect(tmp_db)
+    assert con.execute("SELECT estimated_cost_usd FROM sessions").fetchall() == [(0.05,)]
+    assert con.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 2
+    con.close()
+
+
+def test_rebuild_daily_stats_only_touched_dates(tmp_db):
+    """Incremental rebuild refreshes touched dates and leaves others alone."""
+    import sqlite3
+
+    init_db(tmp_db)
+    day1 = datetime(2025, 1, 15, 10, 0, 0, tzinfo=timezone.utc)
+    day2 = datetime(2025, 1, 16, 10, 0, 0, tzinfo=timezone.utc)
+    ingest_sessions(tmp_db, [_make_session(session_id="a", started_at=day1, ended_at=day1)])
+    rebuild_daily_stats(tmp_db)
+
+    touched: set[str] = set()
+    ingest_sessions(
+        tmp_db,
+        [_make_session(session_id="b", started_at=day2, ended_at=day2, cost=0.20)],
+        touched_dates=touched,
+    )
+    assert touched == {"2025-01-16"}
+
+    con = sqlite3.connect(tmp_db)
+    con.execute("UPDATE daily_stats SET session_count = 99 WHERE date = '2025-01-15'")
+    con.commit()
+    rebuild_daily_stats(tmp_db, touched_dates=touched)
+    rows = dict(
+        con.execute(
+            "SELECT date, session_count FROM daily_stats WHERE project_name IS NULL"
+        ).fetchall()
+    )
+    con.close()
+
+    assert rows == {"2025-01-15": 99, "2025-01-16": 1}
+
+
+def test_rebuild_daily_stats_counts_tools_by_call_date(tmp_db):
+    """daily_tool_stats buckets tool calls by their own date, also incrementally."""
+    import sqlite3
+
+    init_db(tmp_db)
+    day1 = datetime(2025, 1, 15, 23, 0, 0, tzinfo=timezone.utc)
+    next_day = datetime(2025, 1, 16, 1, 0, 0, tzinfo=timezone.utc)
+    ingest_sessions(tmp_db, [_make_session(session_id="a", started_at=day1, ended_at=next_day)])
+    rebuild_daily_stats(tmp_db)
+
+    touched: set[str] = set()
+    ingest_sessions(
+        tmp_db,
+        [_make_session(session_id="b", started_at=next_day, ended_at=next_day)],
+        touched_dates=touched,
+    )
+    rebuild_daily_stats(tmp_db, touched_dates=touched)
+
+    con = sqlite3.connect(tmp_db)
+    rows = con.execute(
+        "SELECT date, provider, tool_name, count FROM daily_tool_stats ORDER BY date, tool_name"
+    ).fetchall()
+    con.close()
+
+    assert rows == [
+        ("2025-01-16", "claude", "Edit", 2),
+        ("2025-01-16", "claude", "Read", 2),
+    ]
+
+
+def test_init_db_backfills_daily_tool_stats(tmp_db):
+    """Databases from before the tool rollup get it filled on the next init_db."""
+    import sqlite3
+
+    init_db(tmp_db)
+    ingest_sessions(tmp_db, [_make_session()])
+    con = sqlite3.connect(tmp_db)
+    con.execute("DROP TABLE daily_tool_stats")
+    con.commit()
+    con.close()
+
+    init_db(tmp_db)
+
+    con = sqlite3.connect(tmp_db)
+    total = con.execute("SELECT SUM(count) FROM daily_tool_stats").fetchone()[0]
+    con.close()
+    assert total == 2
+
+
+def test_reingest_touches_old_and_new_dates(tmp_db):
+    """Moving a session to another date reports both dates as touched."""
+    init_db(tmp_db)
+    day1 = datetime(2025, 1, 15, 10, 0, 0, tzinfo=timezone.utc)
+    day2 = datetime(2025, 1, 16, 10, 0, 0, tzinfo=timezone.utc)
+    ingest_sessions(tmp_db, [_make_session(started_at=day1, ended_at=day1)])
+
+    touched: set[str] = set()
+    ingest_sessions(tmp_db, [_make_session(started_at=day2, ended_at=day2)], touched_dates=touched)
+
+    assert touched == {"2025-01-15", "2025-01-16"}
+
+
 def test_rebuild_daily_stats(tmp_db):
     """rebuild_daily_stats produces correct per-project and aggregate rows."""
     import sqlite3
@@ -576,11 +817,11 @@ def test_get_summary_stats(tmp_db):
     assert stats["date_range"]["min"] is not None
     assert stats["date_range"]["max"] is not None
 
-    by_project = {p["project_name"]: p for p in stats["sessions_by_project"]}
-    assert "alpha" in by_project
-    assert "beta" in by_project
-    assert by_project["alpha"]["session_count"] == 1
-    assert abs(by_project["beta"]["total_cost"] - 0.25) < 1e-9
+    assert [p.project_name for p in stats["sessions_by_project"]] == ["beta", "alpha"]
+    by_project = {p.project_name: p for p in stats["sessions_by_project"]}
+    assert by_project["alpha"].session_count == 1
+    assert abs(by_project["beta"].total_cost - 0.25) < 1e-9
+    assert by_project["alpha"]._asdict().keys() == {"project_name", "session_count", "total_cost"}
 
 
 def test_get_summary_stats_empty(tmp_db):
@@ -681,6 +922,80 @@ def test_migrate_db_adds_missing_columns(tmp_db):
     assert "peak_context_tokens" in cols
 
 
+def test_init_db_enables_wal_and_connection_pragmas(tmp_db):
+    """init_db switches to WAL; get_connection applies per-connection tuning."""
+    from aide.db import get_connection
+
+    init_db(tmp_db)
+    con = get_connection(tmp_db)
+    try:
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert con.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert con.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert con.execute("PRAGMA journal_size_limit").fetchone()[0] == 33554432
+    finally:
+        con.close()
+
+
+def test_checkpoint_db_truncates_wal(tmp_db):
+    """checkpoint_db folds committed pages into the database and empties the WAL."""
+    from aide.db import checkpoint_db, get_connection
+
+    init_db(tmp_db)
+    # An open connection stops SQLite from removing the WAL on last close
+    holder = get_connection(tmp_db)
+    try:
+        ingest_sessions(tmp_db, [_make_session()])
+        wal = tmp_db.with_name(tmp_db.name + "-wal")
+        assert wal.stat().st_size > 0
+
+        checkpoint_db(tmp_db)
+
+        assert wal.stat().st_size == 0
+        assert holder.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+    finally:
+        holder.close()
+
+
+def test_init_db_creates_query_indexes(tmp_db):
+    """Child-table lookups and per-project summaries are index-backed."""
+    import sqlite3
+
+    init_db(tmp_db)
+    con = sqlite3.connect(tmp_db)
+    con.execute("CREATE INDEX idx_messages_session ON messages(provider, session_id)")
+    con.execute("CREATE INDEX idx_sessions_project ON sessions(project_name)")
+    con.commit()
+    con.close()
+
+    init_db(tmp_db)
+    con = sqlite3.connect(tmp_db)
+    names = {
+        row[0] for row in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    plan = " ".join(
+        row[3]
+        for row in con.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM messages "
+            "WHERE provider = 'claude' AND session_id = 'x' ORDER BY timestamp"
+        )
+    )
+    con.close()
+
+    assert {
+        "idx_messages_session_ts",
+        "idx_tool_calls_session_ts",
+        "idx_sessions_project_rollup",
+        "idx_tool_calls_name",
+        "idx_sessions_started_date",
+        "idx_tool_calls_timestamp",
+        "idx_work_blocks_started_at",
+    } <= names
+    assert "idx_messages_session" not in names
+    assert "idx_sessions_project" not in names
+    assert "idx_messages_session_ts" in plan
+
+
 def test_log_ingestion_and_get_ingested_file(tmp_db):
     """log_ingestion records a file; get_ingested_file retrieves it."""
     init_db(tmp_db)
@@ -694,6 +1009,20 @@ def test_log_ingestion_and_get_ingested_file(tmp_db):
     assert result["file_mtime"] == 1700000000.0
 
 
+def test_get_ingested_mtimes_is_per_provider(tmp_db):
+    """get_ingested_mtimes maps each logged file to its mtime for one provider."""
+    init_db(tmp_db)
+    log_ingestion(tmp_db, "/logs/a.jsonl", 10, 1700000000.0, 1)
+    log_ingestion(tmp_db, "/logs/b.jsonl", 20, 1700000100.0, 2)
+    log_ingestion(tmp_db, "/logs/c.jsonl", 30, 1700000200.0, 1, provider="codex")
+
+    assert get_ingested_mtimes(tmp_db) == {
+        "/logs/a.jsonl": 1700000000.0,
+        "/logs/b.jsonl": 1700000100.0,
+    }
+    assert get_ingested_mtimes(tmp_db, provider="codex") == {"/logs/c.jsonl": 1700000200.0}
+
+
 def test_get_ingested_file_not_found(tmp_db):
     """get_ingested_file returns None for unknown file."""
     init_db(tmp_db)
@@ -949,11 +1278,11 @@ def test_migrate_adds_all_new_columns(tmp_db):
     for col in ["custom_title", "total_turn_duration_ms", "turn_count",
                 "max_turn_duration_ms", "tool_error_count", "git_branch",
                 "rework_file_count", "test_after_edit_rate",
-                "compaction_count", "peak_context_tokens"]:
+                "compaction_count", "peak_context_tokens", "content_hash"]:
         assert col in session_cols, f"Missing session column: {col}"
 
     # Messages new columns
-    for col in ["model", "stop_reason", "prompt_length"]:
+    for col in ["model", "stop_reason", "prompt_length", "first_tool"]:
         assert col in msg_cols, f"Missing message column: {col}"
 
     # Tool calls new columns
@@ -962,6 +1291,67 @@ def test_migrate_adds_all_new_columns(tmp_db):
         assert col in tc_cols, f"Missing tool_call column: {col}"
 
 
+def test_migrate_backfills_first_tool(tmp_db):
+    """Adding first_tool backfills it from the comma-joined tool_names."""
+    import sqlite3
+
+    con = sqlite3.connect(tmp_db)
+    con.executescript("""
+        CREATE TABLE sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL UNIQUE,
+            project_path TEXT NOT NULL,
+            project_name TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            source_file TEXT NOT NULL
+        );
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            message_uuid TEXT NOT NULL,
+            parent_uuid TEXT,
+            role TEXT NOT NULL,
+            type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            tool_names TEXT
+        );
+        INSERT INTO messages (session_id, message_uuid, role, type, timestamp, tool_names)
+        VALUES
+            ('s', 'm1', 'assistant', 'assistant', '2025-01-15', 'Bash,Read'),
+            ('s', 'm2', 'assistant', 'assistant', '2025-01-15', 'Edit'),
+            ('s', 'm3', 'user', 'user', '2025-01-15', NULL);
+    """)
+    con.commit()
+    con.close()
+
+    _migrate_db(tmp_db)
+
+    con = sqlite3.connect(tmp_db)
+    rows = con.execute(
+        "SELECT message_uuid, first_tool FROM messages ORDER BY message_uuid"
+    ).fetchall()
+    con.close()
+
+    assert rows == [("m1", "Bash"), ("m2", "Edit"), ("m3", None)]
+
+
+def test_ingest_stores_first_tool(tmp_db):
+    """The leading tool of each message is stored alongside tool_names."""
+    import sqlite3
+
+    init_db(tmp_db)
+    ingest_sessions(tmp_db, [_make_session()])
+
+    con = sqlite3.connect(tmp_db)
+    rows = con.execute(
+        "SELECT role, tool_names, first_tool FROM messages ORDER BY id"
+    ).fetchall()
+    con.close()
+
+    assert rows[0] == ("user", None, None)
+    assert rows[1][2] == rows[1][1].split(",")[0]
+
+
 def test_ingest_stores_thinking_fields(tmp_db):
     """Thinking fields (total_thinking_chars, thinking_message_count) are stored."""
     import sqlite3
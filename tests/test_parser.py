@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime, timezone
+from unittest.mock import patch
 
 from aide.parser import (
     _derive_project_name,
+    _iter_jsonl,
+    _parse_timestamp,
     discover_jsonl_files,
     parse_jsonl_file,
 )
@@ -182,6 +186,157 @@ class TestCompactBoundary:
 # ---------------------------------------------------------------------------
 
 
+class TestIterJsonl:
+    def test_skips_blank_and_malformed_lines_keeping_line_index(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(b'{"a": 1}\n\n{broken\n  {"b": "\xc3\xa9"}  \n')
+        assert list(_iter_jsonl(path)) == [(0, {"a": 1}), (3, {"b": "\u00e9"})]
+
+    def test_last_line_without_newline(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(b'{"a": 1}\n{"a": 2}')
+        assert [data for _, data in _iter_jsonl(path)] == [{"a": 1}, {"a": 2}]
+
+    def test_skip_prefixes_drop_lines_before_decoding(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(
+            b'{"type":"file-history-snapshot","snapshot":{broken\n'
+            b'{"snapshot": {}, "type": "file-history-snapshot"}\n'
+            b'{"type":"user"}\n'
+        )
+        rows = list(_iter_jsonl(path, skip_prefixes=(b'{"type":"file-history-snapshot"',)))
+        assert rows == [
+            (1, {"snapshot": {}, "type": "file-history-snapshot"}),
+            (2, {"type": "user"}),
+        ]
+
+    def test_parse_skips_snapshot_lines_without_decoding(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        user = {
+            "type": "user", "sessionId": "s1", "uuid": "u1",
+            "timestamp": "2025-01-15T10:00:00Z",
+            "message": {"role": "user", "content": '"type":"file-history-snapshot"'},
+        }
+        path.write_text(
+            '{"type":"file-history-snapshot","snapshot":{truncated\n'
+            '{"type": "file-history-snapshot", "snapshot":{truncated\n'
+            + json.dumps(user) + "\n"
+        )
+        with patch("aide.parser._json_loads", wraps=json.loads) as loads:
+            [session] = parse_jsonl_file(path)
+        assert loads.call_count == 1
+        assert session.message_count == 1
+
+    def test_interleaved_sessions_group_by_session_id(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        lines = [
+            {
+                "type": "user", "sessionId": sid, "uuid": f"u{i}",
+                "timestamp": f"2025-01-15T10:00:0{i}Z",
+                "message": {"role": "user", "content": "hi"},
+            }
+            for i, sid in enumerate(["a", "b", "a", "a", "b"])
+        ]
+        path.write_text("\n".join(json.dumps(line) for line in lines))
+        sessions = {s.session_id: s for s in parse_jsonl_file(path)}
+        assert [m.uuid for m in sessions["a"].messages] == ["u0", "u2", "u3"]
+        assert [m.uuid for m in sessions["b"].messages] == ["u1", "u4"]
+
+    def test_repeated_strings_are_interned(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        line = {
+            "type": "assistant", "sessionId": "s1", "uuid": "u",
+            "timestamp": "2025-01-15T10:00:00Z",
+            "message": {
+                "role": "assistant", "model": "claude-opus-4-6",
+                "content": [{"type": "tool_use", "name": "Read", "input": {}}],
+            },
+        }
+        path.write_text("\n".join(json.dumps({**line, "uuid": f"u{i}"}) for i in range(2)))
+        first, second = parse_jsonl_file(path)[0].messages
+        assert first.role is second.role
+        assert first.model is second.model
+        assert first.tool_calls[0].tool_name is second.tool_calls[0].tool_name
+
+    def test_content_hash_tracks_file_bytes(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        line = {
+            "type": "user", "sessionId": "s1", "uuid": "u1",
+            "timestamp": "2025-01-15T10:00:00Z",
+            "message": {"role": "user", "content": "hi"},
+        }
+        path.write_text(json.dumps(line) + "\n")
+        first = parse_jsonl_file(path)[0].content_hash
+        assert first is not None
+        assert parse_jsonl_file(path)[0].content_hash == first
+
+        path.write_text(json.dumps(line) + "\n" + json.dumps({**line, "uuid": "u2"}) + "\n")
+        assert parse_jsonl_file(path)[0].content_hash != first
+
+    def test_content_hash_is_per_session(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        line = {
+            "type": "user", "sessionId": "s1", "uuid": "u1",
+            "timestamp": "2025-01-15T10:00:00Z",
+            "message": {"role": "user", "content": "hi"},
+        }
+        other = {**line, "sessionId": "s2", "uuid": "v1"}
+        path.write_text(json.dumps(line) + "\n" + json.dumps(other) + "\n")
+        hashes = {s.session_id: s.content_hash for s in parse_jsonl_file(path)}
+        assert hashes["s1"] != hashes["s2"]
+
+        # Growing one session leaves the other's hash alone
+        with path.open("a") as f:
+            f.write(json.dumps({**other, "uuid": "v2"}) + "\n")
+        grown = {s.session_id: s.content_hash for s in parse_jsonl_file(path)}
+        assert grown["s1"] == hashes["s1"]
+        assert grown["s2"] != hashes["s2"]
+
+    def test_content_hash_tracks_errors_reported_by_other_sessions(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        call = {
+            "type": "assistant", "sessionId": "s1", "uuid": "a1",
+            "timestamp": "2025-01-15T10:00:00Z",
+            "message": {
+                "role": "assistant",
+                "content": [{"type": "tool_use", "id": "t1", "name": "Bash", "input": {}}],
+            },
+        }
+        path.write_text(json.dumps(call) + "\n")
+        first = parse_jsonl_file(path)[0].content_hash
+
+        result = {
+            "type": "user", "sessionId": "s2", "uuid": "u1",
+            "timestamp": "2025-01-15T10:01:00Z",
+            "message": {
+                "role": "user",
+                "content": [{"type": "tool_result", "tool_use_id": "t1", "is_error": True}],
+            },
+        }
+        with path.open("a") as f:
+            f.write(json.dumps(result) + "\n")
+        s1 = next(s for s in parse_jsonl_file(path) if s.session_id == "s1")
+        assert s1.tool_error_count == 1
+        assert s1.content_hash != first
+
+
+class TestParseTimestamp:
+    def test_z_suffix_is_utc(self):
+        assert _parse_timestamp("2025-01-15T10:00:00.123Z") == datetime(
+            2025, 1, 15, 10, 0, 0, 123000, tzinfo=timezone.utc
+        )
+
+    def test_repeated_string_returns_shared_instance(self):
+        assert _parse_timestamp("2025-01-15T10:00:01Z") is _parse_timestamp(
+            "2025-01-15T10:00:01Z"
+        )
+
+    def test_empty_is_current_time_not_cached(self):
+        first = _parse_timestamp("")
+        assert first.tzinfo is timezone.utc
+        assert _parse_timestamp("") is not first
+
+
 class TestDiscoverJsonlFiles:
     def test_finds_jsonl_files(self, tmp_path):
         (tmp_path / "a.jsonl").touch()
@@ -211,6 +366,18 @@ class TestDiscoverJsonlFiles:
         found = discover_jsonl_files(tmp_path)
         assert found == []
 
+    def test_excludes_nested_subagents_and_sorts(self, tmp_path):
+        proj = tmp_path / "project1"
+        (proj / "sess" / "subagents").mkdir(parents=True)
+        (proj / "sess" / "subagents" / "agent.jsonl").touch()
+        (proj / "b.jsonl").touch()
+        (tmp_path / "a.jsonl").touch()
+        found = discover_jsonl_files(tmp_path)
+        assert found == [tmp_path / "a.jsonl", proj / "b.jsonl"]
+
+    def test_missing_directory(self, tmp_path):
+        assert discover_jsonl_files(tmp_path / "missing") == []
+
 
 # ---------------------------------------------------------------------------
 # project name derivation
@@ -952,6 +952,71 @@ class TestSubscriptionUser:
 # ===========================================================================
 
 
+class TestConnectionPool:
+    """Tests for the pooled read connections behind the query functions."""
+
+    def test_connection_is_reused_across_calls(self, seeded_db):
+        with queries._read_connection(seeded_db) as first:
+            pass
+        with queries._read_connection(seeded_db) as second:
+            pass
+        assert first is second
+        queries.close_connections()
+
+    def test_concurrent_borrowers_get_distinct_connections(self, seeded_db):
+        with queries._read_connection(seeded_db) as outer:
+            with queries._read_connection(seeded_db) as inner:
+                assert outer is not inner
+        queries.close_connections()
+
+    def test_row_factory_restored_on_return(self, seeded_db):
+        queries.get_session_scatter_data(seeded_db)
+        with queries._read_connection(seeded_db) as con:
+            assert con.row_factory is sqlite3.Row
+        queries.close_connections()
+
+    def test_pooled_connection_sees_later_writes(self, seeded_db):
+        assert queries.get_overview_summary(seeded_db)["last_30d"]["sessions"] == 2
+        ingest_sessions(seeded_db, [_make_test_session(session_id="sess-late")])
+        assert queries.get_overview_summary(seeded_db)["last_30d"]["sessions"] == 3
+        queries.close_connections()
+
+    def test_session_detail_ends_its_read_transaction(self, seeded_db):
+        assert queries.get_session_detail(seeded_db, "nonexistent-id") is None
+        with queries._read_connection(seeded_db) as con:
+            assert not con.in_transaction
+        queries.close_connections()
+
+
+class TestQueryCache:
+    """Tests for the result cache wrapped around summary queries."""
+
+    def test_repeat_call_is_served_from_cache(self, seeded_db, monkeypatch):
+        queries.clear_query_cache()
+        first = queries.get_token_breakdown(seeded_db)
+
+        def fail(_db_path):
+            raise AssertionError("query should have been cached")
+
+        monkeypatch.setattr(queries, "_read_connection", fail)
+        assert queries.get_token_breakdown(seeded_db) is first
+
+    def test_write_invalidates_cached_result(self, seeded_db):
+        queries.clear_query_cache()
+        before = queries.get_cost_by_project(seeded_db)
+        ingest_sessions(
+            seeded_db,
+            [_make_test_session(session_id="sess-new", project_name="new-project")],
+        )
+        after = queries.get_cost_by_project(seeded_db)
+        assert len(after) == len(before) + 1
+
+    def test_clear_query_cache_forces_requery(self, seeded_db):
+        first = queries.get_projects_table(seeded_db)
+        queries.clear_query_cache(seeded_db)
+        assert queries.get_projects_table(seeded_db) is not first
+
+
 class TestQueryOverviewSummary:
     """Tests for get_overview_summary."""
 
@@ -981,6 +1046,20 @@ class TestQueryOverviewSummary:
         assert result["last_30d"]["cost"] == 0
         assert result["today"]["sessions"] == 0
 
+    def test_periods_bucket_sessions_by_age(self, tmp_path):
+        db_path = tmp_path / "periods.db"
+        init_db(db_path)
+        ingest_sessions(db_path, [
+            _make_test_session(session_id="s-today", cost=1.0, days_ago=0),
+            _make_test_session(session_id="s-20d", cost=2.0, days_ago=20),
+            _make_test_session(session_id="s-40d", cost=4.0, days_ago=40),
+        ])
+        result = queries.get_overview_summary(db_path)
+        assert result["last_30d"]["sessions"] == 2
+        assert result["last_30d"]["cost"] == 3.0
+        assert result["this_week"]["sessions"] == 1
+        assert result["today"] == {"sessions": 1, "work_blocks": 1, "cost": 1.0}
+
     def test_filter_by_provider(self, mixed_provider_db):
         result = queries.get_overview_summary(mixed_provider_db, provider="codex")
         assert result["last_30d"]["sessions"] == 1